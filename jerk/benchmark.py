@@ -0,0 +1,297 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Time and peak memory of every stage of the jerk evaluation for synthetic recordings of growing length
+@version: 1.0.0
+"""
+
+from bcolors import TerminalColors as tc
+import numpy as np
+import synthetic_odometry
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# stages of the evaluation in the order they are run
+STAGES = ['read_data_csv', 'evaluate_csv_stream', 'read_data_bagfile', 'read_data_binary', 'smooth',
+          'differentiation', 'jerk_metrics', 'save_csv', 'callback']
+# stages which read or write files or handle every message in python, only run up to '--max_io' samples
+IO_STAGES = ['read_data_csv', 'evaluate_csv_stream', 'read_data_bagfile', 'save_csv', 'callback']
+# input file of the stages, written once per number of samples
+INPUTS = {'read_data_csv': 'input.csv', 'evaluate_csv_stream': 'input.csv', 'read_data_bagfile': 'input.bag',
+          'read_data_binary': 'input.bin'}
+SAMPLES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+# a fast stage is repeated until it took this long in total in [s], the fastest run is reported
+MIN_TIME = 0.2
+MAX_REPEAT = 50
+
+
+def memory():
+    '''
+    :return: current and peak resident memory of this process in [MB], None if '/proc' isn't available
+    '''
+    values = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:') or line.startswith('VmHWM:'):
+                    name, value = line.split(':')
+                    values[name] = int(value.split()[0]) / 1024.0
+    except IOError:
+        return None, None
+    return values.get('VmRSS'), values.get('VmHWM')
+
+
+def reset_peak():
+    '''
+    set the peak resident memory to the current one (Linux 4.0 and newer)
+    '''
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except IOError:
+        pass
+
+
+def write_inputs(A, directory, stages):
+    '''
+    write the input files needed by 'stages' to 'directory'
+    :return: dict stage -> error message of stages whose input couldn't be written
+    '''
+    errors = {}
+    for stage in stages:
+        filename = os.path.join(directory, INPUTS.get(stage, ''))
+        if stage not in INPUTS or os.path.exists(filename):
+            continue
+        try:
+            if filename.endswith('.csv'):
+                synthetic_odometry.to_csv(A, filename)
+            elif filename.endswith('.bag'):
+                synthetic_odometry.to_bag(A, filename)
+            else:
+                synthetic_odometry.to_binary(A, filename)
+        except ImportError as e:
+            errors[stage] = 'skipped: {}'.format(e)
+    return errors
+
+
+def prepare(stage, A, directory):
+    '''
+    everything a stage needs, so only the stage itself is measured
+    :param stage: name from 'STAGES'
+    :param A: synthetic data matrix
+    :param directory: directory with the input files, also the working directory
+    :return: function running the stage once
+    '''
+    # imported here, so the imports are part of the measured startup of the stage process and not of the stage
+    import main
+    filename = os.path.join(directory, INPUTS.get(stage, ''))
+    je = main.JerkEvaluation(['-nc', '-j', '4.0'])
+    if stage == 'read_data_csv':
+        return lambda: je.read_data_csv(filename)
+    if stage == 'evaluate_csv_stream':
+        return lambda: je.evaluate_csv_stream(filename, 4.0, 100000)
+    if stage == 'read_data_bagfile':
+        return lambda: je.read_data_bagfile(filename)
+    if stage == 'read_data_binary':
+        return lambda: je.read_data_binary(filename)
+    if stage == 'smooth':
+        acc = np.gradient(A[:, main.AD.VEL_X], A[1, main.AD.FHS] - A[0, main.AD.FHS])
+        return lambda: main.smoothing.smooth(acc, je.smo_para, je.window)
+    je.A = A
+    if stage == 'differentiation':
+        return je.differentiation
+    je.differentiation()
+    if stage == 'jerk_metrics':
+        return lambda: je.jerk_metrics(je.max_jerks())
+    if stage == 'save_csv':
+        return je.save_csv
+    if stage == 'callback':
+        import listener
+        msgs = list(synthetic_odometry.messages(A))
+
+        def receive():
+            nl = listener.NodeListener(max_jerk=4.0)
+            for msg in msgs:
+                nl.callback(msg)
+
+        return receive
+    raise ValueError('unknown stage \'{}\''.format(stage))
+
+
+def run_stage(stage, samples, directory, generator):
+    '''
+    measure one stage, called in a new process for every stage by 'measure'
+    :return: dict with 'seconds' (fastest run), 'repeat', 'rss_mb' (before the stage) and 'peak_mb' (additional
+             memory of the first measured run)
+    '''
+    os.chdir(directory)
+    if not os.path.isdir('Data'):
+        os.mkdir('Data')
+    A = synthetic_odometry.odometry(samples, **generator)[0]
+    run = prepare(stage, A, directory)
+    # first run not measured: modules imported on first use and cached windows are part of the startup, see
+    # 'startup_time.py'
+    run()
+    rss, peak = memory()
+    reset_peak()
+    start = time.time()
+    run()
+    times = [time.time() - start]
+    peak = memory()[1]
+    while sum(times) < MIN_TIME and len(times) < MAX_REPEAT:
+        start = time.time()
+        run()
+        times.append(time.time() - start)
+    result = {'seconds': min(times), 'repeat': len(times), 'rss_mb': rss}
+    result['peak_mb'] = peak - rss if peak is not None and rss is not None else None
+    return result
+
+
+def measure(stage, samples, directory, generator):
+    '''
+    run 'run_stage' in a new interpreter, so every stage starts with the same memory and imports
+    :return: dict with the result or 'error'
+    '''
+    command = [sys.executable, os.path.abspath(__file__), '--run', stage, str(samples), directory,
+               json.dumps(generator)]
+    # fixed mmap threshold of glibc: big arrays are always mapped and given back when they are freed, otherwise
+    # arrays freed in the first run are reused and the peak memory of the measured run is too small
+    env = dict(os.environ, MALLOC_MMAP_THRESHOLD_='131072')
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    output, error = process.communicate()
+    if process.returncode != 0:
+        return {'error': (error.strip().splitlines() or ['exit code {}'.format(process.returncode)])[-1]}
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def git_commit():
+    '''
+    :return: hash of the checked out commit, None outside of a git repository
+    '''
+    try:
+        with open(os.devnull, 'w') as null:
+            return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=null,
+                                           cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, filename):
+    '''
+    print the change of time and memory against the results of an older run
+    :param results: list of results of this run
+    :param filename: json-file written by an older run
+    '''
+    with open(filename) as f:
+        old = json.load(f)
+    before = dict(((r['stage'], r['samples']), r) for r in old['results'] if 'seconds' in r)
+    print tc.OKBLUE + 'compared to \'{}\' (commit {})'.format(filename, old.get('commit')) + tc.ENDC
+    print '{:>20} | {:>9} | {:>12} | {:>12} | {:>7} | {:>12}'.format('stage', 'samples', 'before [s]', 'now [s]',
+                                                                      'ratio', 'memory ratio')
+    for r in results:
+        b = before.get((r['stage'], r['samples']))
+        if b is None or 'seconds' not in r:
+            continue
+        ratio = r['seconds'] / max(b['seconds'], 1e-9)
+        memory_ratio = float('nan')
+        if r['peak_mb'] is not None and b['peak_mb'] is not None:
+            memory_ratio = max(r['peak_mb'], 0.1) / max(b['peak_mb'], 0.1)
+        color = tc.FAIL if ratio > 1.2 else tc.OKGREEN if ratio < 1 / 1.2 else ''
+        print color + '{:>20} | {:>9} | {:>12.6f} | {:>12.6f} | {:>7.2f} | {:>12.2f}'.format(
+            r['stage'], r['samples'], b['seconds'], r['seconds'], ratio, memory_ratio) + (tc.ENDC if color else '')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Benchmark every stage of the jerk evaluation with synthetic odometry, see '
+                    '\'synthetic_odometry.py\'. Every stage runs in a new process, time and peak memory are written '
+                    'to a json-file which can be compared with the results of another commit.')
+    parser.add_argument('-n', '--samples', nargs='+', type=lambda value: int(float(value)), default=SAMPLES,
+                        help='numbers of samples, default: 1e3 1e4 1e5 1e6 1e7')
+    parser.add_argument('-st', '--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help='stages to measure, default: all')
+    parser.add_argument('--max_io', type=lambda value: int(float(value)), default=10 ** 6,
+                        help='max number of samples of the stages reading or writing files and of \'callback\', '
+                             'default = 1e6 (1e7 rows of the csv-layout are 5 GB)')
+    parser.add_argument('-o', '--output', help='name and path of the json-file, default: '
+                                               '\'benchmark_%%d_%%m_%%Y---%%H:%%M.json\'', type=str)
+    parser.add_argument('-c', '--compare', help='json-file of an older run to compare with', type=str)
+    parser.add_argument('--spikes', help='number of velocity steps, default = 10', type=int, default=10)
+    parser.add_argument('--jitter', help='standard deviation of the stamps in sample times, default = 0.05',
+                        type=float, default=0.05)
+    parser.add_argument('--dropouts', help='probability of dropped messages after a message, default = 0.01',
+                        type=float, default=0.01)
+    parser.add_argument('--seed', help='seed of the random numbers, default = 0', type=int, default=0)
+    parser.add_argument('--run', nargs=4, help=argparse.SUPPRESS)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.run is not None:
+        stage, samples, directory, generator = args.run
+        # terminal output of the stage is discarded, only the result is printed
+        stdout = os.dup(1)
+        with open(os.devnull, 'w') as null:
+            os.dup2(null.fileno(), 1)
+        try:
+            result = run_stage(stage, int(samples), directory, json.loads(generator))
+        except ImportError as e:
+            # e.g. ROS isn't installed
+            result = {'error': 'skipped: {}'.format(e)}
+        finally:
+            sys.stdout.flush()
+            os.dup2(stdout, 1)
+        print json.dumps(result)
+        return True
+
+    generator = {'spikes': args.spikes, 'jitter': args.jitter, 'dropouts': args.dropouts, 'seed': args.seed}
+    output = args.output or 'benchmark_' + time.strftime('%d_%m_%Y---%H:%M') + '.json'
+    results = []
+    print '{:>20} | {:>9} | {:>12} | {:>13} | {:>11}'.format('stage', 'samples', 'time [s]', 'per sample [us]',
+                                                             'memory [MB]')
+    for samples in sorted(args.samples):
+        stages = [s for s in args.stages if s not in IO_STAGES or samples <= args.max_io]
+        directory = tempfile.mkdtemp(prefix='jerk_benchmark_')
+        try:
+            A = synthetic_odometry.odometry(samples, **generator)[0]
+            errors = write_inputs(A, directory, stages)
+            del A
+            for stage in stages:
+                result = {'stage': stage, 'samples': samples}
+                if stage in errors:
+                    result['error'] = errors[stage]
+                else:
+                    result.update(measure(stage, samples, directory, generator))
+                results.append(result)
+                if 'error' in result:
+                    print tc.WARNING + '{:>20} | {:>9} | {}'.format(stage, samples, result['error']) + tc.ENDC
+                    continue
+                result['us_per_sample'] = result['seconds'] / samples * 10 ** 6
+                print '{:>20} | {:>9} | {:>12.6f} | {:>15.3f} | {:>11}'.format(
+                    stage, samples, result['seconds'], result['us_per_sample'],
+                    '-' if result['peak_mb'] is None else '{:.1f}'.format(result['peak_mb']))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    with open(output, 'w') as f:
+        json.dump({'commit': git_commit(), 'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.platform(),
+                   'generator': generator, 'results': results}, f, indent=2)
+    print tc.OKBLUE + 'Results: \'{}\''.format(output) + tc.ENDC
+    if args.compare is not None:
+        compare(results, args.compare)
+    return all('error' not in r or r['error'].startswith('skipped') for r in results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
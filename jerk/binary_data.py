@@ -0,0 +1,110 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Binary file format for read data, loaded as memory map
+@version: 1.0.0
+"""
+
+import numpy as np
+import argparse
+import json
+import os
+import time
+
+# file layout: magic, uint32 length of the header, json header (padded with spaces, so the data is aligned),
+# float64 data column after column (fortran order)
+MAGIC = '\x93JERKAD\x01'
+ALIGN = 64
+DTYPE = '<f8'
+
+
+def write(filename, A, columns, topic=None, source=None):
+    '''
+    write a data matrix to a binary file
+    :param filename: path to binary file
+    :param A: data matrix with one column per name in 'columns'
+    :param columns: names of the columns
+    :param topic: topic the data was recorded from
+    :param source: file the data was read from
+    '''
+    A = np.asfortranarray(A, dtype=DTYPE)
+    header = {'version': 1, 'dtype': DTYPE, 'order': 'F', 'samples': A.shape[0], 'columns': list(columns),
+              'topic': topic, 'source': source}
+    text = json.dumps(header, sort_keys=True)
+    size = len(MAGIC) + 4 + len(text) + 1
+    text += ' ' * (-size % ALIGN) + '\n'
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.array([len(text)], dtype='<u4').tostring())
+        f.write(text)
+        # transposed fortran matrix is c-contiguous: written column after column without a copy
+        A.T.tofile(f)
+
+
+def read_header(filename):
+    '''
+    :param filename: path to binary file
+    :return: (header as dict, offset of the data in [byte])
+    '''
+    with open(filename, 'rb') as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError('\'{}\' is no binary data file'.format(filename))
+        length = np.fromstring(f.read(4), dtype='<u4')[0]
+        header = json.loads(f.read(length))
+    return header, len(MAGIC) + 4 + length
+
+
+def load(filename):
+    '''
+    memory map the data of a binary file, nothing is read until it is used
+    :param filename: path to binary file
+    :return: (read-only data matrix with shape [samples, columns], header as dict)
+    '''
+    header, offset = read_header(filename)
+    shape = (header['samples'], len(header['columns']))
+    if shape[0] == 0:
+        return np.empty(shape, dtype=header['dtype']), header
+    A = np.memmap(filename, dtype=header['dtype'], mode='r', offset=offset, shape=shape, order=header['order'])
+    return A, header
+
+
+def convert(filename, output=None, topic='/base/odometry_controller/odometry'):
+    '''
+    read a csv- or bag-file and write the data matrix to a binary file
+    :param filename: path to csv- or bag-file
+    :param output: path to binary file, default: 'filename' with ending '.bin'
+    :param topic: topic read from a bag-file
+    :return: path to binary file
+    '''
+    # imported here, so loading binary files doesn't need the imports of 'main'
+    import main
+    if output is None:
+        output = os.path.splitext(filename)[0] + '.bin'
+    if filename.endswith('.bag'):
+        je = main.JerkEvaluation(['-nc', '-rb', '-bag', filename])
+        je.read_data_bagfile(filename, include=topic)
+    else:
+        je = main.JerkEvaluation(['-nc', '-rc', '-csv', filename])
+        je.read_data_csv(filename)
+        topic = None
+    write(output, je.A, je.data, topic, os.path.abspath(filename))
+    return output
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert csv- and bag-files to binary files, which are loaded with '
+                                                 '\'main.py -npy *.bin\'')
+    parser.add_argument('files', nargs='+', help='csv- or bag-files', type=str)
+    parser.add_argument('-o', '--output', help='name and path of the binary file, only for one input file', type=str)
+    parser.add_argument('-t', '--topic', help='topic read from bag-files, default: /base/odometry_controller/odometry',
+                        type=str, default='/base/odometry_controller/odometry')
+    args = parser.parse_args()
+    if args.output is not None and len(args.files) > 1:
+        parser.error('\'-o\' needs exactly one input file')
+    for name in args.files:
+        start = time.time()
+        output = convert(name, args.output, args.topic)
+        print 'Converted \'{}\' to \'{}\' in {:.3f} [s]'.format(name, output, time.time() - start)
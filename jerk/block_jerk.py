@@ -0,0 +1,138 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Jerk calculation on consecutive blocks of odometry data
+@version: 1.0.0
+"""
+
+import numpy as np
+import derivatives
+import savitzky_golay
+
+
+class BlockJerk:
+    def __init__(self, smooth, fhs, vel_x, vel_y, window_len=30, window='hanning', derivative='scalar',
+                 estimator='smooth', polyorder=savitzky_golay.POLYORDER):
+        '''
+        Calculates the smoothed acceleration and jerk of a recording which arrives in blocks of rows.
+        The results are the same as calculating on the whole recording at once: every block is evaluated
+        together with a halo of neighbouring rows, so only the halo has to be kept in memory.
+        :param smooth: smoothing function with signature smooth(x, window_len, window)
+        :param fhs: column index of 'field.header.stamp' in the rows
+        :param vel_x: column index of the velocity in x-direction
+        :param vel_y: column index of the velocity in y-direction
+        :param window_len: length of the smoothing window
+        :param window: type of the smoothing window
+        :param derivative: 'scalar': one sample time from the first two rows, 'stamps': differences of the real
+                           stamps, rows with duplicate stamps are dropped (see 'derivatives.MODES', 'uniform' needs
+                           the whole recording and is not supported)
+        :param estimator: 'smooth': gradient, smoothing window, gradient, 'savgol': Savitzky-Golay filter on the
+                          velocity, it assumes uniform sampling, so one sample time from the first two rows is used
+        :param polyorder: order of the polynomials for estimator 'savgol'
+        '''
+        if derivative not in ['scalar', 'stamps']:
+            raise ValueError('derivative \'{}\' is not supported block by block'.format(derivative))
+        if estimator not in ['smooth', 'savgol']:
+            raise ValueError('estimator \'{}\' is not supported block by block'.format(estimator))
+        self.smooth = smooth
+        self.fhs = fhs
+        self.vel_x = vel_x
+        self.vel_y = vel_y
+        self.window_len = window_len
+        self.window = window
+        self.derivative = derivative
+        self.estimator = estimator
+        self.polyorder = polyorder
+        # rows needed on each side of a sample: gradient + smoothing window + gradient
+        self.halo = window_len + 2
+        self.reset()
+
+    def reset(self):
+        '''
+        forget all pushed rows and start a new recording
+        '''
+        self.rows = None
+        # global index of the first row in 'self.rows'
+        self.offset = 0
+        # global index of the first row which was not emitted yet
+        self.emitted = 0
+        # stamp of the first row and sample time, both taken from the beginning of the recording
+        self.t0 = None
+        self.dt = None
+
+    def calculate(self, rows):
+        '''
+        calculate smoothed acceleration and jerk on given rows, like 'JerkEvaluation.differentiation'
+        :param rows: array with rows in AD-layout
+        :return: smoothed acceleration and smoothed jerk
+        '''
+        n = rows.shape[0]
+        if self.estimator == 'savgol':
+            acc_x, jerk_x = savitzky_golay.acc_and_jerk(rows[:, self.vel_x], self.window_len, self.dt, self.polyorder)
+            acc_y, jerk_y = savitzky_golay.acc_and_jerk(rows[:, self.vel_y], self.window_len, self.dt, self.polyorder)
+            return np.sqrt(acc_x ** 2 + acc_y ** 2), np.sqrt(jerk_x ** 2 + jerk_y ** 2)
+        spacing = self.dt if self.derivative == 'scalar' else rows[:, self.fhs]
+        acc_x = derivatives.gradient(rows[:, self.vel_x], spacing)
+        acc_y = derivatives.gradient(rows[:, self.vel_y], spacing)
+        smo_acc_x = self.smooth(acc_x, self.window_len, window=self.window)[:n]
+        smo_acc_y = self.smooth(acc_y, self.window_len, window=self.window)[:n]
+        smo_jerk_x = derivatives.gradient(smo_acc_x, spacing)
+        smo_jerk_y = derivatives.gradient(smo_acc_y, spacing)
+        return np.sqrt(smo_acc_x ** 2 + smo_acc_y ** 2), np.sqrt(smo_jerk_x ** 2 + smo_jerk_y ** 2)
+
+    def push(self, rows, final=False):
+        '''
+        add a block of rows and return all rows whose jerk is final now
+        :param rows: array with rows in AD-layout, 'field.header.stamp' in [s]
+        :param final: True if this is the last block of the recording
+        :return: global index of the first returned row, rows with stamps starting at 0s, smoothed acceleration,
+                 smoothed jerk
+        '''
+        rows = np.array(rows, dtype=np.float64, ndmin=2)
+        if self.derivative == 'stamps' and rows.shape[0] > 0:
+            # rows with a stamp which is not later than all stamps before can't be differentiated
+            stamps = rows[:, self.fhs]
+            if self.rows is not None and self.rows.shape[0] > 0:
+                stamps = np.concatenate(([self.rows[-1, self.fhs]], stamps))
+                rows = rows[derivatives.increasing(stamps)[1:]]
+            else:
+                rows = rows[derivatives.increasing(stamps)]
+        if self.rows is None:
+            self.rows = rows
+        else:
+            self.rows = np.concatenate((self.rows, rows), axis=0)
+        if self.t0 is None and self.rows.shape[0] > 0:
+            self.t0 = self.rows[0, self.fhs]
+        if self.dt is None and self.rows.shape[0] > 1:
+            self.dt = self.rows[1, self.fhs] - self.rows[0, self.fhs]
+
+        n = self.rows.shape[0]
+        first = self.emitted - self.offset
+        if final:
+            last = n
+        elif n - first > self.halo:
+            last = n - self.halo
+        else:
+            return self.emitted, np.empty([0, rows.shape[1]]), np.empty(0), np.empty(0)
+
+        smo_acc, smo_jerk = self.calculate(self.rows)
+        block = self.rows[first:last].copy()
+        block[:, self.fhs] -= self.t0
+        index = self.emitted
+
+        # keep the halo in front of the first row which is not emitted yet
+        self.emitted = self.offset + last
+        keep = max(last - self.halo, 0)
+        self.rows = self.rows[keep:]
+        self.offset += keep
+        return index, block, smo_acc[first:last], smo_jerk[first:last]
+
+    def finish(self):
+        '''
+        end of recording: return all remaining rows
+        '''
+        if self.rows is None:
+            return self.emitted, np.empty([0, 0]), np.empty(0), np.empty(0)
+        return self.push(np.empty([0, self.rows.shape[1]]), final=True)
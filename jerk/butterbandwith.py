@@ -1,10 +1,97 @@
 '''
 @see: https://stackoverflow.com/questions/12093594/how-to-implement-band-pass-butterworth-filter-with-scipy-signal-butter
 @see: http://scipy-cookbook.readthedocs.io/items/ButterworthBandpass.html
-@version: 1.1
+@version: 1.2
 '''
-from cProfile import label
-from scipy.signal import butter, lfilter
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfiltfilt, sosfilt_zi
+
+# order of the filter used for the jerk, forward-backward filtering doubles it
+ORDER = 4
+
+# designed filters as second-order sections: (order, cutoffs, fs, btype) -> sos
+_sos = {}
+
+
+def butter_sos(order, cutoffs, fs, btype=None):
+    '''
+    butterworth filter as second-order sections, every design is only calculated once
+    @param order: order of butterworth filter
+    @param cutoffs: cutoff frequency for a lowpass, (lowcut, highcut) for a bandpass
+    @param fs: sample rate
+    @param btype: 'low', 'high', 'band' or 'bandstop', None: 'low' for one cutoff, 'band' for two
+    @return: read-only array with shape [sections, 6]
+    '''
+    cutoffs = tuple(np.atleast_1d(np.asarray(cutoffs, dtype=np.float64)).tolist())
+    if btype is None:
+        btype = 'low' if len(cutoffs) == 1 else 'band'
+    key = (order, cutoffs, float(fs), btype)
+    sos = _sos.get(key)
+    if sos is None:
+        nyq = 0.5 * fs
+        if any(c <= 0 or c >= nyq for c in cutoffs):
+            raise ValueError('cutoff frequencies have to be between 0 and {} [Hz]'.format(nyq))
+        wn = cutoffs[0] / nyq if len(cutoffs) == 1 else [c / nyq for c in cutoffs]
+        sos = butter(order, wn, btype=btype, output='sos')
+        sos.flags.writeable = False
+        _sos[key] = sos
+    return sos
+
+
+def butter_filter(data, cutoffs, fs, order=ORDER, btype=None, zero_phase=True):
+    '''
+    @param data: data to filter
+    @param cutoffs: cutoff frequency for a lowpass, (lowcut, highcut) for a bandpass
+    @param fs: sample rate
+    @param order: order of butterworth filter
+    @param btype: see 'butter_sos'
+    @param zero_phase: True: filtered forward and backward, no phase lag (order and attenuation are doubled),
+                       False: causal filter
+    '''
+    sos = butter_sos(order, cutoffs, fs, btype)
+    if zero_phase:
+        return sosfiltfilt(sos, data)
+    return sosfilt(sos, data)
+
+
+class StreamingFilter:
+    def __init__(self, sos, channels=1):
+        '''
+        Causal filter for data which arrives in single samples or small blocks. The state of every section is kept
+        between the calls, so filtering the samples in any blocks gives the same output as filtering all samples at
+        once with 'sosfilt'. Every call costs the same, independent of the number of samples before.
+        @param sos: second-order sections, e.g. from 'butter_sos'
+        @param channels: number of signals filtered together, e.g. 2 for x- and y-axis
+        '''
+        self.sos = sos
+        self.channels = channels
+        self.reset()
+
+    def reset(self, x0=None):
+        '''
+        forget all filtered samples
+        @param x0: None: zero state like 'sosfilt', otherwise state of a filter which got the constant input 'x0'
+                   forever (one value per channel), so there is no transient at the start
+        '''
+        if x0 is None:
+            self.zi = np.zeros([self.sos.shape[0], 2, self.channels])
+        else:
+            x0 = np.asarray(x0, dtype=np.float64).reshape(self.channels)
+            self.zi = sosfilt_zi(self.sos)[:, :, np.newaxis] * x0
+
+    def filter(self, x):
+        '''
+        @param x: one sample (a value, or one value per channel) or a block of samples (shape [samples] for one
+                  channel, [samples, channels] otherwise)
+        @return: filtered samples with the same shape as 'x'
+        '''
+        x = np.asarray(x, dtype=np.float64)
+        shape = x.shape
+        if x.size == 0:
+            # 'sosfilt' doesn't return the unchanged state for an empty block
+            return x.copy()
+        y, self.zi = sosfilt(self.sos, x.reshape(-1, self.channels), axis=0, zi=self.zi)
+        return y.reshape(shape)
 
 
 def butter_bandpass(lowcut, highcut, fs, order=5):
@@ -15,28 +102,28 @@ def butter_bandpass(lowcut, highcut, fs, order=5):
     return b, a
 
 
-def butter_lowpass(lowcut, highcut, fs, order=5):
+def butter_lowpass(cutoff, fs, order=5):
     '''
     @note: new implementation of lowpass
+    @param cutoff: cutoff frequency
+    @param fs: sample rate
+    @param order: order of butterworth filter
     '''
     nyq = 0.5 * fs
-    low = lowcut / nyq
-    high = highcut / nyq
-    b, a = butter(order, [low, high], btype='low')
+    b, a = butter(order, cutoff / nyq, btype='low')
     return b, a
 
 
-def butter_bandpass_filter(data, lowcut, highcut, fs, order=5):
+def butter_bandpass_filter(data, lowcut, highcut, fs, order=5, zero_phase=False):
     '''
     @param data: data to filter
     @param lowcut: lowpass cutoff frequency
     @param highcut: highpass cutoff frequency
     @param fs: sample rate
     @param order: order of butterworth filter
+    @param zero_phase: True: filtered forward and backward without phase lag, False: causal filter
     '''
-    b, a = butter_bandpass(lowcut, highcut, fs, order=order)
-    y = lfilter(b, a, data)
-    return y
+    return butter_filter(data, (lowcut, highcut), fs, order, 'band', zero_phase)
 
 
 if __name__ == "__main__":
@@ -80,6 +167,8 @@ if __name__ == "__main__":
 
     y = butter_bandpass_filter(x, lowcut, highcut, fs, order=6)
     plt.plot(t, y, label='Filtered signal (%g Hz)' % f0)
+    y = butter_bandpass_filter(x, lowcut, highcut, fs, order=6, zero_phase=True)
+    plt.plot(t, y, label='Zero-phase filtered signal (%g Hz)' % f0)
     plt.xlabel('time (seconds)')
     plt.hlines([-a, a], 0, T, linestyles='--')
     plt.grid(True)
@@ -5,6 +5,12 @@ import sys
 import rospy
 from nav_msgs.msg import Odometry
 import time
+import threading
+from collections import deque
+from block_jerk import BlockJerk
+from online_jerk import OnlineJerk
+from smoothing import smooth
+from exceedance import ExceedanceTracker
 
 
 # AD stands for ArrayData
@@ -31,63 +37,6 @@ class bcolors:
     UNDERLINE = '\033[4m'
 
 
-def smooth(x, window_len=11, window='hanning'):
-    """smooth the data using a window with requested size.
-
-    This method is based on the convolution of a scaled window with the signal.
-    The signal is prepared by introducing reflected copies of the signal
-    (with the window size) in both ends so that transient parts are minimized
-    in the begining and end part of the output signal.
-
-    input:
-        x: the input signal
-        window_len: the dimension of the smoothing window; should be an odd integer
-        window: the type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
-            flat window will produce a moving average smoothing.
-
-    output:
-        the smoothed signal
-
-    example:
-
-    t=linspace(-2,2,0.1)
-    x=sin(t)+randn(len(t))*0.1
-    y=smooth(x)
-
-    see also:
-
-    numpy.hanning, numpy.hamming, numpy.bartlett, numpy.blackman, numpy.convolve
-    scipy.signal.lfilter
-
-    TODO: the window parameter could be the window itself if an array instead of a string
-    NOTE: length(output) != length(input), to correct this: return y[(window_len/2-1):-(window_len/2)] instead of just y.
-    """
-
-    if x.ndim != 1:
-        raise ValueError, "smooth only accepts 1 dimension arrays."
-
-    if x.size < window_len:
-        raise ValueError, "Input vector needs to be bigger than window size."
-
-    if window_len < 3:
-        return x
-
-    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']:
-        raise ValueError, "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
-
-    s = np.r_[x[window_len - 1:0:-1], x, x[-2:-window_len - 1:-1]]
-    # print(len(s))
-    if window == 'flat':  # moving average
-        w = np.ones(window_len, 'd')
-    else:
-        w = eval('np.' + window + '(window_len)')
-
-    y = np.convolve(w / w.sum(), s, mode='valid')
-
-    return y[(window_len / 2 - 1):-(window_len / 2)]
-    # return y
-
-
 class CalculateJerkParamHandler:
     def __init__(self):
         """
@@ -116,13 +65,20 @@ class CalculateJerkParamHandler:
                     testblock_name)
                 groundtruth = None
                 groundtruth_epsilon = None
-            metrics.append(CalculateJerk(metric["topic"], groundtruth, groundtruth_epsilon))
+            # optional: how stamps are used for differentiation, 'stamps' or 'scalar'
+            derivative = metric.get("derivative", "stamps")
+            # optional: 'smooth', 'savgol' or 'butter', see 'derivatives.ESTIMATORS'
+            estimator = metric.get("estimator", "smooth")
+            metrics.append(CalculateJerk(metric["topic"], groundtruth, groundtruth_epsilon, derivative=derivative,
+                                         estimator=estimator, cutoff=metric.get("cutoff", 1.4),
+                                         order=metric.get("order", 4)))
             # metrics.append(CalculateJerk(groundtruth, groundtruth_epsilon))
         return metrics
 
 
 class CalculateJerk:
-    def __init__(self, topic, groundtruth, groundtruth_epsilon):
+    def __init__(self, topic, groundtruth, groundtruth_epsilon, block_size=100, derivative='stamps',
+                 estimator='smooth', cutoff=1.4, order=4):
         self.active = False
         self.finished = False
         # self.topic = '/base/odometry_controller/odometry'
@@ -132,13 +88,55 @@ class CalculateJerk:
         self.start_time = None
         self.stop_time = None
         self.smo_para = 30
-        # create array for further use
-        self.A_listener = np.ones([0, 8], dtype=np.double)
+        # number of messages collected before the jerk of the block is calculated
+        self.block_size = block_size
+        # jerk is calculated block by block, only the tail needed for smoothing and gradient is kept
+        # 'stamps': derivatives on the real stamps, 'scalar': one sample time from the first two messages
+        if estimator == 'savgol' and derivative != 'scalar':
+            # the filter needs a uniform grid, but the recording can't be resampled block by block
+            rospy.logwarn("Estimator 'savgol' uses one sample time, using derivative 'scalar' instead of '%s' for "
+                          "metric 'jerk' of topic '%s'", derivative, topic)
+            derivative = 'scalar'
+        self.derivative = derivative
+        # 'smooth': gradient, smoothing window, gradient, 'savgol': Savitzky-Golay filter on the velocity,
+        # 'butter': causal butterworth lowpass with 'cutoff' and 'order', message by message (see 'OnlineJerk'),
+        # one sample time from the first two messages. Its jerk belongs to the message 'OnlineJerk.delay' messages
+        # before (about 16 messages at 50 Hz), so it is reported with the stamp of that message, and the
+        # last messages of a recording get no jerk
+        self.estimator = estimator
+        if estimator == 'butter':
+            self.online = OnlineJerk(estimator='butter', cutoff=cutoff, order=order)
+            self.blocks = None
+        else:
+            self.online = None
+            self.blocks = BlockJerk(smooth, AD.FHS, AD.VEL_X, AD.VEL_Y, self.smo_para, 'hanning', derivative,
+                                    estimator)
+        # 'callback' runs in the rospy thread, 'stop' and 'purge' in the caller's thread, both change the blocks
+        self.lock = threading.Lock()
+        self.reset()
         # queue_size=None --> queue size is infinite, needed to calculate the right jerk
         rospy.Subscriber(self.topic, Odometry, self.callback, queue_size=None)
 
-        self.A_grad_smo_jerk = np.ones([0, 8], dtype=np.double)
-
+    def reset(self):
+        # messages of the current block
+        self.pending = []
+        # jerk and stamp of the message it belongs to, estimator 'butter'
+        self.pending_jerk = []
+        self.pending_stamps = []
+        # stamps of the messages whose jerk is not known yet and number of jerks passed to the results
+        self.delayed = deque()
+        self.emitted = 0
+        if self.online is not None:
+            self.online.reset()
+        else:
+            self.blocks.reset()
+        self.rows = 0
+        # results known so far
+        self.max_jerk = None
+        self.max_time = None
+        # intervals with jerk above 'groundtruth_epsilon'
+        self.tracker = ExceedanceTracker(self.groundtruth_epsilon) if self.groundtruth_epsilon is not None else None
+        self.intervals = None
 
     # def listener(self):
     #     # rospy.spin()
@@ -150,7 +148,9 @@ class CalculateJerk:
     #         rospy.sleep(0.25)
 
     def callback(self, msg):
-        if self.active:
+        with self.lock:
+            if not self.active:
+                return
             data_list = [-1,
                          float(msg.header.seq),
                          (float(msg.header.stamp.secs) * 10 ** 9 + float(msg.header.stamp.nsecs)) * 10 ** -9,
@@ -160,22 +160,35 @@ class CalculateJerk:
                          float(msg.pose.pose.position.x),
                          float(msg.pose.pose.position.y)]
 
-            # append data to array
-            self.A_listener = np.append(self.A_listener,
-                                        [[data_list[0], data_list[1], data_list[2], data_list[3],
-                                          data_list[4], data_list[5], data_list[6], data_list[7]]],
-                                        axis=0)
+            # append data to current block
+            self.pending.append(data_list)
+            if self.online is not None:
+                self.online.update(data_list[AD.FHS], data_list[AD.VEL_X], data_list[AD.VEL_Y])
+                self.delay_jerk(data_list[AD.FHS])
+            if len(self.pending) >= self.block_size:
+                self.differentiation()
 
     def start(self, timestamp):
         self.active = True
-        self.start_time = timestamp
+        if self.start_time is None:
+            self.start_time = timestamp
         # self.listener()
         rospy.loginfo(bcolors.FAIL+'----calc_jerk.py----'+bcolors.ENDC)
 
     def stop(self, timestamp):
-        self.active = False
-        self.stop_time = timestamp
-        self.finished = True
+        with self.lock:
+            self.active = False
+            self.stop_time = timestamp
+            if self.rows + len(self.pending) > 1:
+                try:
+                    self.differentiation(final=True)
+                except ValueError as e:
+                    # recording shorter than the smoothing window: no result
+                    rospy.logwarn("No jerk for topic '%s': %s", self.topic, e)
+                    self.max_jerk = None
+                    self.max_time = None
+                    self.intervals = None
+            self.finished = True
 
 #        rospy.loginfo('\033[94m' + '=' * 82 + '\033[0m')
 #        result = self.get_result()
@@ -184,58 +197,80 @@ class CalculateJerk:
 #        rospy.loginfo('\033[94m' + '=' * 82 + '\033[0m')
 
     def pause(self, timestamp):
-        # TODO: Implement pause time and counter calculation
-        # FIXME: check rate calculation in case of pause (counter, start_time and stop_time)
-        pass
+        # messages are ignored until 'start' is called again, collected data is kept
+        self.active = False
 
     def purge(self, timestamp):
-        pass
-
-    # get differentiation from given data
-    def differentiation(self):
-
-        print bcolors.OKBLUE + 'Got this array: ', self.A_listener.shape, bcolors.ENDC
-
-        # set time to start at 0s
-        self.A_listener[:, AD.FHS] = self.A_listener[:, AD.FHS] - self.A_listener[0, AD.FHS]
-
-        # differentiation
-        # compute acceleration from velocity by differentiation
-        A_grad_acc_x = np.gradient(self.A_listener[:, AD.VEL_X], self.A_listener[1, AD.FHS] - self.A_listener[0, AD.FHS])
-        A_grad_acc_y = np.gradient(self.A_listener[:, AD.VEL_Y], self.A_listener[1, AD.FHS] - self.A_listener[0, AD.FHS])
-
-        # differentiation
-        # compute jerk from acceleration by differentiation using smoothed acc
-        A_grad_smo_jerk_x = np.gradient(smooth(A_grad_acc_x[:, ], self.smo_para, window='hanning'),
-                                        self.A_listener[1, AD.FHS] - self.A_listener[0, AD.FHS])
-        A_grad_smo_jerk_y = np.gradient(smooth(A_grad_acc_y[:, ], self.smo_para, window='hanning'),
-                                        self.A_listener[1, AD.FHS] - self.A_listener[0, AD.FHS])
-        # (x^2+y^2)^0.5 to get absolute jerk
-        A_grad_smo_jerk = np.sqrt(A_grad_smo_jerk_x[:, ] ** 2 + A_grad_smo_jerk_y[:, ] ** 2)
-
-        self.A_grad_smo_jerk = A_grad_smo_jerk
+        # forget all collected data and results
+        with self.lock:
+            self.reset()
+            self.start_time = None
+            self.stop_time = None
+            self.finished = False
+
+    def delay_jerk(self, stamp):
+        '''
+        pair the jerk of 'OnlineJerk' with the stamp of the message it belongs to, 'delay' messages before the
+        message with 'stamp'
+        '''
+        self.delayed.append(stamp)
+        if self.online.lowpass is None:
+            # delay is known with the lowpass
+            return
+        lag = int(round(self.online.delay))
+        # messages before the first estimate
+        while len(self.delayed) > lag + 1:
+            self.pending_stamps.append(self.delayed.popleft())
+            self.pending_jerk.append(0.0)
+        if len(self.delayed) == lag + 1:
+            self.pending_stamps.append(self.delayed.popleft())
+            self.pending_jerk.append(self.online.jerk if self.online.jerk is not None else 0.0)
+
+    # get differentiation from collected block
+    def differentiation(self, final=False):
+        rows = np.array(self.pending, dtype=np.double).reshape(-1, 8)
+        self.pending = []
+        self.rows += rows.shape[0]
+        if self.online is not None:
+            # jerk is already known message by message
+            index, stamps = self.emitted, np.array(self.pending_stamps, dtype=np.double) - self.online.t0
+            smo_jerk = np.array(self.pending_jerk, dtype=np.double)
+            self.pending_jerk = []
+            self.pending_stamps = []
+            self.emitted += smo_jerk.size
+        else:
+            index, block, smo_acc, smo_jerk = self.blocks.push(rows, final=final)
+            stamps = block[:, AD.FHS]
+        if smo_jerk.size > 0:
+            i = np.argmax(smo_jerk)
+            if self.max_jerk is None or smo_jerk[i] > self.max_jerk:
+                self.max_jerk = float(smo_jerk[i])
+                self.max_time = float(stamps[i])
+            if self.tracker is not None:
+                self.tracker.update(index, stamps, smo_jerk)
+        if final and self.tracker is not None:
+            self.intervals = self.tracker.finish()
 
     def get_result(self):
         groundtruth_result = None
         details = {"topic": self.topic}
         if self.finished:
-            if self.groundtruth != None and self.groundtruth_epsilon != None:
-                self.differentiation()
-                for i in xrange(0, self.A_grad_smo_jerk.shape[0]):
-                    if self.A_grad_smo_jerk[i,] >= self.groundtruth_epsilon:
-                        output = bcolors.FAIL + 'Jerk: {:.3f} [m/s^3] at time: {:.6f} s is bigger than max ' \
-                                                'allowed jerk: {:.3f} [m/s^3]' + bcolors.ENDC
-                        print output.format(self.A_grad_smo_jerk[i,], self.A_listener[i, AD.FHS], self.groundtruth_epsilon)
-                        print 'Max Jerk: {:.4f} [m/s^3]'.format(self.A_grad_smo_jerk.max())
-                        data = float(self.A_grad_smo_jerk.max())
-                        groundtruth_result = False
-                        break
-                    else:
-                        data = float(self.A_grad_smo_jerk.max())
-                        groundtruth_result = True
-                if groundtruth_result:
+            data = self.max_jerk
+            if self.groundtruth != None and self.groundtruth_epsilon != None and data is not None:
+                details["violations"] = int(self.intervals.size)
+                if self.intervals.size > 0:
+                    first = self.intervals[0]
+                    output = bcolors.FAIL + 'Jerk: {:.3f} [m/s^3] at time: {:.6f} s is bigger than max ' \
+                                            'allowed jerk: {:.3f} [m/s^3]' + bcolors.ENDC
+                    print output.format(first['peak_jerk'], first['peak_time'], self.groundtruth_epsilon)
+                    print 'Jerk is {} times above max allowed jerk for {:.3f} s in total'.format(
+                        self.intervals.size, self.intervals['duration'].sum())
+                    details["first_violation"] = float(first['start_time'])
+                    groundtruth_result = False
+                else:
                     print bcolors.OKGREEN + 'Jerk is in desired range!' + bcolors.ENDC
-                    print 'Max Jerk: {:.4f} [m/s^3]'.format(self.A_grad_smo_jerk.max())
+                    groundtruth_result = True
+                print 'Max Jerk: {:.4f} [m/s^3]'.format(data)
             return "jerk", data, groundtruth_result, self.groundtruth, self.groundtruth_epsilon, details
         else:
             return False
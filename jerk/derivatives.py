@@ -0,0 +1,148 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Derivatives on the recorded stamps and resampling to a uniform time grid
+@version: 1.0.0
+"""
+
+import numpy as np
+
+# 'scalar': one sample time from the first two stamps (old behaviour)
+# 'stamps': differences of the real stamps, jitter and dropped messages are taken into account
+# 'uniform': data resampled to a uniform grid first, then differentiated with one sample time
+MODES = ['scalar', 'stamps', 'uniform']
+# estimators of smoothed acceleration and jerk from the velocity
+# 'smooth': gradient, smoothing window, gradient (see 'smoothing.smooth')
+# 'savgol': one Savitzky-Golay convolution per derivative (see 'savitzky_golay.py')
+# 'butter': gradient, zero-phase butterworth lowpass, gradient (see 'butterbandwith.py')
+ESTIMATORS = ['smooth', 'savgol', 'butter']
+
+
+def gradient(y, spacing, axis=-1):
+    '''
+    second order accurate central differences in the interior and first order differences at the boundaries,
+    like np.gradient
+    :param y: array with samples along 'axis'
+    :param spacing: scalar sample time or array with one stamp per sample (strictly increasing)
+    :param axis: axis of 'y' along which the samples are ordered
+    :return: derivative with the same shape as 'y'
+    '''
+    if np.ndim(spacing) == 0:
+        return np.gradient(y, spacing, axis=axis)
+    y = np.moveaxis(np.asarray(y, dtype=np.float64), axis, -1)
+    t = np.asarray(spacing, dtype=np.float64)
+    if t.size != y.shape[-1]:
+        raise ValueError('one stamp per sample needed: {} stamps for {} samples'.format(t.size, y.shape[-1]))
+    if t.size < 2:
+        raise ValueError('at least two samples are needed for the gradient')
+    h = np.diff(t)
+    result = np.empty_like(y)
+    # interior: weighted central difference of the left step 'hl' and right step 'hr'
+    hl = h[:-1]
+    hr = h[1:]
+    result[..., 1:-1] = (hl ** 2 * y[..., 2:] - hr ** 2 * y[..., :-2] + (hr ** 2 - hl ** 2) * y[..., 1:-1]) / (
+        hl * hr * (hl + hr))
+    result[..., 0] = (y[..., 1] - y[..., 0]) / h[0]
+    result[..., -1] = (y[..., -1] - y[..., -2]) / h[-1]
+    return np.moveaxis(result, -1, axis)
+
+
+def increasing(t):
+    '''
+    :param t: stamps
+    :return: boolean mask of all samples with a stamp later than every stamp before (duplicates and stamps going
+             backwards are False)
+    '''
+    t = np.asarray(t)
+    if t.size == 0:
+        return np.ones(0, dtype=bool)
+    return np.concatenate(([True], t[1:] > np.maximum.accumulate(t)[:-1]))
+
+
+def sample_rate(t):
+    '''
+    :param t: strictly increasing stamps in [s]
+    :return: median sample rate in [Hz]
+    '''
+    return 1.0 / np.median(np.diff(t))
+
+
+def uniform_grid(t, rate):
+    '''
+    :param t: strictly increasing stamps in [s]
+    :param rate: sample rate of the grid in [Hz]
+    :return: stamps from t[0] to t[-1] with sample time 1 / rate
+    '''
+    return t[0] + np.arange(int(np.floor((t[-1] - t[0]) * rate + 1e-9)) + 1) / float(rate)
+
+
+def resample(A, column, rate=None):
+    '''
+    linear interpolation of all columns to a uniform grid, vectorized for all columns at once
+    :param A: data matrix, one sample per row
+    :param column: index of the column with the strictly increasing stamps in [s]
+    :param rate: sample rate of the grid in [Hz], None: median sample rate of the stamps
+    :return: resampled data matrix, its stamp column is the uniform grid
+    '''
+    t = A[:, column]
+    if rate is None:
+        rate = sample_rate(t)
+    grid = uniform_grid(t, rate)
+    # index of the sample left of every grid point and the weight of the sample right of it
+    left = np.clip(np.searchsorted(t, grid, side='right') - 1, 0, t.size - 2)
+    weight = (grid - t[left]) / (t[left + 1] - t[left])
+    B = A[left] * (1.0 - weight)[:, np.newaxis] + A[left + 1] * weight[:, np.newaxis]
+    B[:, column] = grid
+    return B
+
+
+if __name__ == '__main__':
+    import timeit
+    from smoothing import smooth
+
+    # recording with jitter, duplicate stamps and dropped messages, jerk known analytically
+    def recording(n, rate=50.0, seed=0):
+        random = np.random.RandomState(seed)
+        t = np.arange(n) / rate + random.normal(0.0, 0.005 / rate, n)
+        # duplicated stamps
+        duplicates = random.randint(1, n, n / 1000 + 1)
+        t[duplicates] = t[duplicates - 1]
+        # dropped messages
+        keep = np.ones(n, dtype=bool)
+        for start in random.randint(0, n - 10, n / 500 + 1):
+            keep[start:start + random.randint(2, 8)] = False
+        t = t[keep]
+        # velocity on a circle: the jerk is omega^2
+        omega = 2 * np.pi * 0.2
+        A = np.column_stack((t, np.sin(omega * t), np.cos(omega * t)))
+        return A, omega ** 2
+
+    def jerk(A, mode):
+        if mode == 'scalar':
+            spacing = A[1, 0] - A[0, 0]
+        else:
+            A = A[increasing(A[:, 0])]
+            if mode == 'uniform':
+                A = resample(A, 0)
+                spacing = A[1, 0] - A[0, 0]
+            else:
+                spacing = A[:, 0]
+        n = A.shape[0]
+        acc = [smooth(gradient(A[:, j], spacing), 30, 'hanning')[:n] for j in [1, 2]]
+        return np.sqrt(gradient(acc[0], spacing) ** 2 + gradient(acc[1], spacing) ** 2)
+
+    print '{:>10} | {:>8} | {:>10} | {:>14} | {:>14}'.format('samples', 'mode', 'time [s]', 'max jerk',
+                                                             'max error')
+    for n in [10 ** 4, 10 ** 5, 10 ** 6]:
+        A, expected = recording(n)
+        number = max(1, 10 ** 5 / n)
+        for mode in MODES:
+            t = min(timeit.repeat(lambda: jerk(A, mode), number=number, repeat=3)) / number
+            with np.errstate(all='ignore'):
+                j = jerk(A, mode)
+            # boundaries of the smoothing are not compared
+            inner = j[50:-50]
+            print '{:>10} | {:>8} | {:>10.6f} | {:>14.4g} | {:>14.4g}'.format(n, mode, t, np.nanmax(inner),
+                                                                            np.nanmax(np.abs(inner - expected)))
@@ -6,26 +6,159 @@ Created on Aug 28, 2017
 @author: flg-ma
 @attention: Evaluate all bagfiles in one directory
 @contact: marcel.albus@ipa.fraunhofer.de (Marcel Albus)
-@version: 1.0.0
+@version: 2.0.0
 """
 
 from bcolors import TerminalColors as tc
+import argparse
+import multiprocessing
+import numpy as np
 import os
+import sys
 import glob
+import time
+
+# columns of the summary table
+# 'output': directory of the saved files ('-s'), the numbered directory a worker gets depends on the timing
+COLUMNS = ['file', 'result', 'max_jerk', 'max_jerk_time', 'violations', 'duration', 'samples', 'seconds', 'output',
+           'error']
 
-if __name__ == '__main__':
-    path = '/home/flg-ma/bagfiles/ipa-apartment/bags'
-    # files = [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
 
-    files = glob.glob(path + '/' + 'ipa-apartment*.bag')
-    main_file = '/home/flg-ma/PycharmProjects/jerk_metrics/jerk/main.py'
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Evaluate the jerk metrics of all bag-, csv- and binary files in a directory in parallel')
+    parser.add_argument('path', help='directory with bag-, csv- or binary files, or glob pattern e.g. '
+                                     '\'~/bags/ipa-*.bag\'',
+                        type=str)
+    parser.add_argument('-w', '--workers', help='number of worker processes, default: number of cores', type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument('-j', '--jerk', help='max allowed jerk for jerk metrics, default = 4.0 [m/s^3]', type=float,
+                        default=4.0)
+    parser.add_argument('-o', '--output', help='name and path of the summary csv-file, default: '
+                                               '\'batch_%%d_%%m_%%Y---%%H:%%M.csv\'', type=str)
+    parser.add_argument('-s', '--save', action='store_true',
+                        help='save csv-file and plots of every evaluated file in \'Data/*Timestamp*\'')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show terminal output of every evaluation')
+    return parser
 
+
+def find_files(path):
+    '''
+    :param path: directory or glob pattern
+    :return: sorted list of bag-, csv- and binary files
+    '''
+    path = os.path.expanduser(path)
+    if os.path.isdir(path):
+        files = glob.glob(os.path.join(path, '*.bag')) + glob.glob(os.path.join(path, '*.csv')) + \
+                glob.glob(os.path.join(path, '*.bin'))
+    else:
+        files = glob.glob(path)
     # sort alphabetically
     files.sort()
-    for f in files:
-        print tc.OKBLUE + '=' * (67 + f.__len__())
-        print main_file + ' -rb -bag ' + f + ' -s'
-        # evaluate all the bagfiles using the main.py programm
-        os.system(main_file + ' -rb -bag ' + f + ' -s')
+    return files
+
+
+def silence():
+    '''
+    pool initializer: discard terminal output of the evaluations
+    '''
+    sys.stdout = open(os.devnull, 'w')
+
+
+def evaluate(task):
+    '''
+    evaluate one file in a worker process, errors are returned as part of the result
+    :param task: tuple (filename, max allowed jerk, save results)
+    :return: dict with one value for every column in COLUMNS
+    '''
+    filename, max_jerk, save = task
+    start = time.time()
+    result = dict((column, '') for column in COLUMNS)
+    result['file'] = filename
+    try:
+        # plots are only saved, no display needed
+        import matplotlib
+        matplotlib.use('Agg')
+        import main
+        if filename.endswith('.bin'):
+            je = main.JerkEvaluation(['-npy', filename, '-j', str(max_jerk)])
+            je.read_data_binary(filename)
+        elif filename.endswith('.csv'):
+            je = main.JerkEvaluation(['-rc', '-csv', filename, '-j', str(max_jerk)])
+            je.read_data_csv(filename)
+        else:
+            je = main.JerkEvaluation(['-rb', '-bag', filename, '-j', str(max_jerk)])
+            je.read_data_bagfile(filename)
+        je.differentiation()
+        passed = je.jerk_metrics(max_jerk)
+        if save:
+            je.save_csv()
+            je.save_exceedances()
+            je.show_figures()
+            # already running in a worker process, the figures are written right here
+            je.figures.processes = 1
+            je.figures.write(wait=True)
+            result['output'] = je.dirpath
+
+        index = np.argmax(je.A_grad_smo_jerk)
+        result['result'] = 'passed' if passed else 'failed'
+        result['max_jerk'] = '{:.4f}'.format(je.A_grad_smo_jerk[index])
+        result['max_jerk_time'] = '{:.3f}'.format(je.A[index, main.AD.FHS])
+        result['violations'] = je.intervals.size
+        result['duration'] = '{:.3f}'.format(je.A[-1, main.AD.FHS] - je.A[0, main.AD.FHS])
+        result['samples'] = je.A.shape[0]
+    except Exception as e:
+        # one bad file must not stop the whole batch
+        result['result'] = 'error'
+        result['error'] = '{}: {}'.format(type(e).__name__, e).replace('\n', ' ').replace(',', ';')
+    result['seconds'] = '{:.3f}'.format(time.time() - start)
+    return result
+
+
+def evaluate_all(files, workers, max_jerk, output, save=False, verbose=False):
+    '''
+    evaluate all files in a process pool and write every result to the summary table as soon as it is finished
+    :return: list of results
+    '''
+    pool = multiprocessing.Pool(processes=workers, initializer=None if verbose else silence)
+    results = []
+    start = time.time()
+    with open(output, 'w') as summary:
+        summary.write(','.join(COLUMNS) + '\n')
+        tasks = [(f, max_jerk, save) for f in files]
+        for result in pool.imap_unordered(evaluate, tasks):
+            summary.write(','.join(str(result[column]) for column in COLUMNS) + '\n')
+            summary.flush()
+            results.append(result)
+            if result['result'] == 'passed':
+                colour = tc.OKGREEN
+            elif result['result'] == 'failed':
+                colour = tc.FAIL
+            else:
+                colour = tc.WARNING
+            print colour + '[{}/{}] {}: {} | max jerk: {} [m/s^3] | duration: {} [s] | {} [s] {}'.format(
+                len(results), len(files), result['file'], result['result'], result['max_jerk'], result['duration'],
+                result['seconds'], result['error']) + tc.ENDC
+    pool.close()
+    pool.join()
+
+    counts = dict((r, sum(1 for result in results if result['result'] == r)) for r in ['passed', 'failed', 'error'])
+    print tc.OKBLUE + '=' * 80
+    print 'Evaluated {} files in {:.3f} [s] with {} workers: {} passed, {} failed, {} errors'.format(
+        len(results), time.time() - start, workers, counts['passed'], counts['failed'], counts['error'])
+    print 'Summary: \'{}\''.format(output)
+    print '=' * 80 + tc.ENDC
+    return results
+
+
+if __name__ == '__main__':
+    args = build_parser().parse_args()
+    files = find_files(args.path)
+    if args.output is None:
+        args.output = 'batch_' + time.strftime("%d_%m_%Y---%H:%M") + '.csv'
+    print tc.OKBLUE + 'Found {} files in \'{}\''.format(len(files), args.path) + tc.ENDC
+    results = evaluate_all(files, max(args.workers, 1), args.jerk, args.output, args.save, args.verbose)
+    # like 'main.py': exit code 1 if a file failed or couldn't be evaluated
+    sys.exit(0 if all(result['result'] == 'passed' for result in results) else 1)
 
-pass
\ No newline at end of file
+pass
@@ -0,0 +1,189 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Intervals in which the jerk is above the max allowed jerk
+@version: 1.0.0
+"""
+
+import numpy as np
+
+# one row per interval, indices are inclusive
+# an interval lasts from its first sample until the first sample back in range (or the last sample of the recording)
+INTERVAL_DTYPE = np.dtype([('start_index', np.int64),
+                           ('end_index', np.int64),
+                           ('start_time', np.float64),
+                           ('end_time', np.float64),
+                           ('duration', np.float64),
+                           ('peak_jerk', np.float64),
+                           ('peak_time', np.float64)])
+
+
+def exceedance_intervals(jerk, stamps, max_jerk):
+    '''
+    find all intervals in which the jerk is above or equal to the max allowed jerk
+    :param jerk: smoothed jerk
+    :param stamps: stamps of the jerk values in [s]
+    :param max_jerk: max allowed jerk
+    :return: structured array with dtype INTERVAL_DTYPE
+    '''
+    tracker = ExceedanceTracker(max_jerk)
+    tracker.update(0, stamps, jerk)
+    return tracker.finish()
+
+
+class ExceedanceTracker:
+    def __init__(self, max_jerk):
+        '''
+        Collects the exceedance intervals of a jerk signal which arrives in consecutive blocks. Every block is
+        evaluated with a vectorized run-length pass, an interval reaching the end of a block is continued with the
+        next block.
+        :param max_jerk: max allowed jerk
+        '''
+        self.max_jerk = max_jerk
+        self.closed = []
+        # interval which reaches the end of the last block, as array with one row
+        self.open = None
+        self.last_stamp = None
+
+    def update(self, index, stamps, jerk):
+        '''
+        add the next block
+        :param index: global index of the first value of the block
+        :param stamps: stamps of the block in [s]
+        :param jerk: jerk values of the block
+        '''
+        jerk = np.asarray(jerk)
+        stamps = np.asarray(stamps)
+        n = jerk.shape[0]
+        if n == 0:
+            return
+        above = (jerk >= self.max_jerk).astype(np.int8)
+        edges = np.diff(np.concatenate(([0], above, [0])))
+        # first index of every run and first index after every run
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        if self.open is not None:
+            if starts.size > 0 and starts[0] == 0:
+                # first run continues the open interval
+                peak = np.argmax(jerk[:ends[0]])
+                if jerk[peak] > self.open['peak_jerk'][0]:
+                    self.open['peak_jerk'] = jerk[peak]
+                    self.open['peak_time'] = stamps[peak]
+                self.open['end_index'] = index + ends[0] - 1
+                close = ends[0]
+                starts, ends = starts[1:], ends[1:]
+            else:
+                close = 0
+            if close < n:
+                self.open['end_time'] = stamps[close]
+                self.open['duration'] = self.open['end_time'] - self.open['start_time']
+                self.closed.append(self.open)
+                self.open = None
+
+        if starts.size > 0:
+            # max of [start_k, start_k+1) is the peak of run k, values between two runs are below 'max_jerk'
+            peaks = np.maximum.reduceat(jerk, starts)
+            run_peak = np.repeat(peaks, np.diff(np.append(starts, n)))
+            matches = np.flatnonzero(jerk[starts[0]:] == run_peak) + starts[0]
+            peak_index = matches[np.searchsorted(matches, starts)]
+
+            runs = np.empty(starts.size, dtype=INTERVAL_DTYPE)
+            runs['start_index'] = index + starts
+            runs['end_index'] = index + ends - 1
+            runs['start_time'] = stamps[starts]
+            runs['end_time'] = stamps[np.minimum(ends, n - 1)]
+            runs['duration'] = runs['end_time'] - runs['start_time']
+            runs['peak_jerk'] = peaks
+            runs['peak_time'] = stamps[peak_index]
+            if ends[-1] == n:
+                # last run reaches the end of the block
+                self.open = runs[-1:].copy()
+                runs = runs[:-1]
+            if runs.size > 0:
+                self.closed.append(runs)
+        self.last_stamp = stamps[-1]
+
+    def first(self):
+        '''
+        :return: first interval as array with one row, None if jerk was always in range
+        '''
+        for runs in self.closed:
+            if runs.size > 0:
+                return runs[0]
+        if self.open is not None:
+            return self.open[0]
+        return None
+
+    def finish(self):
+        '''
+        end of recording: close the open interval at the last sample
+        :return: all intervals as structured array with dtype INTERVAL_DTYPE
+        '''
+        if self.open is not None:
+            self.open['end_time'] = self.last_stamp
+            self.open['duration'] = self.open['end_time'] - self.open['start_time']
+            self.closed.append(self.open)
+            self.open = None
+        return self.intervals()
+
+    def intervals(self):
+        '''
+        :return: all closed intervals as structured array with dtype INTERVAL_DTYPE
+        '''
+        if len(self.closed) == 0:
+            return np.empty(0, dtype=INTERVAL_DTYPE)
+        if len(self.closed) > 1:
+            self.closed = [np.concatenate(self.closed)]
+        return self.closed[0]
+
+
+# one row per threshold of a sweep, 'first_violation' is NaN if the jerk is always below the threshold
+SWEEP_DTYPE = np.dtype([('threshold', np.float64),
+                        ('passed', np.bool_),
+                        ('violations', np.int64),
+                        ('time_above', np.float64),
+                        ('first_violation', np.float64)])
+
+
+def threshold_sweep(jerk, stamps, thresholds):
+    '''
+    evaluate the jerk metrics for many max allowed jerks at once. The jerk values are sorted once, afterwards every
+    threshold is a binary search, so k thresholds cost O(n log n + k log n) instead of k full evaluations.
+    Violations and time above agree with 'exceedance_intervals' for every single threshold.
+    :param jerk: smoothed jerk
+    :param stamps: stamps of the jerk values in [s]
+    :param thresholds: sequence of max allowed jerks
+    :return: structured array with dtype SWEEP_DTYPE, one row per threshold
+    '''
+    jerk = np.asarray(jerk, dtype=np.float64)
+    stamps = np.asarray(stamps, dtype=np.float64)
+    thresholds = np.asarray(thresholds, dtype=np.float64).ravel()
+
+    # an interval starts at sample i for every threshold in (jerk[i - 1], jerk[i]]
+    lower = np.concatenate(([-np.inf], jerk[:-1]))
+    starts = lower < jerk
+    upper_sorted = np.sort(jerk[starts])
+    lower_sorted = np.sort(lower[starts])
+
+    # samples sorted by descending jerk: time above and first violation for the k largest values
+    order = np.argsort(-jerk, kind='mergesort')
+    jerk_desc = jerk[order]
+    # every sample lasts until the next one, the last sample ends the recording
+    durations = np.append(np.diff(stamps), 0.0)
+    time_above = np.concatenate(([0.0], np.cumsum(durations[order])))
+    first_stamp = np.concatenate(([np.nan], stamps[np.minimum.accumulate(order)]))
+
+    # number of samples with jerk >= threshold
+    above = np.searchsorted(-jerk_desc, -thresholds, side='right')
+
+    result = np.empty(thresholds.size, dtype=SWEEP_DTYPE)
+    result['threshold'] = thresholds
+    result['violations'] = ((upper_sorted.size - np.searchsorted(upper_sorted, thresholds, side='left')) -
+                            (lower_sorted.size - np.searchsorted(lower_sorted, thresholds, side='left')))
+    result['passed'] = above == 0
+    result['time_above'] = time_above[above]
+    result['first_violation'] = first_stamp[above]
+    return result
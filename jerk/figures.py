@@ -0,0 +1,240 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Figures written in parallel worker processes with a non-interactive backend
+@version: 1.0.0
+"""
+
+import numpy as np
+import multiprocessing
+import os
+import sys
+import traceback
+
+# width of the figures in pixels (16 inch with 100 dpi), every trace is reduced to its min and max per pixel
+PIXELS = 1600
+
+# specs of the figures which are written, set before the workers are forked, so they are not pickled
+_specs = []
+
+
+def pyplot():
+    '''
+    import pyplot on first use with the non-interactive backend, figures are only written to files
+    :return: module matplotlib.pyplot
+    '''
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+    return plt
+
+
+def min_max(y, buckets):
+    '''
+    min and max of every bucket, the shape of the trace is kept down to one pixel and no peak is lost
+    :param y: values of the trace
+    :param buckets: number of buckets of equal length
+    :return: sorted indices of the min and max of every bucket and of the first and last sample
+    '''
+    y = np.asarray(y)
+    n = y.size
+    if n <= 2 * buckets + 2:
+        return np.arange(n)
+    size = -(-n // buckets)
+    m = n // size * size
+    blocks = y[:m].reshape(-1, size)
+    offsets = np.arange(blocks.shape[0]) * size
+    indices = [offsets + np.argmin(blocks, axis=1), offsets + np.argmax(blocks, axis=1), [0, n - 1]]
+    if m < n:
+        indices.append([m + np.argmin(y[m:]), m + np.argmax(y[m:])])
+    return np.unique(np.concatenate(indices))
+
+
+def decimate(x, y, pixels, axSize='auto'):
+    '''
+    reduce a trace to the samples which are visible in a figure with 'pixels' pixels width
+    :param x: increasing x-axis values
+    :param y: y-axis values
+    :param pixels: width of the figure, None: all samples are kept
+    :param axSize: 'auto' or [x_min, x_max, y_min, y_max], only the samples in [x_min, x_max] are decimated
+    :return: x, y
+    '''
+    if pixels is None:
+        return x, y
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if axSize != 'auto':
+        # one sample outside on each side, so the line reaches the border of the axis
+        first = max(np.searchsorted(x, axSize[0], side='left') - 1, 0)
+        last = np.searchsorted(x, axSize[1], side='right') + 1
+        x = x[first:last]
+        y = y[first:last]
+    i = min_max(y, pixels)
+    return x[i], y[i]
+
+
+def annotate_max(x, y, unit, ax=None):
+    '''
+    adds a text-box to the plot with the max value for 'j' or 'v' printed out, form: 't=x, v=x'
+    :param x: x-axis values
+    :param y: y-axis values
+    :param unit: defines the unit of the plot, i.e. 'v' or 'j'
+    :param ax: plot axis on which the text box is added
+    '''
+    xmax = x[np.argmax(y)]
+    ymax = y.max()
+    x_max_string = '{:.3f}'.format(xmax)
+    y_max_string = '{:.3f}'.format(ymax)
+    text = '$\mathrm{t}=' + x_max_string + ',\;' + '\mathrm{' + unit + '_{max}}=' + y_max_string + '$'
+    if not ax:
+        ax = pyplot().gca()
+    bbox_props = dict(boxstyle="square,pad=0.3", fc="w", ec="k", lw=0.72)
+    kw = dict(xycoords='data', textcoords="axes fraction",
+              bbox=bbox_props, ha="left", va="top", size='x-large')
+    ax.annotate(text, xy=(xmax, ymax), xytext=(0.01, 0.96), **kw)
+
+
+def plot1figure(spec):
+    '''
+    plot data in one figure, see 'JerkEvaluation.plot1figure' for the entries of 'spec'
+    '''
+    plt = pyplot()
+    fig = plt.figure(spec['number'], figsize=(16.0, 10.0))
+    plt.plot(*decimate(spec['xAxis'], spec['yAxis'], spec['pixels'], spec['axSize']), color='r',
+             label=spec['legendLabel'])
+    plt.title(spec['title'], fontsize=20)
+    plt.xlabel(spec['xLabel'], fontsize=20)
+    plt.ylabel(spec['yLabel'], fontsize=20)
+    plt.grid(True)
+
+    if spec['axSize'] != 'auto':
+        plt.axis(spec['axSize'])
+
+    plt.legend(fontsize=15)
+    plt.savefig(spec['filename'], bbox_inches='tight')
+    plt.close(fig)
+
+
+def plot2Subplots(spec):
+    '''
+    plot 2 subplots in one figure, see 'JerkEvaluation.plot2Subplots' for the entries of 'spec'
+    '''
+    plt = pyplot()
+    fig = plt.figure(spec['number'], figsize=(16.0, 10.0))
+    ax1 = fig.add_subplot(211)
+    plt.plot(*decimate(spec['xAxis'], spec['yAxis1'], spec['pixels'], spec['axSize']), color='r',
+             label=spec['legendLabel1'])
+    plt.title(spec['title'], fontsize=20)
+    plt.ylabel(spec['yLabel1'], fontsize=20)
+    plt.grid(True)
+    if spec['axSize'] != 'auto':
+        plt.axis(spec['axSize'])
+    # legend: loc='best' sets legend to best location
+    plt.legend()
+    ax2 = fig.add_subplot(212)
+    plt.plot(*decimate(spec['xAxis'], spec['yAxis2'], spec['pixels'], spec['axSize']), color='g',
+             label=spec['legendLabel2'])
+    plt.xlabel(spec['xLabel'], fontsize=20)
+    plt.ylabel(spec['yLabel2'], fontsize=20)
+    plt.grid(True)
+    if spec['axSize'] != 'auto':
+        plt.axis(spec['axSize'])
+    # legend: loc='best' sets legend to best location
+    plt.legend()
+    # the max of the full trace, not of the decimated one
+    annotate_max(spec['xAxis'], spec['yAxis1'], 'v', ax1)
+    annotate_max(spec['xAxis'], spec['yAxis2'], 'j', ax2)
+    plt.savefig(spec['filename'], bbox_inches='tight')
+    plt.close(fig)
+
+
+def render(i):
+    '''
+    write figure number 'i' of '_specs', called in the workers
+    :return: name of the written file
+    '''
+    spec = _specs[i]
+    globals()[spec['kind']](spec)
+    return spec['filename']
+
+
+def render_all(specs, processes=None):
+    '''
+    write all figures in parallel worker processes
+    :param specs: list of figure specs
+    :param processes: number of workers, None: number of cpus
+    :return: names of the written files
+    '''
+    global _specs
+    if len(specs) == 0:
+        return []
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    _specs = specs
+    try:
+        if processes <= 1 or len(specs) == 1:
+            pyplot()
+            return [render(i) for i in xrange(len(specs))]
+        pool = multiprocessing.Pool(min(processes, len(specs)), initializer=pyplot)
+        try:
+            return pool.map(render, range(len(specs)))
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        _specs = []
+
+
+class FigureWriter:
+    def __init__(self, processes=None, pixels=PIXELS):
+        '''
+        Collects figure specs (data and labels of 'plot1figure' and 'plot2Subplots') and writes them in parallel
+        worker processes with the non-interactive backend 'Agg'.
+        :param processes: number of workers, None: number of cpus
+        :param pixels: traces are decimated to min and max per pixel (see 'decimate'), None: all samples are plotted
+        '''
+        self.processes = processes
+        self.pixels = pixels
+        self.specs = []
+
+    def add(self, kind, **spec):
+        '''
+        :param kind: 'plot1figure' or 'plot2Subplots'
+        :param spec: arguments of the plot, 'number' of the figure and 'filename' of the written file
+        '''
+        spec['kind'] = kind
+        spec['pixels'] = self.pixels
+        self.specs.append(spec)
+
+    def write(self, wait=False):
+        '''
+        write all collected figures
+        :param wait: True: return when all figures are written, False: figures are written by a background process
+                     which keeps running when this process exits
+        :return: pid of the background process, None if the figures are already written
+        '''
+        specs, self.specs = self.specs, []
+        if len(specs) == 0:
+            return None
+        if wait or not hasattr(os, 'fork'):
+            render_all(specs, self.processes)
+            return None
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                render_all(specs, self.processes)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        return pid
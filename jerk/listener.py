@@ -47,6 +47,8 @@ from nav_msgs.msg import Odometry
 import numpy as np
 import time
 from bcolors import TerminalColors as tc
+from sample_buffer import SampleBuffer
+from online_jerk import OnlineJerk
 
 
 class Sentence:
@@ -77,13 +79,17 @@ class Sentence:
 
 
 class NodeListener:
-    def __init__(self, topic='/base/odometry_controller/odometry'):
+    def __init__(self, topic='/base/odometry_controller/odometry', max_jerk=None, estimator='smooth', cutoff=1.4,
+                 order=4):
         self.topic = topic
         self.start_time = time.time()
         self.stop_time = None
-        # create array for further use
-        self.A_listener = np.ones([0, 8], dtype=np.float64)
+        # create buffer for further use
+        self.A_listener = SampleBuffer(columns=8)
         self.s = Sentence()
+        # smoothed jerk estimated while messages arrive, see 'OnlineJerk' for the delay
+        # estimator 'butter': acceleration filtered with a causal butterworth lowpass with 'cutoff' and 'order'
+        self.online = OnlineJerk(max_jerk, estimator=estimator, cutoff=cutoff, order=order)
 
     def callback(self, data):
         # global data_list
@@ -105,19 +111,27 @@ class NodeListener:
                      float(data.pose.pose.position.x),
                      float(data.pose.pose.position.y)]
 
-        # append data to array
-        self.A_listener = np.append(self.A_listener, [[data_list[0], data_list[1], data_list[2], data_list[3],
-                                                       data_list[4], data_list[5], data_list[6], data_list[7]]],
-                                    axis=0)
+        # append data to buffer
+        self.A_listener.append(data_list)
+
+        if self.online.update(data_list[2], data_list[3], data_list[4]):
+            print tc.FAIL + 'Jerk: {:.3f} [m/s^3] at time: {:.3f} [s] is bigger than max allowed jerk: {:.3f} [m/s^3] ' \
+                            '(delay: {:.1f} messages)'.format(self.online.jerk, data_list[2] - self.online.t0,
+                                                               self.online.max_jerk,
+                                                               self.online.delay) + tc.ENDC
 
         self.start_time = time.time()
-        if self.A_listener.shape[0] in xrange(0, 100000, 25):
-            print str(self.A_listener.shape) + ' ' + self.s.spin()
+        rows = len(self.A_listener)
+        if rows % 25 == 0 and rows < 100000:
+            if self.online.jerk is not None:
+                print str((rows, self.A_listener.columns)) + ' jerk: {:.3f} [m/s^3] '.format(
+                    self.online.jerk) + self.s.spin()
+            else:
+                print str((rows, self.A_listener.columns)) + ' ' + self.s.spin()
 
     def return_array(self):
-        # deletes first row of array, because first row is only 1
-        # return np.delete(A_listener, 0, 0)
-        return self.A_listener
+        # collected rows as one array, rows are copied once
+        return self.A_listener.to_array()
 
     def listener(self):
         # In ROS, nodes are uniquely named. If two nodes with the same
@@ -9,13 +9,20 @@ Created on Jul 10, 2017
 @version: 1.9.0
 """
 
-import csv
+# pandas, matplotlib, rosbag_pandas and listener (ROS) are imported where they are used, so every input mode only
+# loads its own dependencies and the arguments are parsed without them (see 'startup_time.py')
 import numpy as np
-import pandas as pd
-import rosbag_pandas as rp
-import matplotlib.pyplot as plt
+import block_jerk
+import exceedance
+import result_cache
+import binary_data
+import smoothing
+import derivatives
+import savitzky_golay
+import signals
+import figures
+from signals import derived
 import sys
-import listener
 import time
 from bcolors import TerminalColors as tc
 import argparse
@@ -23,6 +30,61 @@ import os
 import shutil
 
 
+def jerk_thresholds(value):
+    '''
+    parse max allowed jerk from commandline: a single value, e.g. '4.0', or a range 'start:stop:step' including stop,
+    e.g. '2:6:0.5'
+    :param value: commandline string
+    :return: list of max allowed jerks
+    '''
+    parts = value.split(':')
+    try:
+        if len(parts) == 1:
+            return [float(value)]
+        if len(parts) == 3:
+            start, stop, step = [float(part) for part in parts]
+            if step > 0 and stop >= start:
+                return list(np.arange(start, stop + step / 2.0, step))
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError('\'{}\' is neither a number nor a range \'start:stop:step\''.format(value))
+
+
+def smoothing_windows(value):
+    '''
+    parse smoothing windows from commandline: 'window:len', e.g. 'hanning:30', or a range of lengths
+    'window:start:stop:step' including stop, e.g. 'flat:10:50:10'. Without window 'hanning' is used.
+    :param value: commandline string
+    :return: list of (window, window_len)
+    '''
+    parts = value.split(':')
+    if parts[0] in smoothing.WINDOWS:
+        window = parts.pop(0)
+    else:
+        window = 'hanning'
+    try:
+        if len(parts) == 1:
+            return [(window, int(parts[0]))]
+        if len(parts) == 3:
+            start, stop, step = [int(part) for part in parts]
+            if step > 0 and stop >= start:
+                return [(window, window_len) for window_len in xrange(start, stop + 1, step)]
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError('\'{}\' is neither \'window:len\' nor \'window:start:stop:step\', window is one '
+                                     'of {}'.format(value, smoothing.WINDOWS))
+
+
+# one row per smoothing window of a smoothing sweep
+WINDOW_SWEEP_DTYPE = np.dtype([('window', 'S8'),
+                               ('window_len', np.int64),
+                               ('max_jerk', np.float64),
+                               ('max_time', np.float64),
+                               ('passed', np.bool_),
+                               ('violations', np.int64),
+                               ('time_above', np.float64)])
+
+
 # AD stands for ArrayData
 class AD(enumerate):
     TIME = 0  # time = '%time'
@@ -37,11 +99,19 @@ class AD(enumerate):
 
 # class for evaluating the jerk metrics
 class JerkEvaluation:
-    def __init__(self):
+    # signals calculated by 'differentiation', all other signals are only calculated when they are used
+    results = ['A_grad_smo_acc', 'A_grad_smo_jerk']
+
+    def __init__(self, args=None):
+        '''
+        :param args: list of commandline arguments, None: arguments of 'sys.argv' are used
+        '''
         # number counter for figures
         self.n = 1
         # smoothing parameter value [30 is good value]
         self.smo_para = 30
+        # window used for smoothing
+        self.window = 'hanning'
         self.timeformat = "%d_%m_%Y---%H:%M"
 
         # path where the data is saved
@@ -62,40 +132,97 @@ class JerkEvaluation:
         # create array
         self.A = np.ones([0, 8], dtype=np.float64)
 
-        self.A_grad_vel = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_vel_x = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_vel_y = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_vel_smo = np.ones([0, 8], dtype=np.float64)
-
-        self.A_grad_acc = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_acc_x = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_acc_y = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_acc_smo = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_smo_acc = np.ones([0, 8], dtype=np.float64)
-
-        self.A_grad_jerk = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_jerk_x = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_jerk_y = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_jerk_smo = np.ones([0, 8], dtype=np.float64)
-        self.A_grad_smo_jerk = np.ones([0, 8], dtype=np.float64)
-
-        self.A_diff = np.ones([0, 8], dtype=np.double)
-        self.args = self.build_parser().parse_args()
+        # all differentiated data ('A_grad_*', 'A_diff') is calculated from A on first use, see 'differentiation'
+
+        # intervals with jerk above max allowed jerk, see 'exceedance.INTERVAL_DTYPE'
+        self.intervals = np.empty(0, dtype=exceedance.INTERVAL_DTYPE)
+        # result of a sweep over many max allowed jerks, see 'exceedance.SWEEP_DTYPE'
+        self.sweep = None
+        # result of a sweep over many smoothing windows, see 'WINDOW_SWEEP_DTYPE'
+        self.window_sweep = None
+        # path and name of the saved csv-file without ending
+        self.csv_stem = None
+        self.args = self.build_parser().parse_args(args)
+        # how stamps are used for differentiation, see 'derivatives.MODES'
+        self.derivative = self.args.derivative
+        # sample rate of the uniform grid in [Hz] for derivative 'uniform', None: median sample rate
+        self.rate = self.args.rate
+        # estimator of smoothed acceleration and jerk, see 'derivatives.ESTIMATORS'
+        self.estimator = self.args.estimator
+        # order of the polynomials of estimator 'savgol'
+        self.polyorder = self.args.polyorder
+        # cutoff frequency in [Hz] and order of the lowpass of estimator 'butter'
+        self.cutoff = self.args.cutoff
+        self.filter_order = self.args.filter_order
+
+        # cache for read and differentiated data, None: nothing is cached
+        self.cache = None
+        if not self.args.no_cache:
+            self.cache = result_cache.ResultCache(self.args.cache_dir, self.args.cache_size * 1024 ** 2)
+        # key of the read data in the cache, None: data wasn't read from a file
+        self.cache_key = None
+        # figures of '-s' are written in parallel by 'self.figures.write'
+        self.figures = figures.FigureWriter(self.args.figure_processes,
+                                            None if self.args.exact_figures else figures.PIXELS)
 
     def build_parser(self):
         parser = argparse.ArgumentParser(
             description='Calculate jerk from a given topic publishing velocity. Standard: subscribe to topic \'/base/odometry_controller/odometry\'')
         # group = parser.add_mutually_exclusive_group()
-        parser.add_argument('-j', '--jerk', help='max allowed jerk for jerk metrics, default = 4.0 [m/s^3]', type=float)
+        parser.add_argument('-j', '--jerk', nargs='+', type=jerk_thresholds,
+                            help='max allowed jerk for jerk metrics, default = 4.0 [m/s^3]. Multiple values or ranges '
+                                 '\'start:stop:step\' are evaluated in one sweep, e.g. \'-j 3 4 5\' or \'-j 2:6:0.5\'')
         parser.add_argument('-s', '--show_figures', action='store_true', help='show generated plots')
+        parser.add_argument('-af', '--all_figures', action='store_true',
+                            help='with \'-s\': also plot position, velocity and the intermediate acceleration and jerk')
+        parser.add_argument('-wf', '--wait_figures', action='store_true',
+                            help='with \'-s\': wait until all figures are written, otherwise they are written by a '
+                                 'background process after the result is printed')
+        parser.add_argument('-ef', '--exact_figures', action='store_true',
+                            help='plot every sample, otherwise long traces are reduced to min and max per pixel')
+        parser.add_argument('-fp', '--figure_processes', help='number of processes writing the figures, default: '
+                                                              'number of cpus', type=int)
         parser.add_argument('-t', '--topic',
                             help='topic name to subscribe to, default: /base/odometry_controller/odometry', type=str,
                             default='/base/odometry_controller/odometry')
         parser.add_argument('-csv', '--load_csv', help='name and path to csv-file e.g.: \'~/test.csv\'', type=str,
                             default='Ingolstadt_Test3.csv')
         parser.add_argument('-bag', '--load_bag', help='name and path to bag-file e.g.: \'~/test.bag\'', type=str)
+        parser.add_argument('-npy', '--load_binary',
+                            help='name and path to binary file written by \'binary_data.py\' e.g.: \'~/test.bin\', '
+                                 'it is read instead of csv- or bag-file', type=str)
         parser.add_argument('-rc', '--read_csv', action='store_true', help='if flag is true a csv-file is read')
         parser.add_argument('-rb', '--read_bag', action='store_true', help='if flag is true a bag-file is read')
+        parser.add_argument('-cs', '--chunk_size',
+                            help='evaluate csv-file in blocks of CHUNK_SIZE rows with bounded memory, no plots',
+                            type=int)
+        parser.add_argument('-sw', '--smoothing_windows', nargs='+', type=smoothing_windows,
+                            help='evaluate the jerk metrics for many smoothing windows at once, only with '
+                                 '\'-e smooth\', e.g. \'-sw hanning:10:50:10 flat:30\'')
+        parser.add_argument('-dm', '--derivative', choices=derivatives.MODES, default='stamps',
+                            help='\'scalar\': one sample time from the first two stamps, \'stamps\': differences of '
+                                 'the real stamps, \'uniform\': resample to a uniform grid first, default: stamps')
+        parser.add_argument('-r', '--rate', help='sample rate of the uniform grid for \'-dm uniform\' in [Hz], '
+                                                 'default: median sample rate of the data', type=float)
+        parser.add_argument('-e', '--estimator', choices=derivatives.ESTIMATORS, default='smooth',
+                            help='\'smooth\': gradient, smoothing window and gradient, \'savgol\': acceleration and '
+                                 'jerk from the velocity with one Savitzky-Golay filter each, \'butter\': gradient, '
+                                 'zero-phase butterworth lowpass and gradient, default: smooth')
+        parser.add_argument('-po', '--polyorder', help='order of the polynomials for \'-e savgol\', default = {}'.format(
+            savitzky_golay.POLYORDER), type=int, default=savitzky_golay.POLYORDER)
+        # 1.4 Hz forward and backward: same -3 dB frequency (1.25 Hz) as the hanning window with 30 samples at 50 Hz
+        parser.add_argument('-fc', '--cutoff', help='cutoff frequency of the lowpass for \'-e butter\', default = 1.4 '
+                                                    '[Hz]', type=float, default=1.4)
+        parser.add_argument('-fo', '--filter_order', help='order of the lowpass for \'-e butter\', doubled by '
+                                                          'filtering forward and backward, default = 4', type=int,
+                            default=4)
+        parser.add_argument('-nc', '--no_cache', action='store_true',
+                            help='neither load read and differentiated data from cache nor store it')
+        parser.add_argument('-cc', '--clear_cache', action='store_true', help='remove all entries from the cache')
+        parser.add_argument('--cache_dir', help='directory of the cache, default: \'~/.cache/jerk_metrics\'',
+                            type=str)
+        parser.add_argument('--cache_size', help='max size of the cache, default = 1024 [MB]', type=int,
+                            default=1024)
         # parser.add_argument('-rt', '--read_topic', action='store_true',
         #                    help='if flag is true it will be subscribed to given topic')
         # self.args = parser.parse_args()
@@ -116,20 +243,9 @@ class JerkEvaluation:
         :param show: shall plot be shown? 1: yes / 2: no
         """
         if show == 1:
-            plt.figure(self.n, figsize=(16.0, 10.0))
-            plt.plot(xAxis, yAxis, 'r', label=legendLabel)
-            plt.title(title, fontsize=20)
-            plt.xlabel(xLabel, fontsize=20)
-            plt.ylabel(yLabel, fontsize=20)
-            plt.grid(True)
-
-            if axSize != 'auto':
-                plt.axis(axSize)
-
-            plt.legend(fontsize=15)
-            plt.savefig(
-                self.dirpath + '/' + title.lower().replace(' ', '_') + '_' + time.strftime(self.timeformat) + '.pdf',
-                bbox_inches='tight')
+            self.figures.add('plot1figure', number=self.n, filename=self.figure_filename(title), xAxis=xAxis,
+                             yAxis=yAxis, legendLabel=legendLabel, xLabel=xLabel, yLabel=yLabel, title=title,
+                             axSize=axSize)
 
             # increment figure number counter
             self.n += 1
@@ -157,38 +273,22 @@ class JerkEvaluation:
         """
 
         if show == 1:
-            fig = plt.figure(self.n, figsize=(16.0, 10.0))
-            # plt.subplot(211)
-            ax1 = fig.add_subplot(211)
-            plt.plot(xAxis, yAxis1, 'r', label=legendLabel1)
-            plt.title(title, fontsize=20)
-            plt.ylabel(yLabel1, fontsize=20)
-            plt.grid(True)
-            if axSize != 'auto':
-                plt.axis(axSize)
-            # legend: loc='best' sets legend to best location
-            plt.legend()
-            # plt.subplot(212)
-            ax2 = fig.add_subplot(212)
-            plt.plot(xAxis, yAxis2, 'g', label=legendLabel2)
-            plt.xlabel(xLabel, fontsize=20)
-            plt.ylabel(yLabel2, fontsize=20)
-            plt.grid(True)
-            if axSize != 'auto':
-                plt.axis(axSize)
-            # legend: loc='best' sets legend to best location
-            plt.legend()
-            self.annotate_max(xAxis, yAxis1, 'v', ax1)
-            self.annotate_max(xAxis, yAxis2, 'j', ax2)
-            plt.savefig(
-                self.dirpath + '/' + title.lower().replace(' ', '_') + '_' + time.strftime(self.timeformat) + '.pdf',
-                bbox_inches='tight')
+            self.figures.add('plot2Subplots', number=self.n, filename=self.figure_filename(title), xAxis=xAxis,
+                             yAxis1=yAxis1, yAxis2=yAxis2, legendLabel1=legendLabel1, legendLabel2=legendLabel2,
+                             xLabel=xLabel, yLabel1=yLabel1, yLabel2=yLabel2, title=title, axSize=axSize)
 
             # increment figure number counter
             self.n += 1
         else:
             pass
 
+    def figure_filename(self, title):
+        '''
+        :param title: title of the plot
+        :return: path and name of the pdf-file of the plot
+        '''
+        return self.dirpath + '/' + title.lower().replace(' ', '_') + '_' + time.strftime(self.timeformat) + '.pdf'
+
     def annotate_max(self, x, y, unit, ax=None):
         '''
         adds a text-box to the plot with the max value for 'j' or 'v' printed out, form: 't=x, v=x'
@@ -197,73 +297,64 @@ class JerkEvaluation:
         :param unit: defines the unit of the plot, i.e. 'v' or 'j'
         :param ax: plot axis on which the text box is added
         '''
-        xmax = x[np.argmax(y)]
-        ymax = y.max()
-        x_max_string = '{:.3f}'.format(xmax)
-        y_max_string = '{:.3f}'.format(ymax)
-        text = '$\mathrm{t}=' + x_max_string + ',\;' + '\mathrm{' + unit + '_{max}}=' + y_max_string + '$'
-        if not ax:
-            ax = plt.gca()
-        bbox_props = dict(boxstyle="square,pad=0.3", fc="w", ec="k", lw=0.72)
-        # arrowprops = dict(arrowstyle="->", connectionstyle="angle,angleA=0,angleB=60")
-        # kw = dict(xycoords='data', textcoords="axes fraction",
-        #           arrowprops=arrowprops, bbox=bbox_props, ha="right", va="top")
-        kw = dict(xycoords='data', textcoords="axes fraction",
-                  bbox=bbox_props, ha="left", va="top", size='x-large')
-        ax.annotate(text, xy=(xmax, ymax), xytext=(0.01, 0.96), **kw)
+        figures.annotate_max(x, y, unit, ax)
 
     # plot the specified figures
     def show_figures(self):
-        # plot position
-        self.plot2Subplots(self.A[:, AD.FHS], self.A[:, AD.POS_X], self.A[:, AD.POS_Y],
-                           '$\mathrm{Pos_x}$', '$\mathrm{Pos_y}$', 'Time [s]', '$\mathrm{x\;[m]}$',
-                           '$\mathrm{y\;[m]}$', 'Position', axSize='auto', show=0)
-
-        # plot velocity odometry controller
-        self.plot2Subplots(self.A[:, AD.FHS], self.A[:, AD.VEL_X], self.A[:, AD.VEL_Y],
-                           '$\mathrm{v_x}$', '$\mathrm{v_y}$', 'Time [s]', '$\mathrm{v\;[m/s]}$', '$\mathrm{v\;[m/s]}$',
-                           title='Velocity', show=0)
-
-        # plot velocity (x^2+y^2)^0.5 diff
-        self.plot2Subplots(self.A[:-1, AD.FHS], np.sqrt(self.A_diff[:, AD.POS_X] ** 2 + self.A_diff[:, AD.POS_Y] ** 2),
-                           np.sqrt(self.A[:-1, AD.VEL_X] ** 2 + self.A[:-1, AD.VEL_Y] ** 2),
-                           '$\mathrm{v_{x,diff,root}}$', '$\mathrm{v_{x,odo,root}}$', 'Time [s]', '$\mathrm{v\;[m/s]}$',
-                           '$\mathrm{v\;[m/s]}$', title='Velocity calculated using \'diff\'', show=0)
-
-        # plot velocity (x^2+y^2)^0.5 gradient
-        self.plot2Subplots(self.A[:, AD.FHS], self.A_grad_vel[:, ],
-                           np.sqrt(self.A[:, AD.VEL_X] ** 2 + self.A[:, AD.VEL_Y] ** 2),
-                           '$\mathrm{v_{x,grad,root}}$', '$\mathrm{v_x{x,odo,root}}$', 'Time [s]',
-                           '$\mathrm{v\;[m/s]}$', '$\mathrm{v\;[m/s]}$', title='Velocity calculated using \'gradient\'',
-                           axSize=[0, 73, -.05, .3], show=0)
-
-        # plot acceleration diff: x,y
-        self.plot2Subplots(self.A[:-1, AD.FHS], self.A_diff[:, AD.VEL_X], self.A_diff[:, AD.VEL_Y],
-                           '$a_x$', '$a_y$', 'Time [s]', '$\mathrm{a\;[m/s^2]}$', '$\mathrm{a\;[m/s^2]}$',
-                           'Acceleration', axSize='auto', show=0)
-
-        # plot diff and gradient method comparison for acceleration
-        self.plot2Subplots(self.A[:-1, AD.FHS], self.A_grad_acc[:-1, ],
-                           np.sqrt(self.A_diff[:, AD.VEL_X] ** 2 + self.A_diff[:, AD.VEL_Y] ** 2),
-                           '$\mathrm{a_{grad}}$', '$\mathrm{a_{diff}}$', 'Time [s]', '$\mathrm{a\;[m/s^2]}$',
-                           '$\mathrm{a\;[m/s^2]}$', 'Diff_Grad', axSize='auto', show=0)
-
-        # plot acceleration smoothed and noisy signal
-        self.plot2Subplots(self.A[:, AD.FHS], self.A_grad_acc_smo[:, ],
-                           self.A_grad_acc[:, ], '$\mathrm{a_{grad,smoothed}}$', '$\mathrm{a_{grad,noisy}}$',
-                           'Time [s]', '$\mathrm{a\;[m/s^2]}$', '$\mathrm{a\;[m/s^2]}$',
-                           'Acceleration', axSize=[0, 80, -.1, 1.0], show=0)
-
-        # plot acceleration x,y separately
-        self.plot2Subplots(self.A[:, AD.FHS], self.A_grad_acc_x, self.A_grad_acc_y, '$a_{grad,x}$', '$a_{grad,y}$',
-                           'Time [s]', '$\mathrm{a\;[m/s^2]}$', '$\mathrm{a\;[m/s^2]}$',
-                           title='Acceleration: x,y direction', show=0)
-
-        # plot jerk smoothed and noisy: 30 is good value for smoothing
-        self.plot2Subplots(self.A[:, AD.FHS], self.A_grad_smo_jerk[:, ],
-                           self.A_grad_jerk[:, ], '$\mathrm{j_{grad,smooth}}$', '$\mathrm{j_{grad,noisy}}$',
-                           'Time [s]', '$\mathrm{j\;[m/s^3]}$', '$\mathrm{j\;[m/s^3]}$',
-                           'Jerk', axSize=[0, 80, -.5, 15], show=0)
+        # figures of the intermediate signals, only with '-af', otherwise their signals are not calculated
+        if self.args.all_figures:
+            # plot position
+            self.plot2Subplots(self.A[:, AD.FHS], self.A[:, AD.POS_X], self.A[:, AD.POS_Y],
+                               '$\mathrm{Pos_x}$', '$\mathrm{Pos_y}$', 'Time [s]', '$\mathrm{x\;[m]}$',
+                               '$\mathrm{y\;[m]}$', 'Position', axSize='auto', show=1)
+
+            # plot velocity odometry controller
+            self.plot2Subplots(self.A[:, AD.FHS], self.A[:, AD.VEL_X], self.A[:, AD.VEL_Y],
+                               '$\mathrm{v_x}$', '$\mathrm{v_y}$', 'Time [s]', '$\mathrm{v\;[m/s]}$',
+                               '$\mathrm{v\;[m/s]}$', title='Velocity', show=1)
+
+            # plot velocity (x^2+y^2)^0.5 diff
+            self.plot2Subplots(self.A[:-1, AD.FHS],
+                               np.sqrt(self.A_diff[:, AD.POS_X] ** 2 + self.A_diff[:, AD.POS_Y] ** 2),
+                               np.sqrt(self.A[:-1, AD.VEL_X] ** 2 + self.A[:-1, AD.VEL_Y] ** 2),
+                               '$\mathrm{v_{x,diff,root}}$', '$\mathrm{v_{x,odo,root}}$', 'Time [s]',
+                               '$\mathrm{v\;[m/s]}$', '$\mathrm{v\;[m/s]}$', title='Velocity calculated using \'diff\'',
+                               show=1)
+
+            # plot velocity (x^2+y^2)^0.5 gradient
+            self.plot2Subplots(self.A[:, AD.FHS], self.A_grad_vel[:, ],
+                               np.sqrt(self.A[:, AD.VEL_X] ** 2 + self.A[:, AD.VEL_Y] ** 2),
+                               '$\mathrm{v_{x,grad,root}}$', '$\mathrm{v_x{x,odo,root}}$', 'Time [s]',
+                               '$\mathrm{v\;[m/s]}$', '$\mathrm{v\;[m/s]}$',
+                               title='Velocity calculated using \'gradient\'', axSize=[0, 73, -.05, .3], show=1)
+
+            # plot acceleration diff: x,y
+            self.plot2Subplots(self.A[:-1, AD.FHS], self.A_diff[:, AD.VEL_X], self.A_diff[:, AD.VEL_Y],
+                               '$a_x$', '$a_y$', 'Time [s]', '$\mathrm{a\;[m/s^2]}$', '$\mathrm{a\;[m/s^2]}$',
+                               'Acceleration', axSize='auto', show=1)
+
+            # plot diff and gradient method comparison for acceleration
+            self.plot2Subplots(self.A[:-1, AD.FHS], self.A_grad_acc[:-1, ],
+                               np.sqrt(self.A_diff[:, AD.VEL_X] ** 2 + self.A_diff[:, AD.VEL_Y] ** 2),
+                               '$\mathrm{a_{grad}}$', '$\mathrm{a_{diff}}$', 'Time [s]', '$\mathrm{a\;[m/s^2]}$',
+                               '$\mathrm{a\;[m/s^2]}$', 'Diff_Grad', axSize='auto', show=1)
+
+            # plot acceleration smoothed and noisy signal
+            self.plot2Subplots(self.A[:, AD.FHS], self.A_grad_acc_smo[:, ],
+                               self.A_grad_acc[:, ], '$\mathrm{a_{grad,smoothed}}$', '$\mathrm{a_{grad,noisy}}$',
+                               'Time [s]', '$\mathrm{a\;[m/s^2]}$', '$\mathrm{a\;[m/s^2]}$',
+                               'Acceleration Smoothed', axSize=[0, 80, -.1, 1.0], show=1)
+
+            # plot acceleration x,y separately
+            self.plot2Subplots(self.A[:, AD.FHS], self.A_grad_acc_x, self.A_grad_acc_y, '$a_{grad,x}$',
+                               '$a_{grad,y}$', 'Time [s]', '$\mathrm{a\;[m/s^2]}$', '$\mathrm{a\;[m/s^2]}$',
+                               title='Acceleration: x,y direction', show=1)
+
+            # plot jerk smoothed and noisy: 30 is good value for smoothing
+            self.plot2Subplots(self.A[:, AD.FHS], self.A_grad_smo_jerk[:, ],
+                               self.A_grad_jerk[:, ], '$\mathrm{j_{grad,smooth}}$', '$\mathrm{j_{grad,noisy}}$',
+                               'Time [s]', '$\mathrm{j\;[m/s^3]}$', '$\mathrm{j\;[m/s^3]}$',
+                               'Jerk', axSize=[0, 80, -.5, 15], show=1)
 
         # plot complete jerk smoothed
         self.plot1figure(self.A[:, AD.FHS], self.A_grad_smo_jerk,
@@ -280,14 +371,14 @@ class JerkEvaluation:
 
     # plot smoothing comparison between 1x and 2x smoothing
     def smoothing_times_plot(self):
+        import matplotlib.pyplot as plt
         plt.figure(self.n, figsize=(16.0, 10.0))
         plt.plot(self.A[:, AD.TIME], self.A[:, AD.VEL_X], 'r',
                  label='$v_{normal}$')
-        plt.plot(self.A[:, AD.TIME], self.smooth(self.A[:, AD.VEL_X], 30, window='hanning'),
-                 label='$v_{smooth,1\,times}$')
-        plt.plot(self.A[:, AD.TIME], self.smooth(
-            self.smooth(self.A[:, AD.VEL_X], 10, window='hanning'),
-            50, window='hamming'), label='$v_{smooth,2\,times}$')
+        smoothed = smoothing.smooth_many(self.A[:, AD.VEL_X], [('hanning', 30), ('hanning', 10)])
+        plt.plot(self.A[:, AD.TIME], smoothed[0], label='$v_{smooth,1\,times}$')
+        plt.plot(self.A[:, AD.TIME], self.smooth(smoothed[1], 50, window='hamming'),
+                 label='$v_{smooth,2\,times}$')
         plt.grid(True)
         plt.xlabel('Time [s]', fontsize=20)
         plt.ylabel('$\mathrm{v\;[m/s3]}$', fontsize=20)
@@ -300,10 +391,12 @@ class JerkEvaluation:
 
     # plot jerk comparison between smoothed and noisy signal
     def jerk_comparison(self):
+        import matplotlib.pyplot as plt
         plt.figure(self.n, figsize=(16.0, 10.0))
-        for i in [10, 20, 30, 40, 50]:
-            plt.plot(self.A[:, AD.FHS], self.smooth(self.A_grad_jerk[:, ], i, window='hanning'),
-                     label='$\mathrm{j_{grad,smooth,' + str(i) + '}}$')
+        lengths = [10, 20, 30, 40, 50]
+        smoothed = smoothing.smooth_many(self.A_grad_jerk, [('hanning', i) for i in lengths])
+        for i, jerk in zip(lengths, smoothed):
+            plt.plot(self.A[:, AD.FHS], jerk, label='$\mathrm{j_{grad,smooth,' + str(i) + '}}$')
             plt.xlabel('Time [s]', fontsize=20)
             plt.ylabel('$\mathrm{j\;[m/s^3]}$', fontsize=20)
             plt.grid(True)
@@ -319,12 +412,7 @@ class JerkEvaluation:
         self.n += 1
 
     def smooth(self, x, window_len=11, window='hanning'):
-        """smooth the data using a window with requested size.
-
-        This method is based on the convolution of a scaled window with the signal.
-        The signal is prepared by introducing reflected copies of the signal
-        (with the window size) in both ends so that transient parts are minimized
-        in the begining and end part of the output signal.
+        """smooth the data using a window with requested size, see 'smoothing.smooth'
 
         input:
             x: the input signal
@@ -334,45 +422,86 @@ class JerkEvaluation:
 
         output:
             the smoothed signal
-
-        example:
-
-        t=linspace(-2,2,0.1)
-        x=sin(t)+randn(len(t))*0.1
-        y=smooth(x)
-
-        see also:
-
-        numpy.hanning, numpy.hamming, numpy.bartlett, numpy.blackman, numpy.convolve
-        scipy.signal.lfilter
-
-        TODO: the window parameter could be the window itself if an array instead of a string
-        NOTE: length(output) != length(input), to correct this: return y[(window_len/2-1):-(window_len/2)] instead of just y.
         """
+        return smoothing.smooth(x, window_len, window)
 
-        if x.ndim != 1:
-            raise ValueError, "smooth only accepts 1 dimension arrays."
-
-        if x.size < window_len:
-            raise ValueError, "Input vector needs to be bigger than window size."
-
-        if window_len < 3:
-            return x
-
-        if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']:
-            raise ValueError, "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
-
-        s = np.r_[x[window_len - 1:0:-1], x, x[-2:-window_len - 1:-1]]
-        # print(len(s))
-        if window == 'flat':  # moving average
-            w = np.ones(window_len, 'd')
-        else:
-            w = eval('np.' + window + '(window_len)')
-
-        y = np.convolve(w / w.sum(), s, mode='valid')
+    def load_csv_columns(self, filename):
+        '''
+        read only the columns in 'self.data' from a csv-file in one pass using the pandas c-parser
+        '%time' and 'field.header.stamp' are parsed as int64 nanoseconds, all other columns as float64
+        :param filename: path to csv-file
+        :return: DataFrame with the columns of 'self.data' in the same order
+        '''
+        # imported here, like all pandas imports: not needed to parse the arguments
+        import pandas as pd
+        dtypes = self.csv_dtypes()
+        try:
+            df = pd.read_csv(filename, usecols=self.data, dtype=dtypes, engine='c')
+        except (ValueError, OverflowError):
+            # csv-file contains repeated header rows or stamps which are no integers
+            df = self.convert_csv_columns(pd.read_csv(filename, usecols=self.data, dtype=str, engine='c'), dtypes)
+        return df[self.data]
+
+    def read_csv_chunks(self, filename, chunk_size):
+        '''
+        read the columns in 'self.data' from a csv-file in blocks of 'chunk_size' rows, typed like
+        'load_csv_columns'. From the first block with repeated header rows or stamps which are no integers on, the
+        rest of the file is read as text and converted like in 'load_csv_columns'.
+        :param filename: path to csv-file
+        :param chunk_size: number of rows read at once
+        :return: generator of DataFrames with the columns of 'self.data' in the same order
+        '''
+        import pandas as pd
+        dtypes = self.csv_dtypes()
+        rows = 0
+        try:
+            for chunk in pd.read_csv(filename, usecols=self.data, dtype=dtypes, engine='c', chunksize=chunk_size):
+                rows += len(chunk)
+                yield chunk[self.data]
+            return
+        except (ValueError, OverflowError):
+            pass
+        # all rows read so far could be converted, so the text reader starts after them (line 0 is the header)
+        for chunk in pd.read_csv(filename, usecols=self.data, dtype=str, engine='c', chunksize=chunk_size,
+                                 skiprows=lambda line: 0 < line <= rows):
+            chunk = self.convert_csv_columns(chunk, dtypes)
+            if len(chunk) > 0:
+                yield chunk[self.data]
+
+    def csv_dtypes(self):
+        '''
+        :return: dtypes of the columns in 'self.data': '%time' and 'field.header.stamp' as int64 nanoseconds, all
+                 other columns as float64
+        '''
+        dtypes = dict((name, np.float64) for name in self.data)
+        dtypes[self.time] = np.int64
+        dtypes[self.fhs] = np.int64
+        return dtypes
 
-        return y[(window_len / 2 - 1):-(window_len / 2)]
-        # return y
+    def convert_csv_columns(self, df, dtypes):
+        '''
+        drop repeated header rows from a csv-file read as text and convert column by column, stamps which are no
+        integers are converted to float64
+        :param df: DataFrame read with dtype str
+        :param dtypes: dtypes of the columns, see 'csv_dtypes'
+        :return: converted DataFrame
+        '''
+        df = df[df[self.time] != self.time].copy()
+        for name in self.data:
+            try:
+                df[name] = df[name].astype(dtypes[name])
+            except (ValueError, OverflowError):
+                df[name] = df[name].astype(np.float64)
+        return df
+
+    def stamps_to_seconds(self, stamps):
+        '''
+        convert nanosecond stamps to seconds starting at 0s
+        the offset is subtracted before scaling, so int64 stamps keep their full precision
+        :param stamps: array with stamps in [ns]
+        :return: float64 array in [s]
+        '''
+        return (stamps - stamps[0]) * 10 ** -9
 
     # read data from .csv-file
     def read_data_csv(self, filename):
@@ -385,67 +514,136 @@ class JerkEvaluation:
         global m_A
         global n_A
 
-        with open(filename, 'rb') as csvfile:
-            odometry_reader = csv.DictReader(csvfile, delimiter=',')
-            # column_names_csv is of type 'list'
-            column_names_csv = odometry_reader.fieldnames
-            # get number of rows in csv-file
-            row_number = sum(1 for line in odometry_reader)
-            A = np.zeros([row_number, self.data.__len__()], dtype=np.float64)
-            # set pointer to first row
-            csvfile.seek(0)
-            # jump over first now with names
-            odometry_reader.next()
-
-            i = 0
-            for row in odometry_reader:
-                # jump over header row with names
-                if row[self.data[0]] == self.time:
-                    continue
-                j = 0
-                for name in self.data:
-                    if name == self.time or name == self.fhs:
-                        # scale time and field.header.stamp with factor 1e-9
-                        scale = 10 ** -9
-                    else:
-                        # otherwise no scaling is needed
-                        scale = 1
-                    a = row[name]
-                    A[i, j] = float(a) * scale
-                    j += 1
-                i += 1
-
-        # set time to start at 0s
-        A[:, AD.TIME] = A[:, AD.TIME] - A[0, AD.TIME]
-        A[:, AD.FHS] = A[:, AD.FHS] - A[0, AD.FHS]
+        start = time.time()
+        if self.load_cached('csv', filename):
+            m_A, n_A = self.A.shape
+            duration = time.time() - start
+            print 'Read {} rows from cache in {:.3f} [s]'.format(m_A, duration)
+            print 'Time of Interval: {:.3f} [s]'.format(self.A[-1, AD.FHS] - self.A[0, AD.FHS])
+            return
+        df = self.load_csv_columns(filename)
+
+        A = np.empty([len(df), self.data.__len__()], dtype=np.float64)
+        for j, name in enumerate(self.data):
+            A[:, j] = df[name].values
+        # scale time and field.header.stamp with factor 1e-9 and set time to start at 0s
+        A[:, AD.TIME] = self.stamps_to_seconds(df[self.time].values)
+        A[:, AD.FHS] = self.stamps_to_seconds(df[self.fhs].values)
+        del df
         # see whether scaling was wrong or not
         if A[-1, AD.FHS] - A[0, AD.FHS] < 0.1:
             A[:, AD.FHS] = A[:, AD.FHS] * 10 ** 9
         # save dimensions of A
         m_A, n_A = A.shape
 
+        duration = time.time() - start
+        print 'Read {} rows in {:.3f} [s] ({:.0f} rows/s)'.format(m_A, duration, m_A / max(duration, 1e-9))
+
         # print 'Time of Interval: {:.3f} [s]'.format(A[-1, AD.TIME] - A[0, AD.TIME])
         print 'Time of Interval: {:.3f} [s]'.format(A[-1, AD.FHS] - A[0, AD.FHS])
         self.A = A
+        self.store_cached()
 
-    def read_data_subscriber(self, topic):
+    def evaluate_csv_stream(self, filename, max_jerk, chunk_size):
+        '''
+        evaluate a csv-file in blocks of 'chunk_size' rows, so memory only depends on the chunk size and not on the
+        length of the recording. Smoothed acceleration and jerk are the same as using 'read_data_csv' and
+        'differentiation', they are written to a csv-file block by block together with the read data.
+        :param filename: path to csv-file, stamps have to be given in [ns]
+        :param max_jerk: max allowed jerk for comparison
+        :param chunk_size: number of rows read at once
+        :return: result of the jerk metrics
+        '''
+        import pandas as pd
+        start = time.time()
+        filepath = self.create_dirpath()
+        tmpname = filepath + '/' + time.strftime(self.timeformat) + '_stream.csv'
+
+        blocks = block_jerk.BlockJerk(self.smooth, AD.FHS, AD.VEL_X, AD.VEL_Y, self.smo_para, 'hanning',
+                                      self.derivative, self.estimator, self.polyorder)
+        t0 = None
+        rows = 0
+        duration = 0.0
+        max_value = -np.inf
+        max_index = 0
+        violation = None
+        tracker = exceedance.ExceedanceTracker(max_jerk)
+        # last emitted sample, needed for 'Jerk below' of the first violation
+        before = (np.nan, np.nan)
+
+        chunks = self.read_csv_chunks(filename, chunk_size)
+        chunk = next(chunks, None)
+        while chunk is not None:
+            A = np.empty([len(chunk), self.data.__len__()], dtype=np.float64)
+            for j, name in enumerate(self.data):
+                A[:, j] = chunk[name].values
+            if t0 is None:
+                t0 = (chunk[self.time].values[0], chunk[self.fhs].values[0])
+            A[:, AD.TIME] = (chunk[self.time].values - t0[0]) * 10 ** -9
+            A[:, AD.FHS] = (chunk[self.fhs].values - t0[1]) * 10 ** -9
+            rows += A.shape[0]
+
+            chunk = next(chunks, None)
+            emitted = [blocks.push(A)]
+            if chunk is None:
+                emitted.append(blocks.finish())
+
+            for index, B, smo_acc, smo_jerk in emitted:
+                if smo_jerk.size == 0:
+                    continue
+                i = np.argmax(smo_jerk)
+                if smo_jerk[i] > max_value:
+                    max_value = smo_jerk[i]
+                    max_index = index + i
+                tracker.update(index, B[:, AD.FHS], smo_jerk)
+                if violation is None and tracker.first() is not None:
+                    k = tracker.first()['start_index'] - index
+                    if k > 0:
+                        before = (smo_jerk[k - 1], B[k - 1, AD.FHS])
+                    violation = (smo_jerk[k], B[k, AD.FHS], index + k) + before
+                before = (smo_jerk[-1], B[-1, AD.FHS])
+                duration = B[-1, AD.FHS]
+
+                df = pd.DataFrame(data=B, columns=self.data, index=np.arange(index, index + B.shape[0]))
+                df['smo_acc'] = smo_acc
+                df['smo_jerk'] = smo_jerk
+                df.to_csv(tmpname, sep=',', mode='w' if index == 0 else 'a', header=index == 0)
+
+        self.csv_stem = filepath + '/' + time.strftime(self.timeformat) + '_' + '{:.3f}'.format(duration)
+        os.rename(tmpname, self.csv_stem + '.csv')
+        self.intervals = tracker.finish()
+        self.save_exceedances()
+        elapsed = time.time() - start
+        print 'Read {} rows in {:.3f} [s] ({:.0f} rows/s)'.format(rows, elapsed, rows / max(elapsed, 1e-9))
+        print 'Time of Interval: {:.3f} [s]'.format(duration)
+        return self.print_jerk_metrics(max_jerk, max_value, max_index, violation, self.intervals)
+
+    def read_data_subscriber(self, topic, max_jerk=None):
         '''
         read data from a topic and save it in array
         :param topic: topic to read data from
+        :param max_jerk: max allowed jerk, jerk above is reported while collecting data
         :return: --
         '''
         # global A
         global m_A
         global n_A
 
-        # instantiate class NodeListener
+        # instantiate class NodeListener, the jerk is estimated message by message with the smoothing window or with
+        # the butterworth lowpass (causal, so not the same as the evaluation of the whole data afterwards)
+        estimator = 'butter' if self.estimator == 'butter' else 'smooth'
+        # imported here, rospy and nav_msgs are only needed for the subscriber
+        import listener
         if topic is not None:
-            nl = listener.NodeListener(topic)
+            nl = listener.NodeListener(topic, max_jerk=max_jerk, estimator=estimator, cutoff=self.cutoff,
+                                       order=self.filter_order)
         else:
-            nl = listener.NodeListener()
+            nl = listener.NodeListener(max_jerk=max_jerk, estimator=estimator, cutoff=self.cutoff,
+                                       order=self.filter_order)
         # subscribe to odometry
         nl.listener()
-        self.A = np.array(nl.return_array())
+        self.A = nl.return_array()
+        self.cache_key = None
         print tc.OKBLUE + '=' * 25 + tc.ENDC
         print tc.OKBLUE + 'Got this array: ', self.A.shape, tc.ENDC
         print tc.OKBLUE + '=' * 25 + tc.ENDC
@@ -469,86 +667,271 @@ class JerkEvaluation:
         global m_A
         global n_A
 
-        df = rp.bag_to_dataframe(bagname, include=include, exclude=exclude, seconds=True)
-
-        fieldnames = []
-        for dat in self.data:
-            inc = include[1:] + '__'
-            fieldnames.append((inc.replace('/', '_') + dat[6:]).replace('.', '_'))
-        fieldnames[2] = 'index'
-
-        # save fieldnames from dataframe to matrix A
-        A = df.reset_index()[[fieldnames[i] for i in xrange(2, fieldnames.__len__())]].as_matrix()
-        # dummy data for '%time' and 'field.header.stamp', because both are not necessary
-        B = np.ones([A.shape[0], 2])
-        # put data matrix A and dummy matrix B together
-        A = np.concatenate((B, A), axis=1)
+        if self.load_cached('bag', bagname, include, exclude):
+            m_A, n_A = self.A.shape
+            print 'Read {} rows from cache'.format(m_A)
+            print 'Time of Interval: {:.4f} [s]'.format(self.A[-1, AD.FHS] - self.A[0, AD.FHS])
+            return
+
+        # stamp, velocity and position are written straight into their columns of A,
+        # dummy data for '%time' and 'field.header.seq', because both are not necessary
+        columns = [None, None, 'index'] + [dat[6:] for dat in self.data[AD.VEL_X:]]
+        # imported here, rosbag and rospy are only needed for bag-files
+        import rosbag_pandas as rp
+        A = rp.bag_to_matrix(bagname, columns, include=include, exclude=exclude, seconds=True, fill=1.0)
         # set time to start at 0s
         A[:, AD.FHS] = A[:, AD.FHS] - A[0, AD.FHS]
 
         m_A, n_A = A.shape
         self.A = A
+        self.store_cached()
         print 'Time of Interval: {:.4f} [s]'.format(self.A[-1, AD.FHS] - self.A[0, AD.FHS])
 
+    # read data from a binary file
+    def read_data_binary(self, filename):
+        '''
+        memory map the data of a binary file written by 'binary_data', the data isn't copied
+        :param filename: path to binary file
+        :return: --
+        '''
+        global m_A
+        global n_A
+
+        start = time.time()
+        A, header = binary_data.load(filename)
+        if header['columns'] != self.data:
+            raise ValueError('columns of \'{}\' are not {}'.format(filename, self.data))
+        # already a memory map, nothing to cache
+        self.cache_key = None
+        m_A, n_A = A.shape
+        self.A = A
+        print 'Loaded {} rows of \'{}\' in {:.3f} [s]'.format(m_A, header['source'], time.time() - start)
+        print 'Time of Interval: {:.3f} [s]'.format(self.A[-1, AD.FHS] - self.A[0, AD.FHS])
+
+    def load_cached(self, *source):
+        '''
+        load the data of a file from the cache
+        :param source: reader, path to file and reader parameters, e.g. ('bag', bagname, include, exclude)
+        :return: true if 'self.A' was loaded from cache
+        '''
+        self.cache_key = None
+        if self.cache is None:
+            return False
+        self.cache_key = self.cache.key(source[1], source[0], *source[2:])
+        entry = self.cache.load(self.cache_key)
+        if entry is None:
+            return False
+        self.A = entry['A']
+        return True
+
+    def store_cached(self):
+        '''
+        store the read data under the key set by 'load_cached'
+        '''
+        if self.cache is not None and self.cache_key is not None:
+            self.cache.store(self.cache_key, {'A': self.A})
+
     # get differentiation from given data
     def differentiation(self):
-        # # global A_grad_vel
-        # global A_grad_vel_smo
-        # # global A_grad_vel_x
-        # # global A_grad_vel_y
-        # global A_grad_acc
-        # global A_grad_acc_smo
-        # # global A_grad_acc_x
-        # # global A_grad_acc_y
-        # global A_grad_jerk
-        # global A_grad_jerk_smo
-        # # global A_grad_jerk_x
-        # # global A_grad_jerk_y
-        #
-        # # global A_diff
-        #
-        # global A_grad_smo_acc
-        # global A_grad_smo_jerk
-
-        # differentiation
-        self.A_grad_vel_x = np.gradient(self.A[:, AD.POS_X], self.A[1, AD.FHS] - self.A[0, AD.FHS])
-        self.A_grad_vel_y = np.gradient(self.A[:, AD.POS_Y], self.A[1, AD.FHS] - self.A[0, AD.FHS])
+        '''
+        calculate smoothed acceleration and smoothed jerk of the data in A. All other signals ('A_grad_*', 'A_diff')
+        are calculated from their dependencies when they are used first, e.g. by plots.
+        '''
+        self.prepare_stamps()
+        # forget all signals of previous data
+        signals.invalidate(self, 'A', 'smo_para', 'window', 'derivative', 'estimator', 'polyorder', 'cutoff',
+                           'filter_order')
+
+        # smoothed and differentiated data of a read file is taken from the cache if it was calculated before
+        key = None
+        if self.cache is not None and self.cache_key is not None:
+            key = self.cache.derive(self.cache_key, self.smo_para, self.window, self.derivative, self.rate,
+                                    self.estimator, self.polyorder, self.cutoff, self.filter_order)
+            entry = self.cache.load(key)
+            if entry is not None and all(name in entry for name in self.results):
+                names = signals.signals(self.__class__)
+                for name in entry:
+                    if name in names:
+                        self.__dict__[name] = entry[name]
+                return
+
+        for name in self.results:
+            getattr(self, name)
+
+        if key is not None:
+            self.cache.store(key, dict((name, getattr(self, name)) for name in self.results))
+
+    def prepare_stamps(self):
+        '''
+        prepare A for the derivative: 'stamps' and 'uniform' need strictly increasing stamps, so samples with a
+        duplicate or earlier stamp are dropped, 'uniform' resamples all columns to a uniform grid with 'self.rate'.
+        Estimators 'savgol' and 'butter' need a uniform grid, so 'stamps' resamples like 'uniform'.
+        '''
+        global m_A
+        global n_A
+
+        if self.derivative == 'scalar':
+            return
+        keep = derivatives.increasing(self.A[:, AD.FHS])
+        if not keep.all():
+            print tc.WARNING + 'Dropped {} samples with duplicate or earlier stamps'.format(
+                keep.size - keep.sum()) + tc.ENDC
+            self.A = self.A[keep]
+        if self.derivative == 'uniform' or self.estimator in ['savgol', 'butter']:
+            rate = self.rate if self.rate is not None else derivatives.sample_rate(self.A[:, AD.FHS])
+            self.A = derivatives.resample(self.A, AD.FHS, rate)
+            print 'Resampled to {} samples at {:.3f} [Hz]'.format(self.A.shape[0], rate)
+        m_A, n_A = self.A.shape
+
+    @derived('A', 'derivative', 'estimator')
+    def spacing(self):
+        '''
+        sample time taken from the first two stamps, or all stamps for derivative 'stamps', see 'derivatives.gradient'
+        '''
+        if self.derivative == 'stamps' and self.estimator == 'smooth':
+            return self.A[:, AD.FHS]
+        return self.A[1, AD.FHS] - self.A[0, AD.FHS]
+
+    # differentiation
+    @derived('A', 'spacing')
+    def A_grad_vel_x(self):
+        return derivatives.gradient(self.A[:, AD.POS_X], self.spacing)
+
+    @derived('A', 'spacing')
+    def A_grad_vel_y(self):
+        return derivatives.gradient(self.A[:, AD.POS_Y], self.spacing)
+
+    @derived('A_grad_vel_x', 'A_grad_vel_y')
+    def A_grad_vel(self):
         # (x^2+y^2)^0.5 to get absolut velocity
-        self.A_grad_vel = np.sqrt(self.A_grad_vel_x[:, ] ** 2 + self.A_grad_vel_y[:, ] ** 2)
-        self.A_grad_vel_smo = self.smooth(self.A_grad_vel[:, ], self.smo_para, window='hanning')
+        return np.sqrt(self.A_grad_vel_x[:, ] ** 2 + self.A_grad_vel_y[:, ] ** 2)
+
+    @derived('A_grad_vel', 'smo_para', 'window')
+    def A_grad_vel_smo(self):
+        return self.smooth(self.A_grad_vel[:, ], self.smo_para, window=self.window)
+
+    # differentiation
+    # compute acceleration from velocity by differentiation
+    @derived('A', 'spacing')
+    def A_grad_acc_x(self):
+        return derivatives.gradient(self.A[:, AD.VEL_X], self.spacing)
 
-        # differentiation
-        # compute acceleration from velocity by differentiation
-        self.A_grad_acc_x = np.gradient(self.A[:, AD.VEL_X], self.A[1, AD.FHS] - self.A[0, AD.FHS])
-        self.A_grad_acc_y = np.gradient(self.A[:, AD.VEL_Y], self.A[1, AD.FHS] - self.A[0, AD.FHS])
+    @derived('A', 'spacing')
+    def A_grad_acc_y(self):
+        return derivatives.gradient(self.A[:, AD.VEL_Y], self.spacing)
+
+    @derived('A_grad_acc_x', 'A_grad_acc_y')
+    def A_grad_acc(self):
         # (x^2+y^2)^0.5 to get absolute acceleration
-        self.A_grad_acc = np.sqrt(self.A_grad_acc_x[:, ] ** 2 + self.A_grad_acc_y[:, ] ** 2)
+        return np.sqrt(self.A_grad_acc_x[:, ] ** 2 + self.A_grad_acc_y[:, ] ** 2)
+
+    @derived('A_grad_acc', 'smo_para', 'window')
+    def A_grad_acc_smo(self):
         # smoothed after differentiation
-        self.A_grad_acc_smo = self.smooth(self.A_grad_acc[:, ], self.smo_para, window='hanning')
+        return self.smooth(self.A_grad_acc[:, ], self.smo_para, window=self.window)
+
+    # smoothed acc x and y, used for acceleration and jerk
+    # estimator 'savgol': straight from the velocity, estimator 'butter': lowpass instead of smoothing window
+    @derived('A_grad_acc_x', 'smo_para', 'window', 'estimator', 'polyorder', 'cutoff', 'filter_order')
+    def A_grad_smo_acc_x(self):
+        if self.estimator == 'savgol':
+            return self.savgol(AD.VEL_X, 1)
+        if self.estimator == 'butter':
+            return self.lowpass(self.A_grad_acc_x)
+        return self.smooth(self.A_grad_acc_x[:, ], self.smo_para, window=self.window)
+
+    @derived('A_grad_acc_y', 'smo_para', 'window', 'estimator', 'polyorder', 'cutoff', 'filter_order')
+    def A_grad_smo_acc_y(self):
+        if self.estimator == 'savgol':
+            return self.savgol(AD.VEL_Y, 1)
+        if self.estimator == 'butter':
+            return self.lowpass(self.A_grad_acc_y)
+        return self.smooth(self.A_grad_acc_y[:, ], self.smo_para, window=self.window)
+
+    @derived('A_grad_smo_acc_x', 'A_grad_smo_acc_y')
+    def A_grad_smo_acc(self):
         # smoothed acc used for (x^2+y^2)^0.5 to get absolute acceleration
-        self.A_grad_smo_acc = np.sqrt(self.smooth(self.A_grad_acc_x[:, ], 30, window='hanning') ** 2 +
-                                      self.smooth(self.A_grad_acc_y[:, ], 30, window='hanning') ** 2)
-
-        # differentiation
-        # compute jerk from acceleration by differentiation
-        self.A_grad_jerk_x = np.gradient(self.A_grad_acc_x[:, ], self.A[1, AD.FHS] - self.A[0, AD.FHS])
-        self.A_grad_smo_jerk_x = np.gradient(self.smooth(self.A_grad_acc_x[:, ], 30, window='hanning'),
-                                             self.A[1, AD.FHS] - self.A[0, AD.FHS])
+        return np.sqrt(self.A_grad_smo_acc_x ** 2 + self.A_grad_smo_acc_y ** 2)
+
+    # differentiation
+    # compute jerk from acceleration by differentiation
+    @derived('A_grad_acc_x', 'spacing')
+    def A_grad_jerk_x(self):
         # noisy acc used for differentiation
-        self.A_grad_jerk_y = np.gradient(self.A_grad_acc_y[:, ], self.A[1, AD.FHS] - self.A[0, AD.FHS])
+        return derivatives.gradient(self.A_grad_acc_x[:, ], self.spacing)
+
+    @derived('A_grad_acc_y', 'spacing')
+    def A_grad_jerk_y(self):
+        return derivatives.gradient(self.A_grad_acc_y[:, ], self.spacing)
+
+    @derived('A_grad_smo_acc_x', 'spacing')
+    def A_grad_smo_jerk_x(self):
+        if self.estimator == 'savgol':
+            return self.savgol(AD.VEL_X, 2)
         # smoothed acc used for differentiation
-        self.A_grad_smo_jerk_y = np.gradient(self.smooth(self.A_grad_acc_y[:, ], 30, window='hanning'),
-                                             self.A[1, AD.FHS] - self.A[0, AD.FHS])
+        return derivatives.gradient(self.A_grad_smo_acc_x, self.spacing)
+
+    @derived('A_grad_smo_acc_y', 'spacing')
+    def A_grad_smo_jerk_y(self):
+        if self.estimator == 'savgol':
+            return self.savgol(AD.VEL_Y, 2)
+        return derivatives.gradient(self.A_grad_smo_acc_y, self.spacing)
+
+    def savgol(self, column, deriv):
+        '''
+        smoothed derivative of a column of A with the Savitzky-Golay filter, window length from 'smo_para'
+        :param column: column index of A, e.g. AD.VEL_X
+        :param deriv: order of the derivative
+        '''
+        return savitzky_golay.derivative(self.A[:, column], savitzky_golay.window_length(self.smo_para),
+                                         self.polyorder, deriv, self.spacing)
+
+    def lowpass(self, x):
+        '''
+        zero-phase butterworth lowpass with 'cutoff' and 'filter_order', the design is cached
+        :param x: uniformly sampled signal
+        '''
+        # imported here, scipy is only needed for estimator 'butter'
+        import butterbandwith
+        return butterbandwith.butter_filter(x, self.cutoff, 1.0 / self.spacing, self.filter_order)
+
+    @derived('A_grad_jerk_x', 'A_grad_jerk_y')
+    def A_grad_jerk(self):
         # (x^2+y^2)^0.5 to get absolut jerk
-        self.A_grad_jerk = np.sqrt(self.A_grad_jerk_x[:, ] ** 2 + self.A_grad_jerk_y[:, ] ** 2)
+        return np.sqrt(self.A_grad_jerk_x[:, ] ** 2 + self.A_grad_jerk_y[:, ] ** 2)
+
+    @derived('A_grad_jerk', 'smo_para', 'window')
+    def A_grad_jerk_smo(self):
         # smoothed after differentiation
-        self.A_grad_jerk_smo = self.smooth(self.A_grad_jerk[:, ], 30, window='hanning')
+        return self.smooth(self.A_grad_jerk[:, ], self.smo_para, window=self.window)
+
+    @derived('A_grad_smo_jerk_x', 'A_grad_smo_jerk_y')
+    def A_grad_smo_jerk(self):
         # smoothed acc used for differentiation
-        self.A_grad_smo_jerk = np.sqrt(self.A_grad_smo_jerk_x[:, ] ** 2 + self.A_grad_smo_jerk_y[:, ] ** 2)
+        return np.sqrt(self.A_grad_smo_jerk_x[:, ] ** 2 + self.A_grad_smo_jerk_y[:, ] ** 2)
 
+    @derived('A')
+    def A_diff(self):
         # differentiation using diff
-        self.A_diff = np.diff(np.transpose(self.A))
-        self.A_diff = np.transpose(self.A_diff)
+        return np.transpose(np.diff(np.transpose(self.A)))
+
+    def create_dirpath(self):
+        '''
+        create the directory for saved data, if it already exists a numbered one is created
+        (safe if several evaluations run in parallel)
+        :return: path to created directory
+        '''
+        for i in xrange(0, 100):
+            filepath = self.dirpath if i == 0 else self.dirpath + '__' + str(i)
+            try:
+                os.mkdir(filepath)
+            except OSError:
+                if os.path.exists(filepath):
+                    continue
+                raise
+            self.dirpath = filepath
+            return filepath
+        raise OSError('no free directory for \'{}\''.format(self.dirpath))
 
     def save_csv(self):
         print 'Date: ' + time.strftime(self.timeformat)
@@ -556,6 +939,7 @@ class JerkEvaluation:
         # C_jerk = np.concatenate(([['jerk']], self.A_grad_smo_jerk.reshape(self.A_grad_smo_jerk.__len__(), 1)), axis=0)
         # C_acc = np.concatenate(([['acc']], self.A_grad_smo_acc.reshape(self.A_grad_smo_acc.__len__(), 1)), axis=0)
 
+        import pandas as pd
         data_matrix = np.array([self.data[i] for i in xrange(0, self.data.__len__())])
 
         df_A = pd.DataFrame(data=self.A, columns=data_matrix)
@@ -564,25 +948,35 @@ class JerkEvaluation:
 
         B = pd.concat([df_A, df_smo_acc.smo_acc, df_smo_jerk.smo_jerk], axis=1)
 
-        if os.path.exists(self.dirpath):
-            for i in xrange(1, 100):
-                if os.path.exists(self.dirpath + '__' + str(i)):
-                    continue
-                else:
-                    filepath = self.dirpath + '__' + str(i)
-                    os.mkdir(filepath)
-                    self.dirpath = filepath
-                    break
-        else:
-            os.mkdir(self.dirpath)
-            filepath = self.dirpath
+        filepath = self.create_dirpath()
 
         # copy bagfile in created folder together with saved .csv-file
         if self.args.read_bag:
             shutil.copy2(self.args.load_bag, filepath)
 
-        B.to_csv(filepath + '/' + time.strftime(self.timeformat) + '_' + str(
-            '{:.3f}'.format(self.A[-1, AD.FHS] - self.A[0, AD.FHS])) + '.csv', sep=',')
+        self.csv_stem = filepath + '/' + time.strftime(self.timeformat) + '_' + str(
+            '{:.3f}'.format(self.A[-1, AD.FHS] - self.A[0, AD.FHS]))
+        B.to_csv(self.csv_stem + '.csv', sep=',')
+
+    def save_exceedances(self):
+        '''
+        save the intervals or the sweep found by 'jerk_metrics' next to the csv-file saved by 'save_csv'
+        '''
+        import pandas as pd
+        if self.sweep is not None:
+            pd.DataFrame(self.sweep).to_csv(self.csv_stem + '_sweep.csv', sep=',')
+        else:
+            pd.DataFrame(self.intervals).to_csv(self.csv_stem + '_exceedances.csv', sep=',')
+        if self.window_sweep is not None:
+            pd.DataFrame(self.window_sweep).to_csv(self.csv_stem + '_smoothing.csv', sep=',')
+
+    def max_jerks(self):
+        '''
+        :return: list of max allowed jerks given by '-j', default = [4.0]
+        '''
+        if self.args.jerk is None:
+            return [4.0]
+        return [value for values in self.args.jerk for value in values]
 
     # creating bandwidth matrix
     def bandwidth(self, max):
@@ -595,29 +989,112 @@ class JerkEvaluation:
     def jerk_metrics(self, max_jerk):
         '''
         jerk metrics to see if max jerk is in desired range
+        :param max_jerk: max allowed jerk for comparison, a list of many values is evaluated with 'jerk_sweep'
+        :return: false - jerk is above max allowed jerk
+        :return: true - jerk is below max allowed jerk
+        '''
+        if np.ndim(max_jerk) > 0:
+            if len(max_jerk) > 1:
+                return self.jerk_sweep(max_jerk)
+            max_jerk = max_jerk[0]
+        self.intervals = exceedance.exceedance_intervals(self.A_grad_smo_jerk, self.A[:, AD.FHS], max_jerk)
+        max_index = np.argmax(self.A_grad_smo_jerk)
+        if self.intervals.size == 0:
+            return self.print_jerk_metrics(max_jerk, self.A_grad_smo_jerk[max_index], max_index)
+        i = self.intervals['start_index'][0]
+        return self.print_jerk_metrics(max_jerk, self.A_grad_smo_jerk[max_index], max_index,
+                                       (self.A_grad_smo_jerk[i,], self.A[i, AD.FHS], i,
+                                        self.A_grad_smo_jerk[i - 1,], self.A[i - 1, AD.FHS]), self.intervals)
+
+    def jerk_sweep(self, thresholds):
+        '''
+        jerk metrics for many max allowed jerks in one pass
+        :param thresholds: list of max allowed jerks
+        :return: result of the sweep, see 'exceedance.SWEEP_DTYPE'
+        '''
+        self.sweep = exceedance.threshold_sweep(self.A_grad_smo_jerk, self.A[:, AD.FHS], thresholds)
+        print tc.OKBLUE + '=' * 80 + tc.ENDC
+        print '{:>18} | {:>6} | {:>10} | {:>15} | {:>19}'.format('Jerk [m/s^3]', 'Result', 'Violations',
+                                                                   'Time above [s]', 'First violation [s]')
+        for row in self.sweep:
+            colour = tc.OKGREEN if row['passed'] else tc.FAIL
+            print colour + '{:>18.3f} | {:>6} | {:>10d} | {:>15.3f} | {:>19.3f}'.format(
+                row['threshold'], 'passed' if row['passed'] else 'failed', row['violations'], row['time_above'],
+                row['first_violation']) + tc.ENDC
+        print 'Max Jerk: {:.4f} [m/s^3]'.format(self.A_grad_smo_jerk.max())
+        print tc.OKBLUE + '=' * 80 + tc.ENDC
+        return self.sweep
+
+    def jerk_smoothing_sweep(self, windows, max_jerk):
+        '''
+        jerk metrics for many smoothing windows: the acceleration is smoothed with all windows in one pass, then the
+        smoothed jerk is calculated like 'differentiation' does for every window
+        :param windows: list of (window, window_len)
+        :param max_jerk: max allowed jerk for comparison
+        :return: result of the sweep, see 'WINDOW_SWEEP_DTYPE'
+        '''
+        spacing = self.spacing
+        smo_acc_x = smoothing.smooth_many(derivatives.gradient(self.A[:, AD.VEL_X], spacing), windows)
+        smo_acc_y = smoothing.smooth_many(derivatives.gradient(self.A[:, AD.VEL_Y], spacing), windows)
+        smo_jerk = np.sqrt(derivatives.gradient(smo_acc_x, spacing, axis=1) ** 2 +
+                           derivatives.gradient(smo_acc_y, spacing, axis=1) ** 2)
+        del smo_acc_x, smo_acc_y
+
+        self.window_sweep = np.empty(len(windows), dtype=WINDOW_SWEEP_DTYPE)
+        print tc.OKBLUE + '=' * 80 + tc.ENDC
+        print '{:>10} | {:>6} | {:>14} | {:>10} | {:>6} | {:>10} | {:>14}'.format(
+            'Window', 'Length', 'Jerk [m/s^3]', 'Time [s]', 'Result', 'Violations', 'Time above [s]')
+        for row, (window, window_len), jerk in zip(self.window_sweep, windows, smo_jerk):
+            i = np.argmax(jerk)
+            intervals = exceedance.exceedance_intervals(jerk, self.A[:, AD.FHS], max_jerk)
+            row['window'] = window
+            row['window_len'] = window_len
+            row['max_jerk'] = jerk[i]
+            row['max_time'] = self.A[i, AD.FHS]
+            row['passed'] = intervals.size == 0
+            row['violations'] = intervals.size
+            row['time_above'] = intervals['duration'].sum()
+            colour = tc.OKGREEN if row['passed'] else tc.FAIL
+            print colour + '{:>10} | {:>6d} | {:>14.4f} | {:>10.3f} | {:>6} | {:>10d} | {:>14.3f}'.format(
+                window, window_len, row['max_jerk'], row['max_time'], 'passed' if row['passed'] else 'failed',
+                row['violations'], row['time_above']) + tc.ENDC
+        print 'Max allowed jerk: {:.3f} [m/s^3]'.format(max_jerk)
+        print tc.OKBLUE + '=' * 80 + tc.ENDC
+        return self.window_sweep
+
+    def print_jerk_metrics(self, max_jerk, max_value, max_index, violation=None, intervals=None):
+        '''
+        print the result of the jerk metrics
         :param max_jerk: max allowed jerk for comparison
+        :param max_value: max jerk of the recording
+        :param max_index: index of the max jerk
+        :param violation: first jerk above max allowed jerk as tuple (jerk, time, index, jerk before, time before),
+                          None if jerk is in desired range
+        :param intervals: all intervals with jerk above max allowed jerk, see 'exceedance.INTERVAL_DTYPE'
         :return: false - jerk is above max allowed jerk
         :return: true - jerk is below max allowed jerk
         '''
-        for i in xrange(0, m_A):
-            if self.A_grad_smo_jerk[i,] >= max_jerk:
-                output = tc.FAIL + 'Jerk: {:.3f} [m/s^3] at time: {:.6f} [s] with index [{}] is bigger than max allowed jerk: {:.3f} [m/s^3]' + tc.ENDC
-                print tc.FAIL + '=' * (output.__len__() - 6) + tc.ENDC
-                print output.format(self.A_grad_smo_jerk[i,], self.A[i, AD.FHS], i, max_jerk)
-                print 'Jerk below: {:.3f} [m/s^3] at time: {:.3f} [s] is in range'.format(self.A_grad_smo_jerk[i - 1,],
-                                                                                          self.A[i - 1, AD.FHS])
-                print 'Max Jerk: {:.4f} [m/s^3] at index [{}]'.format(self.A_grad_smo_jerk.max(),
-                                                                      np.argmax(self.A_grad_smo_jerk))
-                print tc.FAIL + '=' * (output.__len__() - 6) + tc.ENDC
-                return False
+        if violation is not None:
+            jerk, stamp, index, jerk_before, stamp_before = violation
+            output = tc.FAIL + 'Jerk: {:.3f} [m/s^3] at time: {:.6f} [s] with index [{}] is bigger than max allowed jerk: {:.3f} [m/s^3]' + tc.ENDC
+            print tc.FAIL + '=' * (output.__len__() - 6) + tc.ENDC
+            print output.format(jerk, stamp, index, max_jerk)
+            print 'Jerk below: {:.3f} [m/s^3] at time: {:.3f} [s] is in range'.format(jerk_before, stamp_before)
+            print 'Max Jerk: {:.4f} [m/s^3] at index [{}]'.format(max_value, max_index)
+            if intervals is not None:
+                print 'Jerk is {} times above max allowed jerk for {:.3f} [s] in total'.format(
+                    intervals.size, intervals['duration'].sum())
+            print tc.FAIL + '=' * (output.__len__() - 6) + tc.ENDC
+            return False
         print tc.OKGREEN + '=' * 25 + tc.ENDC
         print tc.OKGREEN + 'Jerk is in desired range!' + tc.ENDC
-        print 'Max Jerk: {:.4f} [m/s^3]'.format(self.A_grad_smo_jerk.max())
+        print 'Max Jerk: {:.4f} [m/s^3]'.format(max_value)
         print tc.OKGREEN + '=' * 25 + tc.ENDC
         return True
 
     # smoothing in workflow comparison
     def smoothing_workflow_comparison(self):
+        import matplotlib.pyplot as plt
         plt.figure(self.n, figsize=(16.0, 10.0))
         plt.subplot(211)
         plt.plot(self.A[:, AD.TIME], self.A_grad_acc, 'b', label='unsmoothed')
@@ -642,11 +1119,49 @@ class JerkEvaluation:
 
     # calling the other functions
     def main(self):
-        # close all existing figures
-        plt.close('all')
+        '''
+        :return: false - jerk is above max allowed jerk
+        :return: true - jerk is below max allowed jerk (for a sweep: the first max allowed jerk given by '-j')
+        '''
+        # close all existing figures, pyplot is only loaded if figures were drawn before
+        if 'matplotlib.pyplot' in sys.modules:
+            sys.modules['matplotlib.pyplot'].close('all')
+
+        if self.args.clear_cache:
+            cache = self.cache or result_cache.ResultCache(self.args.cache_dir)
+            cache.clear()
+            print tc.OKBLUE + 'Cleared cache: \'{}\''.format(cache.directory) + tc.ENDC
 
-        # either read given csv-file...
-        if self.args.read_csv:
+        # either evaluate given csv-file block by block...
+        if self.args.read_csv and self.args.chunk_size is not None:
+            print tc.OKBLUE + '=' * (17 + len(self.args.load_csv))
+            print 'read csv-file: \'{}\' in blocks of {} rows'.format(self.args.load_csv, self.args.chunk_size)
+            print '=' * (17 + len(self.args.load_csv)) + tc.ENDC
+            if len(self.max_jerks()) > 1:
+                print tc.WARNING + 'sweep needs the whole recording, using max allowed jerk: {:.3f} [m/s^3]'.format(
+                    self.max_jerks()[0]) + tc.ENDC
+            if self.estimator == 'savgol' and self.derivative != 'scalar':
+                print tc.WARNING + 'savgol needs a uniform grid and resampling needs the whole recording, using ' \
+                                   'derivative: scalar' + tc.ENDC
+                self.derivative = 'scalar'
+            if self.derivative == 'uniform':
+                print tc.WARNING + 'resampling needs the whole recording, using derivative: stamps' + tc.ENDC
+                self.derivative = 'stamps'
+            if self.estimator == 'butter':
+                print tc.WARNING + 'forward-backward filtering needs the whole recording, using estimator: smooth' + \
+                      tc.ENDC
+                self.estimator = 'smooth'
+            return self.evaluate_csv_stream(self.args.load_csv, self.max_jerks()[0], self.args.chunk_size)
+
+        # ...or load given binary file...
+        elif self.args.load_binary is not None:
+            print tc.OKBLUE + '=' * (20 + len(self.args.load_binary))
+            print 'load binary file: \'{}\''.format(self.args.load_binary)
+            print '=' * (20 + len(self.args.load_binary)) + tc.ENDC
+            self.read_data_binary(self.args.load_binary)
+
+        # ...or read given csv-file...
+        elif self.args.read_csv:
             print tc.OKBLUE + '=' * (17 + len(self.args.load_csv))
             print 'read csv-file: \'{}\''.format(self.args.load_csv)
             print '=' * (17 + len(self.args.load_csv)) + tc.ENDC
@@ -666,7 +1181,7 @@ class JerkEvaluation:
             print tc.OKBLUE + '=' * (22 + len(self.args.topic))
             print 'subscribe to topic: \'{}\''.format(self.args.topic)
             print '=' * (22 + len(self.args.topic)) + tc.ENDC
-            self.read_data_subscriber(self.args.topic)
+            self.read_data_subscriber(self.args.topic, self.max_jerks()[0])
 
         # print tc.OKBLUE + '=' * (17 + len(self.args.load_csv))
         # print 'read csv-file: \'{}\''.format(self.args.load_csv)
@@ -676,11 +1191,18 @@ class JerkEvaluation:
         self.differentiation()
         self.save_csv()
 
-        # if jerk value is defined use it
-        if self.args.jerk is not None:
-            self.jerk_metrics(self.args.jerk)
-        else:
-            self.jerk_metrics(4.0)
+        # if jerk value is defined use it, otherwise 4.0
+        passed = self.jerk_metrics(self.max_jerks())
+        if self.sweep is not None:
+            passed = bool(self.sweep['passed'][0])
+        if self.args.smoothing_windows is not None:
+            if self.estimator != 'smooth':
+                print tc.WARNING + 'smoothing windows are only used by estimator: smooth, skipping the smoothing ' \
+                                   'sweep' + tc.ENDC
+            else:
+                self.jerk_smoothing_sweep([w for windows in self.args.smoothing_windows for w in windows],
+                                          self.max_jerks()[0])
+        self.save_exceedances()
 
         # smoothing_times_plot()
         # smoothing_workflow_comparison()
@@ -688,13 +1210,18 @@ class JerkEvaluation:
 
         # show figures
         if self.args.show_figures:
-            je.show_figures()
+            self.show_figures()
+            if self.figures.write(self.args.wait_figures) is not None:
+                print tc.OKBLUE + 'writing figures to: \'{}\''.format(self.dirpath) + tc.ENDC
+
+        return passed
 
 
 # commandline input: --jerk *max_jerk* or -j *max_jerk*
 # if no commandline input is given, max_jerk=4.0 is set
+# exit code: 0 - jerk is below max allowed jerk, 1 - jerk is above max allowed jerk
 if __name__ == '__main__':
     je = JerkEvaluation()
-    je.main()
+    sys.exit(0 if je.main() else 1)
 
 pass
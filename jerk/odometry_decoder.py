@@ -0,0 +1,115 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Decode serialized nav_msgs/Odometry messages without deserializing them
+@version: 1.0.0
+"""
+
+import numpy as np
+
+ODOMETRY_TYPE = 'nav_msgs/Odometry'
+ODOMETRY_MD5 = 'cd5e73d190d741a2f92e81eda573aca7'
+
+# serialized message: header (seq, stamp.secs, stamp.nsecs, frame_id), child_frame_id, pose, twist
+# strings are stored as uint32 length followed by the characters, so pose and twist start behind both strings
+# field -> (type, offset, count, part): part 'header' is relative to the start of the message,
+# part 'body' relative to the start of the pose
+FIELDS = {
+    'header.seq': ('<u4', 0, 1, 'header'),
+    'header.stamp.secs': ('<u4', 4, 1, 'header'),
+    'header.stamp.nsecs': ('<u4', 8, 1, 'header'),
+    'header.frame_id': (None, 16, 1, 'frame_id'),
+    'child_frame_id': (None, 0, 1, 'child_frame_id'),
+    'pose.pose.position.x': ('<f8', 0, 1, 'body'),
+    'pose.pose.position.y': ('<f8', 8, 1, 'body'),
+    'pose.pose.position.z': ('<f8', 16, 1, 'body'),
+    'pose.pose.orientation.x': ('<f8', 24, 1, 'body'),
+    'pose.pose.orientation.y': ('<f8', 32, 1, 'body'),
+    'pose.pose.orientation.z': ('<f8', 40, 1, 'body'),
+    'pose.pose.orientation.w': ('<f8', 48, 1, 'body'),
+    'pose.covariance': ('<f8', 56, 36, 'body'),
+    'twist.twist.linear.x': ('<f8', 344, 1, 'body'),
+    'twist.twist.linear.y': ('<f8', 352, 1, 'body'),
+    'twist.twist.linear.z': ('<f8', 360, 1, 'body'),
+    'twist.twist.angular.x': ('<f8', 368, 1, 'body'),
+    'twist.twist.angular.y': ('<f8', 376, 1, 'body'),
+    'twist.twist.angular.z': ('<f8', 384, 1, 'body'),
+    'twist.covariance': ('<f8', 392, 36, 'body'),
+}
+# size of pose and twist with covariances
+BODY_SIZE = 680
+
+
+def supports(fields):
+    '''
+    :param fields: dot delimited field names
+    :return: true if all fields can be decoded
+    '''
+    return all(f in FIELDS for f in fields)
+
+
+def gather(buf, offsets, dtype, count=1):
+    '''
+    read one value (or 'count' values) of type 'dtype' at every offset of the buffer
+    :param buf: uint8 array
+    :param offsets: start of the value in every message
+    :return: array with shape [len(offsets)] or [len(offsets), count]
+    '''
+    dtype = np.dtype(dtype)
+    idx = offsets[:, np.newaxis] + np.arange(dtype.itemsize * count)
+    values = buf[idx].view(dtype)
+    if count == 1:
+        return values[:, 0]
+    return values
+
+
+def decode(data, fields):
+    '''
+    decode serialized nav_msgs/Odometry messages into one structured array, all messages at once
+    if all messages have the same size and strings, the fields are read with one record view on the joined buffer,
+    otherwise pose and twist are gathered behind the variable-length strings of every message
+    :param data: list of serialized messages (str)
+    :param fields: dot delimited field names, see FIELDS
+    :return: structured array with one row per message and one column per field, strings as object
+    '''
+    fields = list(fields)
+    dtype = np.dtype([(f, np.object) if FIELDS[f][0] is None else (f, FIELDS[f][0], (FIELDS[f][2],))
+                      if FIELDS[f][2] > 1 else (f, FIELDS[f][0]) for f in fields])
+    result = np.empty(len(data), dtype=dtype)
+    if len(data) == 0:
+        return result
+
+    joined = ''.join(data)
+    buf = np.frombuffer(joined, dtype=np.uint8)
+    lengths = np.fromiter((len(d) for d in data), dtype=np.int64, count=len(data))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    len_frame_id = gather(buf, starts + 12, '<u4').astype(np.int64)
+    len_child_frame_id = gather(buf, starts + 16 + len_frame_id, '<u4').astype(np.int64)
+    body = starts + 20 + len_frame_id + len_child_frame_id
+    if np.any(body + BODY_SIZE != starts + lengths):
+        raise ValueError('serialized messages are no ' + ODOMETRY_TYPE)
+
+    fixed = np.all(lengths == lengths[0]) and np.all(len_frame_id == len_frame_id[0])
+    if fixed:
+        # every message has the same layout: one view with a record per message
+        start = body[0]
+        view = np.dtype({'names': [f for f in fields if FIELDS[f][0] is not None],
+                         'formats': [(FIELDS[f][0], (FIELDS[f][2],)) if FIELDS[f][2] > 1 else FIELDS[f][0]
+                                     for f in fields if FIELDS[f][0] is not None],
+                         'offsets': [FIELDS[f][1] + (start if FIELDS[f][3] == 'body' else 0)
+                                     for f in fields if FIELDS[f][0] is not None],
+                         'itemsize': int(lengths[0])})
+        records = np.frombuffer(joined, dtype=view)
+    for f in fields:
+        kind, offset, count, part = FIELDS[f]
+        if part == 'frame_id':
+            result[f] = [d[16:16 + n] for d, n in zip(data, len_frame_id)]
+        elif part == 'child_frame_id':
+            result[f] = [d[20 + n:20 + n + m] for d, n, m in zip(data, len_frame_id, len_child_frame_id)]
+        elif fixed:
+            result[f] = records[f]
+        else:
+            result[f] = gather(buf, (body if part == 'body' else starts) + offset, kind, count)
+    return result
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Causal jerk estimation message by message
+@version: 1.0.0
+"""
+
+import numpy as np
+import smoothing
+
+
+class OnlineJerk:
+    def __init__(self, max_jerk=None, window_len=30, window='hanning', estimator='smooth', cutoff=1.4, order=4):
+        '''
+        Estimates the smoothed jerk while messages arrive, every update has constant cost.
+        Acceleration is the backward difference of the velocity, it is smoothed with a causal window of the
+        last 'window_len' values and the jerk is the backward difference of the smoothed acceleration.
+        Like 'JerkEvaluation.differentiation' one sample time is used, taken from the first two messages.
+        Delay: the estimate belongs to the sample (window_len + 1) / 2 messages ago, e.g. 15.5 messages (0.31 s at
+        50 Hz) for window_len=30. So a jerk above 'max_jerk' is flagged about (window_len + 1) / 2 messages after it
+        happened, once per crossing from below.
+        With estimator 'butter' the acceleration is filtered with a causal butterworth lowpass instead, which keeps its
+        state from message to message (see 'butterbandwith.StreamingFilter'). It is designed when the sample time is
+        known, the delay is the group delay of the lowpass for slow changes plus one sample for the two backward
+        differences, e.g. 15.8 messages for 1.4 Hz and order 4 at 50 Hz.
+        :param max_jerk: max allowed jerk, None: no threshold check
+        :param window_len: length of the smoothing window
+        :param window: type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
+        :param estimator: 'smooth': smoothing window, 'butter': butterworth lowpass
+        :param cutoff: cutoff frequency of the lowpass in [Hz]
+        :param order: order of the lowpass
+        '''
+        if estimator not in ['smooth', 'butter']:
+            raise ValueError('estimator \'{}\' is not supported message by message'.format(estimator))
+        # reversed, so the newest value is weighted with the last element
+        self.kernel = smoothing.kernel(window_len, window)[::-1]
+        self.window_len = window_len
+        self.max_jerk = max_jerk
+        self.estimator = estimator
+        self.cutoff = cutoff
+        self.order = order
+        # delay of the estimate in [samples]
+        self.delay = (window_len + 1) / 2.0
+        self.reset()
+
+    def reset(self):
+        self.samples = 0
+        # stamp of the first sample
+        self.t0 = None
+        self.stamp = None
+        self.dt = None
+        self.vel = None
+        self.smo_acc = None
+        # every acceleration is written twice, so the last 'window_len' values are always one contiguous slice
+        self.acc = np.zeros([2 * self.window_len, 2])
+        self.pos = 0
+        # lowpass of estimator 'butter', designed with the sample time
+        self.lowpass = None
+        self.jerk = None
+        self.above = False
+        # number of times the jerk crossed 'max_jerk' from below
+        self.crossings = 0
+        self.max_value = 0.0
+
+    def update(self, stamp, vel_x, vel_y):
+        '''
+        add one sample
+        :param stamp: stamp of the sample in [s]
+        :param vel_x: velocity in x-direction
+        :param vel_y: velocity in y-direction
+        :return: True if the smoothed jerk crossed 'max_jerk' with this sample, otherwise False
+        '''
+        vel = np.array([vel_x, vel_y], dtype=np.float64)
+        if self.t0 is None:
+            self.t0 = stamp
+        if self.dt is None and self.stamp is not None and stamp > self.stamp:
+            self.dt = stamp - self.stamp
+        if self.dt is None:
+            # no sample time known yet: nothing to differentiate
+            self.stamp, self.vel = stamp, vel
+            return False
+        acc = (vel - self.vel) / self.dt
+        self.stamp, self.vel = stamp, vel
+
+        if self.estimator == 'butter':
+            return self.update_lowpass(acc)
+
+        self.acc[self.pos] = acc
+        self.acc[self.pos + self.window_len] = acc
+        self.pos = (self.pos + 1) % self.window_len
+        self.samples += 1
+        if self.samples < self.window_len:
+            return False
+
+        smo_acc = np.dot(self.kernel, self.acc[self.pos:self.pos + self.window_len])
+        return self.update_jerk(smo_acc)
+
+    def update_lowpass(self, acc):
+        '''
+        filter the acceleration of one sample with the butterworth lowpass
+        :param acc: acceleration in x- and y-direction
+        '''
+        if self.lowpass is None:
+            # imported here, scipy is only needed for estimator 'butter'
+            import butterbandwith
+            from scipy.signal import group_delay, sos2tf
+            sos = butterbandwith.butter_sos(self.order, self.cutoff, 1.0 / self.dt)
+            self.lowpass = butterbandwith.StreamingFilter(sos, channels=2)
+            # start in the steady state of the first acceleration, so there is no transient
+            self.lowpass.reset(acc)
+            # the backward differences of acceleration and jerk add half a sample each
+            self.delay = float(group_delay(sos2tf(sos), [1e-6])[1][0]) + 1.0
+        self.samples += 1
+        return self.update_jerk(self.lowpass.filter(acc))
+
+    def update_jerk(self, smo_acc):
+        '''
+        jerk from the smoothed acceleration of the last and this sample, check of the max allowed jerk
+        :param smo_acc: smoothed acceleration in x- and y-direction
+        :return: True if the smoothed jerk crossed 'max_jerk' with this sample, otherwise False
+        '''
+        if self.smo_acc is not None:
+            self.jerk = np.sqrt(np.sum(((smo_acc - self.smo_acc) / self.dt) ** 2))
+            self.max_value = max(self.max_value, self.jerk)
+        self.smo_acc = smo_acc
+
+        if self.jerk is None or self.max_jerk is None:
+            return False
+        crossed = self.jerk >= self.max_jerk and not self.above
+        self.above = self.jerk >= self.max_jerk
+        if crossed:
+            self.crossings += 1
+        return crossed
@@ -0,0 +1,158 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: On-disk cache for decoded and differentiated data
+@version: 1.0.0
+"""
+
+import numpy as np
+import hashlib
+import json
+import os
+
+
+class ResultCache:
+    def __init__(self, directory=None, max_size=1024 * 1024 ** 2):
+        '''
+        Stores arrays in '.npz'-files named by a key. A key is built from the fingerprint of the input file (size,
+        mtime and sha1 of the content) and the parameters of the evaluation, so a changed file or parameter never
+        hits an old entry. If the cache gets bigger than 'max_size' the least recently used entries are removed.
+        :param directory: directory of the cache, default: '~/.cache/jerk_metrics'
+        :param max_size: max size of all entries in [byte]
+        '''
+        if directory is None:
+            directory = '~/.cache/jerk_metrics'
+        self.directory = os.path.expanduser(directory)
+        self.max_size = max_size
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                if not os.path.isdir(self.directory):
+                    raise
+        # content hashes of already hashed files: path -> [size, mtime, sha1]
+        self.indexname = os.path.join(self.directory, 'hashes.json')
+
+    def fingerprint(self, filename):
+        '''
+        size, mtime and sha1 of the content of a file, the sha1 is only calculated once for every size and mtime
+        :param filename: path to file
+        :return: string
+        '''
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        hashes = self.read_index()
+        known = hashes.get(path)
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime:
+            digest = known[2]
+        else:
+            sha1 = hashlib.sha1()
+            with open(path, 'rb') as f:
+                block = f.read(1024 ** 2)
+                while block:
+                    sha1.update(block)
+                    block = f.read(1024 ** 2)
+            digest = sha1.hexdigest()
+            hashes[path] = [stat.st_size, stat.st_mtime, digest]
+            self.write_index(hashes)
+        return '{}:{!r}:{}'.format(stat.st_size, stat.st_mtime, digest)
+
+    def key(self, filename, *params):
+        '''
+        :param filename: path to input file
+        :param params: parameters which change the cached result, e.g. topic or smoothing parameter
+        :return: key of the entry
+        '''
+        return self.derive(self.fingerprint(filename), *params)
+
+    def derive(self, key, *params):
+        '''
+        key of a result which is calculated from the entry 'key'
+        :param key: key of the entry the result is based on
+        :param params: parameters which change the result
+        :return: key of the derived entry
+        '''
+        return hashlib.sha1(repr((key,) + params)).hexdigest()
+
+    def filename(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def load(self, key):
+        '''
+        :param key: key of the entry
+        :return: dict with the stored arrays, None if there is no entry
+        '''
+        filename = self.filename(key)
+        try:
+            with np.load(filename) as npz:
+                arrays = dict((name, npz[name]) for name in npz.files)
+        except (IOError, ValueError):
+            return None
+        # mark as recently used
+        try:
+            os.utime(filename, None)
+        except OSError:
+            pass
+        return arrays
+
+    def store(self, key, arrays):
+        '''
+        store arrays and remove least recently used entries if the cache is too big
+        :param key: key of the entry
+        :param arrays: dict with name -> array
+        '''
+        filename = self.filename(key)
+        # write to a temporary file first, so a parallel evaluation never loads half an entry
+        tmpname = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(tmpname, 'wb') as f:
+            np.savez(f, **arrays)
+        os.rename(tmpname, filename)
+        self.evict()
+
+    def evict(self):
+        '''
+        remove least recently used entries until the cache is smaller than 'max_size'
+        '''
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        '''
+        remove all entries and known content hashes
+        '''
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz') or name.endswith('.tmp') or name == os.path.basename(self.indexname):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def read_index(self):
+        try:
+            with open(self.indexname, 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def write_index(self, hashes):
+        tmpname = '{}.{}.tmp'.format(self.indexname, os.getpid())
+        with open(tmpname, 'w') as f:
+            json.dump(hashes, f)
+        os.rename(tmpname, self.indexname)
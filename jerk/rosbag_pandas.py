@@ -11,9 +11,9 @@ Created on Aug 22, 2017
 
 import warnings
 import re
-import subprocess
 import types
-import yaml
+from itertools import izip
+from operator import attrgetter
 
 import pandas as pd
 import numpy as np
@@ -22,8 +22,10 @@ import rosbag
 import rospy
 from roslib.message import get_message_class
 
+import odometry_decoder
 
-def bag_to_dataframe(bag_name, include=None, exclude=None, parse_header=False, seconds=False):
+
+def bag_to_dataframe(bag_name, include=None, exclude=None, parse_header=False, seconds=False, fields=None):
     '''
     Read in a rosbag file and create a pandas data frame that
     is indexed by the time the message was recorded in the bag.
@@ -38,18 +40,34 @@ def bag_to_dataframe(bag_name, include=None, exclude=None, parse_header=False, s
             removes those in the list.
 
     :seconds: time index is in seconds
+    :fields: None or List  Dot delimited message fields to read, e.g.
+            'twist.twist.linear.x'. A field with sub fields adds all of them.
+            If None every field is read.
 
     :returns: a pandas dataframe object
     '''
+    # the bag is opened once, its info is read from the index loaded while opening
+    bag = rosbag.Bag(bag_name)
+    try:
+        return read_bag(bag, include, exclude, parse_header, seconds, fields)
+    finally:
+        bag.close()
+
+
+def read_bag(bag, include=None, exclude=None, parse_header=False, seconds=False, fields=None):
+    '''
+    Create the dataframe of 'bag_to_dataframe' from an opened bag, see there
+    :bag: opened rosbag.Bag, it is not closed
+    '''
     # get list of topics to parse
-    yaml_info = get_bag_info(bag_name)
+    yaml_info = get_bag_info(bag)
     bag_topics = get_topics(yaml_info)
     bag_topics = prune_topics(bag_topics, include, exclude)
     length = get_length(bag_topics, yaml_info)
-    msgs_to_read, msg_type = get_msg_info(yaml_info, bag_topics, parse_header)
+    msgs_to_read, msg_type = get_msg_info(yaml_info, bag_topics, parse_header, fields)
 
-    bag = rosbag.Bag(bag_name)
     dmap = create_data_map(msgs_to_read)
+    accessors = create_accessors(dmap, msg_type)
 
     # create datastore
     datastore = {}
@@ -74,32 +92,42 @@ def bag_to_dataframe(bag_name, include=None, exclude=None, parse_header=False, s
     index = np.empty(length)
     index.fill(np.NAN)
 
-    # all of the data is loaded
-    for idx, (topic, msg, mt) in enumerate(bag.read_messages(topics=bag_topics)):
-        try:
-            if seconds:
-                index[idx] = msg.header.stamp.to_sec()
-            else:
-                index[idx] = msg.header.stamp.to_nsec()
-        except:
-            if seconds:
-                index[idx] = mt.to_sec()
-            else:
-                index[idx] = mt.to_nsec()
-        fields = dmap[topic]
-        for f, key in fields.iteritems():
+    # nav_msgs/Odometry is decoded straight from the serialized messages,
+    # all other types are deserialized message by message
+    if not read_odometry(bag, bag_topics, yaml_info, dmap, datastore, index, seconds):
+        # all of the data is loaded
+        for idx, (topic, msg, mt) in enumerate(bag.read_messages(topics=bag_topics)):
             try:
-                d = get_message_data(msg, f)
-                if isinstance(d, tuple):
-                    for i, val in enumerate(d):
-                        key_i = '{0}{1}'.format(key, i)
-                        datastore[key_i][idx] = val
+                if seconds:
+                    index[idx] = msg.header.stamp.to_sec()
                 else:
-                    datastore[key][idx] = d
+                    index[idx] = msg.header.stamp.to_nsec()
             except:
-                pass
-
-    bag.close()
+                if seconds:
+                    index[idx] = mt.to_sec()
+                else:
+                    index[idx] = mt.to_nsec()
+            get_values, keys, getters, arrays = accessors[topic]
+            try:
+                # all single value fields with one call
+                values = get_values(msg)
+            except:
+                # at least one field is missing, get the others one by one
+                values = []
+                for getter in getters:
+                    try:
+                        values.append(getter(msg))
+                    except:
+                        values.append(None)
+            for key, d in izip(keys, values):
+                if d is not None:
+                    datastore[key][idx] = d
+            for getter, keys_i in arrays:
+                try:
+                    for key_i, val in izip(keys_i, getter(msg)):
+                        datastore[key_i][idx] = val
+                except:
+                    pass
 
     # convert the index
     if not seconds:
@@ -109,6 +137,214 @@ def bag_to_dataframe(bag_name, include=None, exclude=None, parse_header=False, s
     return pd.DataFrame(data=datastore, index=index)
 
 
+def read_odometry(bag, topics, yaml_info, dmap, datastore, index, seconds):
+    '''
+    Fill datastore and index from raw nav_msgs/Odometry messages without
+    deserializing them, see 'odometry_decoder'
+
+    :returns: False if a topic isn't nav_msgs/Odometry or a field can't be
+              decoded, nothing is filled then
+    '''
+    fields = set()
+    for topic in topics:
+        fields.update(dmap.get(topic, {}).keys())
+    raw = read_raw_odometry(bag, topics, yaml_info, fields)
+    if raw is None:
+        return False
+    msgs, topic_numbers = raw
+    n = msgs.shape[0]
+
+    index[:n] = odometry_stamps(msgs, seconds)
+    for number, topic in enumerate(topics):
+        rows = np.flatnonzero(topic_numbers == number)
+        for f, key in dmap.get(topic, {}).iteritems():
+            values = msgs[f][rows]
+            if values.ndim > 1:
+                for i in range(values.shape[1]):
+                    key_i = '{0}{1}'.format(key, i)
+                    if key_i in datastore:
+                        datastore[key_i][rows] = values[:, i]
+            else:
+                datastore[key][rows] = values
+    return True
+
+
+def read_raw_odometry(bag, topics, yaml_info, fields):
+    '''
+    Decode the fields and the stamp of all raw nav_msgs/Odometry messages
+    of the topics
+
+    :returns: (structured array, array with the position of the topic of
+              every message in 'topics'), None if a topic isn't
+              nav_msgs/Odometry or a field can't be decoded
+    '''
+    topic_types = dict((t['topic'], t['type']) for t in yaml_info['topics'])
+    if len(topics) == 0 or any(topic_types[topic] != odometry_decoder.ODOMETRY_TYPE for topic in topics):
+        return None
+    fields = set(fields) | set(['header.stamp.secs', 'header.stamp.nsecs'])
+    if not odometry_decoder.supports(fields):
+        return None
+
+    numbers = dict((topic, i) for i, topic in enumerate(topics))
+    data = []
+    topic_numbers = []
+    for topic, (datatype, raw, md5sum, position, pytype), mt in bag.read_messages(topics=topics, raw=True):
+        if datatype != odometry_decoder.ODOMETRY_TYPE or md5sum != odometry_decoder.ODOMETRY_MD5:
+            return None
+        data.append(raw)
+        topic_numbers.append(numbers[topic])
+    try:
+        msgs = odometry_decoder.decode(data, fields)
+    except ValueError:
+        return None
+    return msgs, np.array(topic_numbers, dtype=np.int64)
+
+
+def odometry_stamps(msgs, seconds):
+    '''header stamps of decoded messages like 'to_sec' or 'to_nsec' '''
+    if seconds:
+        return msgs['header.stamp.secs'] + msgs['header.stamp.nsecs'] / 1e9
+    return msgs['header.stamp.secs'].astype(np.int64) * 1000000000 + msgs['header.stamp.nsecs']
+
+
+def bag_to_columns(bag_name, fields, include=None, exclude=None, seconds=False):
+    '''
+    Read numeric message fields into one typed array per field, without
+    object arrays and without a dataframe. All selected topics need to
+    have every field.
+
+    :bag_name: String name for the bag file or opened rosbag.Bag
+    :fields: List  Dot delimited numeric message fields, e.g.
+            'twist.twist.linear.x'
+    :include: see 'bag_to_dataframe'
+    :exclude: see 'bag_to_dataframe'
+    :seconds: stamps in seconds (float64), otherwise in nanoseconds (int64)
+
+    :returns: dict with the stamp of every message as 'index' and one
+              contiguous column per field, int64 for integer fields and
+              float64 for all others
+    '''
+    bag, close = open_bag(bag_name)
+    try:
+        topics, length, field_types = select_columns(bag, fields, include, exclude)
+        columns = dict((f, np.empty(length, dtype=np.int64 if field_types[f] == int else np.float64))
+                       for f in fields)
+        index = np.empty(length, dtype=np.float64 if seconds else np.int64)
+        read_columns(bag, topics, fields, seconds, [columns[f] for f in fields], index)
+    finally:
+        if close:
+            bag.close()
+    columns['index'] = index
+    return columns
+
+
+def bag_to_matrix(bag_name, columns, include=None, exclude=None, seconds=False, fill=np.NAN):
+    '''
+    Read numeric message fields into one float64 matrix, every field is
+    written straight into its column (Fortran order, so every column is
+    contiguous)
+
+    :bag_name: String name for the bag file or opened rosbag.Bag
+    :columns: List  Dot delimited numeric message fields, 'index' for the
+            stamp or None for a column filled with 'fill'
+    :include: see 'bag_to_dataframe'
+    :exclude: see 'bag_to_dataframe'
+    :seconds: stamps in seconds, otherwise in nanoseconds
+
+    :returns: matrix with one row per message and one column per entry of
+              'columns'
+    '''
+    fields = [c for c in columns if c is not None and c != 'index']
+    bag, close = open_bag(bag_name)
+    try:
+        topics, length, field_types = select_columns(bag, fields, include, exclude)
+        matrix = np.empty([length, len(columns)], dtype=np.float64, order='F')
+        index = None
+        for j, c in enumerate(columns):
+            if c is None:
+                matrix[:, j] = fill
+            elif c == 'index':
+                index = matrix[:, j]
+        if index is None:
+            index = np.empty(length, dtype=np.float64)
+        read_columns(bag, topics, fields, seconds, [matrix[:, columns.index(f)] for f in fields], index)
+    finally:
+        if close:
+            bag.close()
+    return matrix
+
+
+def open_bag(bag_name):
+    '''
+    :returns: (opened bag, True if it has to be closed again)
+    '''
+    if isinstance(bag_name, basestring):
+        return rosbag.Bag(bag_name), True
+    return bag_name, False
+
+
+def select_columns(bag, fields, include, exclude):
+    '''
+    Select the topics and check that every topic has all fields as
+    numbers
+
+    :returns: (topics, number of messages, dict field -> int or float)
+    '''
+    yaml_info = get_bag_info(bag)
+    topics = prune_topics(get_topics(yaml_info), include, exclude)
+    length = get_length(topics, yaml_info)
+    field_types = dict((f, int) for f in fields)
+    for info in yaml_info['topics']:
+        if info['topic'] not in topics:
+            continue
+        msg_class = get_message_class(info['type'])
+        if msg_class is None:
+            raise ValueError('Could not find types for ' + info['topic'])
+        msg_paths, msg_types = get_base_fields(msg_class(), '', True)
+        for f in fields:
+            if f not in msg_types:
+                raise ValueError('{0} has no field {1}'.format(info['topic'], f))
+            t = msg_types[f]
+            if isinstance(t, float):
+                field_types[f] = float
+            elif not isinstance(t, (int, long)) or isinstance(t, bool):
+                raise ValueError('{0} of {1} is no number'.format(f, info['topic']))
+    return topics, length, field_types
+
+
+def read_columns(bag, topics, fields, seconds, outputs, index):
+    '''
+    Write the fields of all messages of the topics into preallocated
+    arrays, nav_msgs/Odometry is decoded from the raw messages
+
+    :outputs: one array per field
+    :index: array for the stamps
+    '''
+    yaml_info = get_bag_info(bag)
+    raw = read_raw_odometry(bag, topics, yaml_info, fields)
+    if raw is not None:
+        msgs = raw[0]
+        for f, out in izip(fields, outputs):
+            out[:] = msgs[f]
+        index[:] = odometry_stamps(msgs, seconds)
+        return
+
+    if len(fields) == 0:
+        get_values = lambda msg: ()
+    elif len(fields) == 1:
+        get_values = lambda msg, getter=attrgetter(fields[0]): (getter(msg),)
+    else:
+        get_values = attrgetter(*fields)
+    for idx, (topic, msg, mt) in enumerate(bag.read_messages(topics=topics)):
+        try:
+            stamp = msg.header.stamp
+        except AttributeError:
+            stamp = mt
+        index[idx] = stamp.to_sec() if seconds else stamp.to_nsec()
+        for out, d in izip(outputs, get_values(msg)):
+            out[idx] = d
+
+
 def get_length(topics, yaml_info):
     '''
     Find the length (# of rows) in the created dataframe
@@ -123,6 +359,38 @@ def get_length(topics, yaml_info):
     return total
 
 
+def create_accessors(dmap, msg_type):
+    '''
+    Compile the fields of every topic into accessors once per topic, so
+    reading a message doesn't need to split and look up the field names
+
+    :returns: dict topic -> (getter of all single value fields as tuple,
+              their keys, one getter per single value field, list of
+              (getter, keys) for array fields)
+    '''
+    accessors = {}
+    for topic, fields in dmap.iteritems():
+        names = []
+        keys = []
+        arrays = []
+        for f, key in fields.iteritems():
+            t = msg_type[topic][f]
+            if isinstance(t, list):
+                arrays.append((attrgetter(f), ['{0}{1}'.format(key, i) for i in range(len(t))]))
+            else:
+                names.append(f)
+                keys.append(key)
+        getters = [attrgetter(f) for f in names]
+        if len(names) == 0:
+            get_values = lambda msg: ()
+        elif len(names) == 1:
+            get_values = lambda msg, getter=getters[0]: (getter(msg),)
+        else:
+            get_values = attrgetter(*names)
+        accessors[topic] = (get_values, keys, getters, arrays)
+    return accessors
+
+
 def create_data_map(msgs_to_read):
     '''
     Create a data map for usage when parsing the bag
@@ -188,10 +456,11 @@ def prune_topics(bag_topics, include, exclude):
     return list(topics_to_use)
 
 
-def get_msg_info(yaml_info, topics, parse_header=True):
+def get_msg_info(yaml_info, topics, parse_header=True, fields=None):
     '''
     Get info from all of the messages about what they contain
-    and will be added to the dataframe
+    and will be added to the dataframe. If 'fields' is given only those
+    fields and their sub fields are added.
     '''
     topic_info = yaml_info['topics']
     msgs = {}
@@ -210,20 +479,40 @@ def get_msg_info(yaml_info, topics, parse_header=True):
                 else:
                     (msg_paths, msg_types) = get_base_fields(msg_class(), "",
                                                              parse_header)
+                    if fields is not None:
+                        msg_paths = [p for p in msg_paths if select_field(p, fields)]
+                        msg_types = dict((p, msg_types[p]) for p in msg_paths)
                 msgs[topic] = msg_paths
                 classes[topic] = msg_types
     return (msgs, classes)
 
 
-def get_bag_info(bag_file):
-    '''Get uamle dict of the bag information
-    by calling the subprocess -- used to create correct sized
-    arrays'''
-    # Get the info on the bag
-    bag_info = yaml.load(subprocess.Popen(
-        ['rosbag', 'info', '--yaml', bag_file],
-        stdout=subprocess.PIPE).communicate()[0])
-    return bag_info
+def select_field(path, fields):
+    '''True if the field 'path' is one of 'fields' or one of their sub fields'''
+    for f in fields:
+        if path == f or path.startswith(f + '.'):
+            return True
+    return False
+
+
+def get_bag_info(bag):
+    '''Get dict of the bag information like 'rosbag info --yaml' -- used to
+    create correct sized arrays. Topics, types and message counts are taken
+    from the connection and chunk index of the bag, no subprocess is started
+    and no message is read.
+
+    :bag: opened rosbag.Bag or name of the bag file
+    :returns: {'topics': [{'topic': name, 'type': type, 'messages': count}]}'''
+    if isinstance(bag, basestring):
+        bag = rosbag.Bag(bag)
+        try:
+            return get_bag_info(bag)
+        finally:
+            bag.close()
+    topics = []
+    for topic, info in sorted(bag.get_type_and_topic_info().topics.items()):
+        topics.append({'topic': topic, 'type': info.msg_type, 'messages': info.message_count})
+    return {'topics': topics}
 
 
 def get_topics(yaml_info):
@@ -0,0 +1,61 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Growable buffer for collected samples
+@version: 1.0.0
+"""
+
+import numpy as np
+
+
+class SampleBuffer:
+    def __init__(self, columns=8, capacity=1024, growth=2):
+        '''
+        Buffer for rows of samples which are appended one by one. Rows are written into preallocated float64 blocks,
+        if a block is full a new one with 'growth' times the size is added. Already written rows are never copied
+        while appending, so appending takes constant time.
+        :param columns: number of columns of every row
+        :param capacity: number of rows of the first block
+        :param growth: size factor between two consecutive blocks
+        '''
+        self.columns = columns
+        self.growth = growth
+        self.blocks = [np.empty([capacity, columns], dtype=np.float64)]
+        # number of rows written to the last block
+        self.fill = 0
+        self.rows = 0
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, row):
+        '''
+        append one row to the buffer
+        :param row: sequence with 'columns' values
+        '''
+        block = self.blocks[-1]
+        if self.fill == block.shape[0]:
+            block = np.empty([int(block.shape[0] * self.growth), self.columns], dtype=np.float64)
+            self.blocks.append(block)
+            self.fill = 0
+        block[self.fill] = row
+        self.fill += 1
+        self.rows += 1
+
+    def to_array(self):
+        '''
+        return all appended rows as one array, the rows are copied exactly once
+        :return: array with shape [rows, columns]
+        '''
+        used = self.blocks[:-1] + [self.blocks[-1][:self.fill]]
+        return np.concatenate(used, axis=0)
+
+    def clear(self):
+        '''
+        remove all rows, the first block is kept for reuse
+        '''
+        self.blocks = self.blocks[:1]
+        self.fill = 0
+        self.rows = 0
@@ -0,0 +1,161 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Savitzky-Golay filter: smoothing and differentiation in one convolution
+@version: 1.0.0
+"""
+
+import numpy as np
+import math
+
+# order of the fitted polynomials, at least 2 for the second derivative
+POLYORDER = 3
+
+# weights: (window_len, polyorder, deriv) -> (weights of the center, weights of the first and last window_len / 2
+# samples)
+_weights = {}
+
+
+def window_length(smo_para):
+    '''
+    :param smo_para: length of the smoothing window
+    :return: odd window length of the Savitzky-Golay filter, at least 'smo_para'
+    '''
+    return smo_para + 1 - smo_para % 2
+
+
+def weights(window_len, polyorder=POLYORDER, deriv=0):
+    '''
+    least-squares fit of a polynomial to 'window_len' samples, evaluated as derivative of order 'deriv', every
+    combination is only calculated once
+    :param window_len: odd length of the window
+    :param polyorder: order of the polynomial, smaller than 'window_len'
+    :param deriv: order of the derivative, not bigger than 'polyorder'
+    :return: read-only weights of the center sample (length window_len) and read-only weights of the first
+             window_len / 2 samples in the first window (shape [window_len / 2, window_len]), for a sample time of 1
+    '''
+    key = (window_len, polyorder, deriv)
+    result = _weights.get(key)
+    if result is None:
+        if window_len % 2 != 1 or window_len <= polyorder:
+            raise ValueError('window_len has to be odd and bigger than polyorder')
+        if deriv > polyorder:
+            raise ValueError('deriv has to be smaller or equal to polyorder')
+        half = window_len / 2
+        x = np.arange(window_len, dtype=np.float64) - half
+        # polynomial coefficients from the samples of one window
+        fit = np.linalg.pinv(np.vander(x, polyorder + 1, increasing=True))
+        # derivative of the polynomial at every sample of the window
+        powers = np.arange(polyorder + 1)
+        factors = np.array([math.factorial(k) / math.factorial(k - deriv) if k >= deriv else 0 for k in powers],
+                           dtype=np.float64)
+        derivative = factors * x[:, np.newaxis] ** np.maximum(powers - deriv, 0)
+        full = np.dot(derivative, fit)
+        center = full[half].copy()
+        edge = full[:half].copy()
+        center.flags.writeable = False
+        edge.flags.writeable = False
+        result = (center, edge)
+        _weights[key] = result
+    return result
+
+
+def derivative(x, window_len, polyorder=POLYORDER, deriv=0, delta=1.0):
+    '''
+    smoothed derivative of a uniformly sampled signal: a polynomial of order 'polyorder' is fitted to 'window_len'
+    samples around every sample and differentiated 'deriv' times, all samples in one convolution. The first and last
+    window_len / 2 samples use the polynomial of the first and last window.
+    :param x: signal, one dimension
+    :param window_len: odd length of the window
+    :param polyorder: order of the polynomial
+    :param deriv: order of the derivative, 0: smoothing only
+    :param delta: sample time
+    :return: array with the same length as 'x'
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim != 1:
+        raise ValueError('derivative only accepts 1 dimension arrays.')
+    if x.size < window_len:
+        raise ValueError('Input vector needs to be bigger than window size.')
+    center, edge = weights(window_len, polyorder, deriv)
+    half = window_len / 2
+    scale = 1.0 / delta ** deriv
+    y = np.empty_like(x)
+    y[half:x.size - half] = np.convolve(x, center[::-1] * scale, mode='valid')
+    y[:half] = np.dot(edge, x[:window_len]) * scale
+    # last window: reversed in time, so odd derivatives change the sign
+    y[x.size - half:] = (np.dot(edge, x[:-window_len - 1:-1]) * scale * (-1) ** deriv)[::-1]
+    return y
+
+
+def acc_and_jerk(vel, smo_para, delta, polyorder=POLYORDER):
+    '''
+    smoothed acceleration and jerk of one axis straight from the velocity
+    :param vel: velocity of one axis
+    :param smo_para: length of the smoothing window, see 'window_length'
+    :param delta: sample time
+    :return: acceleration, jerk
+    '''
+    window_len = window_length(smo_para)
+    return derivative(vel, window_len, polyorder, 1, delta), derivative(vel, window_len, polyorder, 2, delta)
+
+
+if __name__ == '__main__':
+    import timeit
+    from smoothing import smooth
+
+    # velocity with noise and smooth steps (raised cosine over 0.6 s), 50 Hz, the jerk is known analytically
+    def recording(n, seed=0):
+        random = np.random.RandomState(seed)
+        t = np.arange(n) / 50.0
+        vel = random.normal(0.0, 0.0005, n)
+        jerk = np.zeros(n)
+        starts = np.arange(200, n - 200, 400)
+        step, duration = 0.05, 0.6
+        u = np.arange(30) / 30.0
+        for start in starts:
+            vel[start:start + 30] += step * (1 - np.cos(np.pi * u)) / 2
+            vel[start + 30:] += step
+            jerk[start:start + 30] = np.abs(step * np.pi ** 2 / (2 * duration ** 2) * np.cos(np.pi * u))
+        # y-axis moves with 0.3 times the velocity of the x-axis
+        return t, np.column_stack((vel, 0.3 * vel)), starts, np.sqrt(1.09) * jerk
+
+    def chain(t, vel, smo_para=30):
+        dt = t[1] - t[0]
+        n = t.size
+        smo_acc = [smooth(np.gradient(vel[:, j], dt), smo_para, 'hanning')[:n] for j in [0, 1]]
+        jerk = [np.gradient(a, dt) for a in smo_acc]
+        return np.sqrt(smo_acc[0] ** 2 + smo_acc[1] ** 2), np.sqrt(jerk[0] ** 2 + jerk[1] ** 2)
+
+    def savgol(t, vel, smo_para=30, polyorder=POLYORDER):
+        dt = t[1] - t[0]
+        (acc_x, jerk_x), (acc_y, jerk_y) = [acc_and_jerk(vel[:, j], smo_para, dt, polyorder) for j in [0, 1]]
+        return np.sqrt(acc_x ** 2 + acc_y ** 2), np.sqrt(jerk_x ** 2 + jerk_y ** 2)
+
+    def peaks(jerk, starts):
+        # highest jerk around every step
+        around = starts[:, np.newaxis] + np.arange(-40, 50)
+        i = np.argmax(jerk[around], axis=1)
+        return jerk[around][np.arange(starts.size), i], around[np.arange(starts.size), i]
+
+    # peaks: median over all steps, offset: median of the distance to the nearest true peak (start or end of the
+    # step) in [samples],
+    # noise: standard deviation of the jerk between the steps
+    print '{:>10} | {:>10} | {:>10} | {:>10} | {:>10} | {:>7} | {:>8}'.format(
+        'samples', 'estimator', 'time [s]', 'true peak', 'peak', 'offset', 'noise')
+    for n in [10 ** 4, 10 ** 5, 10 ** 6]:
+        t, vel, starts, expected = recording(n)
+        number = max(1, 10 ** 5 / n)
+        p_true = peaks(expected, starts)[0]
+        quiet = np.ones(n, dtype=bool)
+        quiet[(starts[:, np.newaxis] + np.arange(-50, 80)).ravel()] = False
+        for name, estimator in [('smooth', chain), ('savgol 3', lambda t, vel: savgol(t, vel, polyorder=3)),
+                                ('savgol 4', lambda t, vel: savgol(t, vel, polyorder=4))]:
+            duration = min(timeit.repeat(lambda: estimator(t, vel), number=number, repeat=3)) / number
+            jerk = estimator(t, vel)[1]
+            p, i = peaks(jerk, starts)
+            offset = np.where(np.abs(i - starts) <= np.abs(i - starts - 29), i - starts, i - starts - 29)
+            print '{:>10} | {:>10} | {:>10.6f} | {:>10.4f} | {:>10.4f} | {:>7.1f} | {:>8.4f}'.format(
+                n, name, duration, np.median(p_true), np.median(p), np.median(offset), np.std(jerk[quiet]))
@@ -0,0 +1,94 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Lazily calculated, memoized signals with declared dependencies
+@version: 1.0.0
+"""
+
+
+class Signal(object):
+    def __init__(self, function, depends):
+        '''
+        Attribute which is calculated on first access and then stored in the instance, so it is calculated only once.
+        Use the decorator 'derived' to create it.
+        :param function: calculates the signal from the instance
+        :param depends: names of the attributes and signals the signal is calculated from
+        '''
+        self.function = function
+        self.name = function.__name__
+        self.depends = depends
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.function(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+def derived(*depends):
+    '''
+    decorator for a method which calculates a signal, e.g.
+
+        @derived('A', 'dt')
+        def A_grad_acc_x(self):
+            return np.gradient(self.A[:, AD.VEL_X], self.dt)
+
+    :param depends: names of the attributes and signals the signal is calculated from
+    '''
+    return lambda function: Signal(function, depends)
+
+
+def signals(cls):
+    '''
+    :param cls: class with signals
+    :return: dict name -> Signal
+    '''
+    found = {}
+    for base in reversed(getattr(cls, '__mro__', None) or [cls] + list(cls.__bases__)):
+        for name, value in vars(base).items():
+            if isinstance(value, Signal):
+                found[name] = value
+    return found
+
+
+def dependents(cls, *names):
+    '''
+    :param cls: class with signals
+    :param names: names of attributes or signals
+    :return: set of all signals which are directly or indirectly calculated from one of 'names'
+    '''
+    graph = signals(cls)
+    changed = set(names)
+    result = set()
+    grown = True
+    while grown:
+        grown = False
+        for name, signal in graph.items():
+            if name not in result and changed.intersection(signal.depends):
+                result.add(name)
+                changed.add(name)
+                grown = True
+    return result
+
+
+def calculated(instance):
+    '''
+    :param instance: instance of a class with signals
+    :return: dict name -> value of all signals which are already calculated
+    '''
+    return dict((name, instance.__dict__[name]) for name in signals(instance.__class__) if name in instance.__dict__)
+
+
+def invalidate(instance, *names):
+    '''
+    forget all calculated signals depending on the changed attributes or signals, they are calculated again on the
+    next access
+    :param instance: instance of a class with signals
+    :param names: names of the changed attributes or signals
+    '''
+    for name in dependents(instance.__class__, *names):
+        instance.__dict__.pop(name, None)
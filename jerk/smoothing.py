@@ -0,0 +1,250 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Smoothing with cached windows, direct or FFT convolution
+@version: 1.0.0
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+WINDOWS = ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']
+# windows up to this length are convolved directly, the direct convolution is faster for short windows
+DIRECT_MAX = 128
+# the signal is convolved in overlapping segments (overlap-save) if it is longer than this factor times the window
+SEGMENT_FACTOR = 16
+
+# normalized windows: (window_len, window) -> window
+_kernels = {}
+# spectra of the windows: (window_len, window, nfft) -> rfft of window
+_spectra = {}
+
+
+def kernel(window_len, window='hanning'):
+    '''
+    normalized smoothing window, every window is only built once
+    :param window_len: length of the window
+    :param window: type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
+    :return: read-only window with sum 1
+    '''
+    key = (window_len, window)
+    w = _kernels.get(key)
+    if w is None:
+        if window not in WINDOWS:
+            raise ValueError, "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
+        if window == 'flat':  # moving average
+            w = np.ones(window_len, 'd')
+        else:
+            w = getattr(np, window)(window_len)
+        w = w / w.sum()
+        w.flags.writeable = False
+        _kernels[key] = w
+    return w
+
+
+def spectrum(window_len, window, nfft):
+    '''
+    :return: rfft of the normalized window with length 'nfft', cached
+    '''
+    key = (window_len, window, nfft)
+    k = _spectra.get(key)
+    if k is None:
+        k = np.fft.rfft(kernel(window_len, window), nfft)
+        _spectra[key] = k
+    return k
+
+
+def reflect(x, window_len):
+    '''
+    signal with reflected copies of 'window_len' - 1 values at both ends
+    '''
+    s = np.empty(x.size + 2 * (window_len - 1), dtype=np.result_type(x, np.float64))
+    s[:window_len - 1] = x[window_len - 1:0:-1]
+    s[window_len - 1:window_len - 1 + x.size] = x
+    s[window_len - 1 + x.size:] = x[-2:-window_len - 1:-1]
+    return s
+
+
+def method(n, window_len):
+    '''
+    choose the convolution for a signal of length 'n'
+    :return: 'direct', 'fft' or 'segments'
+    '''
+    if window_len <= DIRECT_MAX:
+        return 'direct'
+    if n > SEGMENT_FACTOR * window_len:
+        return 'segments'
+    return 'fft'
+
+
+def convolve(s, window_len, window='hanning'):
+    '''
+    valid part of the convolution of signal and normalized window, like np.convolve(w, s, mode='valid')
+    :param s: signal, longer than the window
+    :return: array with length len(s) - window_len + 1
+    '''
+    n = s.size
+    how = method(n, window_len)
+    if how == 'direct':
+        return np.convolve(kernel(window_len, window), s, mode='valid')
+
+    if how == 'fft':
+        nfft = 2 ** int(np.ceil(np.log2(n)))
+        y = np.fft.irfft(np.fft.rfft(s, nfft) * spectrum(window_len, window, nfft), nfft)
+        return y[window_len - 1:n]
+
+    # overlap-save: all segments are transformed at once
+    nfft = 2 ** int(np.ceil(np.log2(8 * window_len)))
+    step = nfft - window_len + 1
+    m = n - window_len + 1
+    segments = (m + step - 1) // step
+    padded = np.zeros((segments - 1) * step + nfft)
+    padded[:n] = s
+    blocks = as_strided(padded, shape=(segments, nfft), strides=(step * padded.itemsize, padded.itemsize))
+    y = np.fft.irfft(np.fft.rfft(blocks, nfft, axis=1) * spectrum(window_len, window, nfft), nfft, axis=1)
+    return y[:, window_len - 1:].ravel()[:m]
+
+
+def smooth(x, window_len=11, window='hanning'):
+    """smooth the data using a window with requested size.
+
+    This method is based on the convolution of a scaled window with the signal.
+    The signal is prepared by introducing reflected copies of the signal
+    (with the window size) in both ends so that transient parts are minimized
+    in the begining and end part of the output signal.
+    Windows are cached, long windows are convolved with the FFT.
+
+    input:
+        x: the input signal
+        window_len: the dimension of the smoothing window; should be an odd integer
+        window: the type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
+            flat window will produce a moving average smoothing.
+
+    output:
+        the smoothed signal
+
+    NOTE: length(output) == length(input) for even window_len, length(input) + 1 for odd window_len
+    """
+
+    if x.ndim != 1:
+        raise ValueError, "smooth only accepts 1 dimension arrays."
+
+    if x.size < window_len:
+        raise ValueError, "Input vector needs to be bigger than window size."
+
+    if window_len < 3:
+        return x
+
+    if not window in WINDOWS:
+        raise ValueError, "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
+
+    y = convolve(reflect(x, window_len), window_len, window)
+
+    return y[(window_len / 2 - 1):-(window_len / 2)]
+
+
+def smooth_many(x, windows):
+    """smooth one signal with many windows in one pass.
+
+    The signal is reflected once with the longest window, the reflection of every shorter window is a part of it.
+    Short windows are convolved directly with their part of the padded signal. For long windows the padded signal is
+    cut into overlapping segments which are transformed once, the spectra of all long windows are applied to them
+    together (overlap-save). Every row is the same as smooth(x, window_len, window), up to rounding for long windows.
+
+    input:
+        x: the input signal
+        windows: list of (window, window_len) pairs, e.g. [('hanning', 10), ('flat', 30)]
+
+    output:
+        array with one row per window and len(x) columns (odd windows are one value longer in 'smooth', the last
+        value is dropped)
+    """
+    if x.ndim != 1:
+        raise ValueError, "smooth only accepts 1 dimension arrays."
+    n = x.size
+    result = np.empty([len(windows), n])
+    if len(windows) == 0:
+        return result
+    longest = max(max(window_len for window, window_len in windows), 2)
+    if n < longest:
+        raise ValueError, "Input vector needs to be bigger than window size."
+    for window, window_len in windows:
+        if not window in WINDOWS:
+            raise ValueError, "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
+
+    s = reflect(x, longest)
+    long_windows = []
+    for j, (window, window_len) in enumerate(windows):
+        if window_len < 3:
+            result[j] = x
+        elif window_len <= DIRECT_MAX:
+            # the reflection of this window starts at 'longest - window_len' in 's',
+            # 'smooth' drops the first 'window_len / 2 - 1' values
+            start = longest - window_len + window_len / 2 - 1
+            result[j] = np.convolve(kernel(window_len, window), s[start:start + n + window_len - 1], mode='valid')
+        else:
+            long_windows.append(j)
+    if len(long_windows) == 0:
+        return result
+
+    # overlap-save for all long windows with the same segments
+    nfft = 2 ** int(np.ceil(np.log2(8 * longest)))
+    step = nfft - longest + 1
+    # values of the full convolution from index 'longest - 1' on are needed
+    m = n + longest / 2
+    segments = (m + step - 1) // step
+    padded = np.zeros(max((segments - 1) * step + nfft, s.size))
+    padded[:s.size] = s
+    blocks = as_strided(padded, shape=(segments, nfft), strides=(step * padded.itemsize, padded.itemsize))
+    spectra = np.fft.rfft(blocks, nfft, axis=1)
+    # windows transformed back together, limited to about 16 MB of spectra at once
+    group = max(1, 2 ** 20 / spectra.size)
+    for first in xrange(0, len(long_windows), group):
+        part = long_windows[first:first + group]
+        kernels = np.array([spectrum(windows[j][1], windows[j][0], nfft) for j in part])
+        y = np.fft.irfft(spectra[np.newaxis] * kernels[:, np.newaxis], nfft, axis=2)[:, :, longest - 1:]
+        y = y.reshape(len(part), -1)
+        for i, j in enumerate(part):
+            start = windows[j][1] / 2 - 1
+            result[j] = y[i, start:start + n]
+    return result
+
+
+if __name__ == '__main__':
+    import timeit
+
+    # old implementation for comparison
+    def smooth_direct(x, window_len, window):
+        s = np.r_[x[window_len - 1:0:-1], x, x[-2:-window_len - 1:-1]]
+        w = eval('np.' + window + '(window_len)')
+        y = np.convolve(w / w.sum(), s, mode='valid')
+        return y[(window_len / 2 - 1):-(window_len / 2)]
+
+    np.random.seed(0)
+    print '{:>10} | {:>6} | {:>8} | {:>12} | {:>12} | {:>8}'.format('samples', 'window', 'method', 'direct [s]',
+                                                                      'smooth [s]', 'error')
+    for n in [10 ** 4, 10 ** 5, 10 ** 6]:
+        x = np.cumsum(np.random.randn(n))
+        for window_len in [30, 101, 501, 2001]:
+            number = max(1, 10 ** 6 / n)
+            t_old = min(timeit.repeat(lambda: smooth_direct(x, window_len, 'hanning'), number=number, repeat=3))
+            t_new = min(timeit.repeat(lambda: smooth(x, window_len, 'hanning'), number=number, repeat=3))
+            error = np.abs(smooth_direct(x, window_len, 'hanning') - smooth(x, window_len, 'hanning')).max()
+            print '{:>10} | {:>6} | {:>8} | {:>12.6f} | {:>12.6f} | {:>8.1e}'.format(
+                n, window_len, method(n + 2 * window_len - 2, window_len), t_old / number, t_new / number, error)
+
+    print ''
+    print '{:>10} | {:>7} | {:>12} | {:>14} | {:>8}'.format('samples', 'windows', 'smooth [s]', 'smooth_many [s]',
+                                                          'error')
+    for n in [10 ** 4, 10 ** 5, 10 ** 6]:
+        x = np.cumsum(np.random.randn(n))
+        windows = [(window, window_len) for window in ['hanning', 'hamming', 'flat'] for window_len in
+                   range(10, 101, 10) + range(200, 1001, 100)]
+        number = max(1, 10 ** 5 / n)
+        t_single = min(timeit.repeat(lambda: [smooth(x, l, w)[:n] for w, l in windows], number=number, repeat=3))
+        t_many = min(timeit.repeat(lambda: smooth_many(x, windows), number=number, repeat=3))
+        error = np.abs(np.array([smooth(x, l, w)[:n] for w, l in windows]) - smooth_many(x, windows)).max()
+        print '{:>10} | {:>7} | {:>12.6f} | {:>14.6f} | {:>8.1e}'.format(n, len(windows), t_single / number,
+                                                                         t_many / number, error)
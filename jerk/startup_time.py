@@ -0,0 +1,101 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Startup time of main.py until the arguments are parsed, for every input mode
+@version: 1.0.0
+"""
+
+from bcolors import TerminalColors as tc
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# input modes: name and commandline arguments of main.py, the files don't have to exist to parse the arguments
+MODES = [('csv', ['-rc', '-csv', 'test.csv']),
+         ('csv stream', ['-rc', '-csv', 'test.csv', '-cs', '10000']),
+         ('bag', ['-rb', '-bag', 'test.bag']),
+         ('binary', ['-npy', 'test.bin']),
+         ('topic', ['-t', '/base/odometry_controller/odometry']),
+         ('figures', ['-rc', '-csv', 'test.csv', '-s'])]
+
+# packages which are only imported when the data is read or the figures are written, never to parse the arguments
+HEAVY = ['pandas', 'matplotlib', 'scipy', 'rospy', 'rosbag', 'roslib', 'nav_msgs', 'std_msgs', 'rosbag_pandas',
+         'listener', 'butterbandwith']
+
+# runs in a new interpreter: import main, parse the arguments and report times and imported packages
+PROBE = '''
+import json, sys, time
+start = time.time()
+import main
+imported = time.time()
+main.JerkEvaluation(json.loads(sys.argv[1]))
+parsed = time.time()
+heavy = json.loads(sys.argv[2])
+print json.dumps({'import': imported - start, 'parse_args': parsed - start,
+                  'modules': sorted(set(name.split('.')[0] for name in sys.modules
+                                        if sys.modules[name] is not None and name.split('.')[0] in heavy))})
+'''
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Measure the time until main.py has parsed its arguments for every input mode, fails if a '
+                    'heavy package is imported before or a mode is slower than \'--limit\'')
+    parser.add_argument('-n', '--repeat', help='number of runs per mode, the fastest is reported, default = 5',
+                        type=int, default=5)
+    parser.add_argument('-l', '--limit', help='max allowed time to parse_args per mode in [s], default: no limit',
+                        type=float)
+    parser.add_argument('-o', '--output', help='name and path of a json-file for the results', type=str)
+    return parser
+
+
+def measure(arguments, repeat):
+    '''
+    start main.py 'repeat' times in a new interpreter and parse 'arguments'
+    :param arguments: commandline arguments of main.py
+    :param repeat: number of runs
+    :return: dict with the fastest times in [s] ('total': start of the interpreter to parse_args, 'import': import
+             of main, 'parse_args': import of main and parse_args) and the heavy packages which were imported
+    '''
+    directory = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for i in xrange(repeat):
+        start = time.time()
+        output = subprocess.check_output([sys.executable, '-c', PROBE, json.dumps(arguments), json.dumps(HEAVY)],
+                                         cwd=directory)
+        total = time.time() - start
+        result = json.loads(output.strip().splitlines()[-1])
+        result['total'] = total
+        if best is None or result['total'] < best['total']:
+            best = result
+    return best
+
+
+def main():
+    args = build_parser().parse_args()
+    results = []
+    print '{:>12} | {:>10} | {:>10} | {:>14} | {}'.format('mode', 'total [s]', 'import [s]', 'parse_args [s]',
+                                                         'heavy packages')
+    for name, arguments in MODES:
+        result = measure(arguments, args.repeat)
+        result['mode'] = name
+        result['arguments'] = arguments
+        result['passed'] = len(result['modules']) == 0 and (args.limit is None or result['parse_args'] <= args.limit)
+        results.append(result)
+        line = '{:>12} | {:>10.3f} | {:>10.3f} | {:>14.3f} | {}'.format(
+            name, result['total'], result['import'], result['parse_args'], ', '.join(result['modules']) or '-')
+        print (tc.OKGREEN if result['passed'] else tc.FAIL) + line + tc.ENDC
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return all(result['passed'] for result in results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
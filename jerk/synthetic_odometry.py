@@ -0,0 +1,231 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Deterministic synthetic odometry with jerk spikes, jitter and dropouts, as array, csv-, bag-, binary
+            file or messages
+@version: 1.0.0
+"""
+
+import numpy as np
+import binary_data
+import argparse
+import os
+
+# columns of the data matrix, same order as 'JerkEvaluation.data'
+COLUMNS = ['%time', 'field.header.seq', 'field.header.stamp', 'field.twist.twist.linear.x',
+           'field.twist.twist.linear.y', 'field.twist.twist.angular.z', 'field.pose.pose.position.x',
+           'field.pose.pose.position.y']
+# columns of a csv-file written with 'rostopic echo -p' like 'Ingolstadt_Test3.csv'
+CSV_HEADER = (['%time', 'field.header.seq', 'field.header.stamp', 'field.header.frame_id', 'field.child_frame_id'] +
+              ['field.pose.pose.position.' + a for a in 'xyz'] +
+              ['field.pose.pose.orientation.' + a for a in 'xyzw'] +
+              ['field.pose.covariance' + str(i) for i in xrange(36)] +
+              ['field.twist.twist.linear.' + a for a in 'xyz'] +
+              ['field.twist.twist.angular.' + a for a in 'xyz'] +
+              ['field.twist.covariance' + str(i) for i in xrange(36)])
+# stamp of the first message in [ns], first stamp of 'Ingolstadt_Test3.csv'
+START = 1499254133620209808
+# delay between stamp and recording ('%time') in [s]
+RECORD_DELAY = 0.046
+TOPIC = '/base/odometry_controller/odometry'
+
+# max speed in [m/s], duration of one drive in [s] and duration of speeding up and slowing down in [s]
+SPEED = 0.5
+PERIOD = 20.0
+RAMP = 2.0
+
+
+def ramp(u):
+    '''
+    raised cosine from 0 (u <= 0) to 1 (u >= 1), its jerk is bounded
+    '''
+    return (1.0 - np.cos(np.pi * np.clip(u, 0.0, 1.0))) / 2.0
+
+
+def odometry(n, rate=50.0, spikes=10, spike_size=0.05, spike_duration=0.1, jitter=0.0, dropouts=0.0,
+             noise=0.0005, seed=0):
+    '''
+    deterministic odometry of a base driving forward and stopping every 'PERIOD' seconds with smooth ramps
+    (max jerk SPEED * pi^2 / (2 * RAMP^2) = 0.62 [m/s^3]), with added velocity steps as jerk spikes
+    :param n: number of samples
+    :param rate: sample rate in [Hz]
+    :param spikes: number of velocity steps in x-direction, every step is reversed 1 [s] later
+    :param spike_size: height of the steps in [m/s], the sign is random
+    :param spike_duration: duration of the steps (raised cosine) in [s], the jerk of a step is
+                           spike_size * pi^2 / (2 * spike_duration^2)
+    :param jitter: standard deviation of the stamps in sample times, stamps can be repeated or go backwards
+    :param dropouts: probability that messages are missing after a message, 1 to 5 messages are dropped
+    :param noise: standard deviation of the velocity in [m/s]
+    :param seed: seed of the random numbers, the same arguments always give the same data
+    :return: data matrix with the columns of 'COLUMNS', stamps in [s] starting at 0 (the same as read by
+             'JerkEvaluation.read_data_csv'), dict with 'spike_times' in [s] and 'spike_jerk' in [m/s^3] (jerk of one
+             step without smoothing)
+    '''
+    random = np.random.RandomState(seed)
+    # messages are counted by 'field.header.seq', dropped messages leave gaps
+    steps = np.ones(n, dtype=np.int64)
+    steps[0] = 0
+    dropped = random.rand(n) < dropouts
+    dropped[0] = False
+    steps[dropped] += random.randint(1, 6, dropped.sum())
+    seq = np.cumsum(steps)
+    nominal = seq / float(rate)
+    t = nominal + random.normal(0.0, jitter / rate, n) if jitter > 0 else nominal
+    t = t - t[0]
+
+    # speed up at the start and slow down in the middle of every period
+    tau = np.mod(nominal, PERIOD)
+    speed = SPEED * (ramp(tau / RAMP) - ramp((tau - PERIOD / 2) / RAMP))
+    heading = 0.3 * np.sin(2 * np.pi * nominal / 60.0)
+    vel_x = speed * np.cos(heading)
+    vel_y = speed * np.sin(heading)
+    omega = 0.1 * np.sin(2 * np.pi * nominal / 40.0)
+
+    # velocity steps: ramp inside the step, constant offset after it
+    spike_times = np.sort(random.uniform(1.0, max(nominal[-1] - 2.0, 1.0), spikes)) if n > 1 else np.zeros(0)
+    signs = random.choice([-1.0, 1.0], spikes)
+    offset = np.zeros(n)
+    after = np.zeros(n + 1)
+    for start, sign in zip(spike_times, signs):
+        for begin, size in [(start, sign * spike_size), (start + 1.0, -sign * spike_size)]:
+            i0, i1 = np.searchsorted(nominal, [begin, begin + spike_duration])
+            offset[i0:i1] += size * ramp((nominal[i0:i1] - begin) / spike_duration)
+            after[i1] += size
+    vel_x += offset + np.cumsum(after)[:n]
+
+    if noise > 0:
+        vel_x += random.normal(0.0, noise, n)
+        vel_y += random.normal(0.0, noise, n)
+
+    # position integrated with the trapezoidal rule
+    dt = np.diff(nominal)
+    pos_x = np.concatenate(([0.0], np.cumsum((vel_x[1:] + vel_x[:-1]) / 2 * dt)))
+    pos_y = np.concatenate(([0.0], np.cumsum((vel_y[1:] + vel_y[:-1]) / 2 * dt)))
+
+    A = np.column_stack((t, seq, t, vel_x, vel_y, omega, pos_x, pos_y))
+    info = {'spike_times': spike_times, 'spike_jerk': spike_size * np.pi ** 2 / (2 * spike_duration ** 2)}
+    return A, info
+
+
+def stamps_ns(seconds):
+    '''
+    :param seconds: stamps in [s] starting at 0
+    :return: int64 stamps in [ns] starting at 'START'
+    '''
+    return START + np.round(np.asarray(seconds) * 10 ** 9).astype(np.int64)
+
+
+def yaw(A):
+    '''
+    :return: orientation around z integrated from the angular velocity
+    '''
+    t = A[:, 2]
+    omega = A[:, 5]
+    return np.concatenate(([0.0], np.cumsum((omega[1:] + omega[:-1]) / 2 * np.diff(t))))
+
+
+def to_csv(A, filename, chunk_size=100000):
+    '''
+    write a csv-file with all 90 columns of 'rostopic echo -p' like 'Ingolstadt_Test3.csv'
+    :param A: data matrix from 'odometry'
+    :param filename: path to csv-file
+    :param chunk_size: number of rows formatted at once
+    '''
+    covariance = ','.join('0.1' if i % 7 == 0 else '0.0' for i in xrange(36))
+    row = ('%d,%d,%d,/odom_combined,/base_footprint,%r,%r,0.0,0.0,0.0,%r,%r,' + covariance +
+           ',%r,%r,0.0,0.0,0.0,%r,' + covariance + '\n')
+    half_yaw = yaw(A) / 2
+    with open(filename, 'w') as f:
+        f.write(','.join(CSV_HEADER) + '\n')
+        for first in xrange(0, A.shape[0], chunk_size):
+            part = slice(first, first + chunk_size)
+            columns = zip(stamps_ns(A[part, 0] + RECORD_DELAY).tolist(), A[part, 1].astype(np.int64).tolist(),
+                          stamps_ns(A[part, 2]).tolist(), A[part, 6].tolist(), A[part, 7].tolist(),
+                          np.sin(half_yaw[part]).tolist(), np.cos(half_yaw[part]).tolist(), A[part, 3].tolist(),
+                          A[part, 4].tolist(), A[part, 5].tolist())
+            f.write(''.join(row % values for values in columns))
+
+
+def to_binary(A, filename):
+    '''
+    write a binary file which is read with '-npy', see 'binary_data.py'
+    '''
+    binary_data.write(filename, A, COLUMNS, TOPIC, 'synthetic_odometry')
+
+
+def messages(A):
+    '''
+    odometry messages like they are received by 'listener.NodeListener.callback'
+    :param A: data matrix from 'odometry'
+    :return: generator of nav_msgs/Odometry
+    '''
+    # imported here, ROS is only needed for messages and bag-files
+    import rospy
+    from nav_msgs.msg import Odometry
+    half_yaw = yaw(A) / 2
+    stamps = stamps_ns(A[:, 2])
+    for i in xrange(A.shape[0]):
+        msg = Odometry()
+        msg.header.seq = int(A[i, 1])
+        msg.header.stamp = rospy.Time(int(stamps[i] // 10 ** 9), int(stamps[i] % 10 ** 9))
+        msg.header.frame_id = '/odom_combined'
+        msg.child_frame_id = '/base_footprint'
+        msg.pose.pose.position.x = A[i, 6]
+        msg.pose.pose.position.y = A[i, 7]
+        msg.pose.pose.orientation.z = np.sin(half_yaw[i])
+        msg.pose.pose.orientation.w = np.cos(half_yaw[i])
+        msg.twist.twist.linear.x = A[i, 3]
+        msg.twist.twist.linear.y = A[i, 4]
+        msg.twist.twist.angular.z = A[i, 5]
+        yield msg
+
+
+def to_bag(A, filename, topic=TOPIC):
+    '''
+    write the messages of 'messages' to a bag-file, recorded at their stamp plus 'RECORD_DELAY'
+    '''
+    import rosbag
+    import rospy
+    bag = rosbag.Bag(filename, 'w')
+    try:
+        for msg, record in zip(messages(A), stamps_ns(A[:, 0] + RECORD_DELAY)):
+            bag.write(topic, msg, rospy.Time(int(record // 10 ** 9), int(record % 10 ** 9)))
+    finally:
+        bag.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Write synthetic odometry to a csv-, bag- or binary file')
+    parser.add_argument('samples', help='number of samples, e.g. 1e6', type=lambda value: int(float(value)))
+    parser.add_argument('output', help='path to output file, the ending selects the format: .csv, .bag or .bin')
+    parser.add_argument('--rate', help='sample rate, default = 50 [Hz]', type=float, default=50.0)
+    parser.add_argument('--spikes', help='number of velocity steps, default = 10', type=int, default=10)
+    parser.add_argument('--spike_size', help='height of the velocity steps, default = 0.05 [m/s]', type=float,
+                        default=0.05)
+    parser.add_argument('--spike_duration', help='duration of the velocity steps, default = 0.1 [s]', type=float,
+                        default=0.1)
+    parser.add_argument('--jitter', help='standard deviation of the stamps in sample times, default = 0', type=float,
+                        default=0.0)
+    parser.add_argument('--dropouts', help='probability of dropped messages after a message, default = 0',
+                        type=float, default=0.0)
+    parser.add_argument('--seed', help='seed of the random numbers, default = 0', type=int, default=0)
+    return parser
+
+
+if __name__ == '__main__':
+    args = build_parser().parse_args()
+    A, info = odometry(args.samples, args.rate, args.spikes, args.spike_size, args.spike_duration, args.jitter,
+                       args.dropouts, seed=args.seed)
+    ending = os.path.splitext(args.output)[1]
+    if ending == '.csv':
+        to_csv(A, args.output)
+    elif ending == '.bag':
+        to_bag(A, args.output)
+    elif ending == '.bin':
+        to_binary(A, args.output)
+    else:
+        raise ValueError('unknown ending \'{}\', use .csv, .bag or .bin'.format(ending))
+    print 'Wrote {} samples ({:.1f} [s], {} spikes with jerk {:.1f} [m/s^3]) to \'{}\''.format(
+        A.shape[0], A[-1, 2] - A[0, 2], len(info['spike_times']), info['spike_jerk'], args.output)
@@ -0,0 +1,85 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Test that 'BlockJerk' gives the same smoothed acceleration and jerk for any split of a recording into
+            blocks as for the whole recording
+@version: 1.0.0
+"""
+
+import numpy as np
+import unittest
+
+import derivatives
+import synthetic_odometry
+from block_jerk import BlockJerk
+from smoothing import smooth
+
+FHS = synthetic_odometry.COLUMNS.index('field.header.stamp')
+VEL_X = synthetic_odometry.COLUMNS.index('field.twist.twist.linear.x')
+VEL_Y = synthetic_odometry.COLUMNS.index('field.twist.twist.linear.y')
+
+
+def push_blocks(blocks, A, bounds):
+    '''
+    push the rows of A split at 'bounds' and finish the recording
+    :return: rows with stamps starting at 0s, smoothed acceleration and smoothed jerk of all emitted rows
+    '''
+    results = []
+    emitted = 0
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        results.append(blocks.push(A[first:last]))
+    results.append(blocks.finish())
+    for index, rows, smo_acc, smo_jerk in results:
+        # every row is emitted exactly once and in order
+        assert index == emitted
+        emitted += smo_jerk.size
+    results = [result for result in results if result[3].size > 0]
+    return (np.concatenate([result[1] for result in results]), np.concatenate([result[2] for result in results]),
+            np.concatenate([result[3] for result in results]))
+
+
+class TestBlockJerk(unittest.TestCase):
+    def setUp(self):
+        self.A, info = synthetic_odometry.odometry(2000, spikes=8, spike_size=0.2, jitter=0.3, dropouts=0.01)
+        # a few duplicate stamps besides the ones of the jitter, which 'stamps' drops
+        self.A[[500, 1234, 1235], FHS] = self.A[[499, 1233, 1233], FHS]
+
+    def assertBlocks(self, derivative, estimator):
+        blocks = BlockJerk(smooth, FHS, VEL_X, VEL_Y, derivative=derivative, estimator=estimator)
+        index, expected_rows, expected_acc, expected_jerk = blocks.push(self.A, final=True)
+        self.assertEqual(index, 0)
+        self.assertEqual(expected_rows[0, FHS], 0.0)
+        random = np.random.RandomState(2)
+        splits = [np.append(np.arange(0, self.A.shape[0], block_size), self.A.shape[0])
+                  for block_size in [1, 31, 32, 33, 100, 1000]]
+        splits.append(np.unique(np.concatenate(([0, self.A.shape[0]], random.randint(0, self.A.shape[0], 40)))))
+        for bounds in splits:
+            blocks.reset()
+            rows, smo_acc, smo_jerk = push_blocks(blocks, self.A, bounds)
+            np.testing.assert_array_equal(rows, expected_rows)
+            np.testing.assert_allclose(smo_acc, expected_acc, rtol=1e-9, atol=1e-12)
+            np.testing.assert_allclose(smo_jerk, expected_jerk, rtol=1e-9, atol=1e-12)
+
+    def test_scalar(self):
+        self.assertBlocks('scalar', 'smooth')
+
+    def test_stamps(self):
+        '''rows with duplicate stamps are dropped in any block, also at the border of two blocks'''
+        self.assertBlocks('stamps', 'smooth')
+        blocks = BlockJerk(smooth, FHS, VEL_X, VEL_Y, derivative='stamps')
+        rows = blocks.push(self.A, final=True)[1]
+        self.assertEqual(rows.shape[0], derivatives.increasing(self.A[:, FHS]).sum())
+        self.assertTrue((np.diff(rows[:, FHS]) > 0).all())
+
+    def test_savgol(self):
+        self.assertBlocks('scalar', 'savgol')
+
+    def test_unsupported(self):
+        self.assertRaises(ValueError, BlockJerk, smooth, FHS, VEL_X, VEL_Y, derivative='uniform')
+        self.assertRaises(ValueError, BlockJerk, smooth, FHS, VEL_X, VEL_Y, estimator='butter')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Test that 'StreamingFilter' gives the output of 'sosfilt' on the whole signal for any split into blocks
+@version: 1.0.0
+"""
+
+import numpy as np
+import unittest
+from scipy.signal import sosfilt, sosfilt_zi
+
+import butterbandwith
+import synthetic_odometry
+
+RATE = 50.0
+
+
+class TestStreamingFilter(unittest.TestCase):
+    def setUp(self):
+        A, info = synthetic_odometry.odometry(2000, rate=RATE, spikes=10, spike_size=0.2, noise=0.005)
+        # velocity in x- and y-direction
+        self.x = A[:, [synthetic_odometry.COLUMNS.index('field.twist.twist.linear.x'),
+                       synthetic_odometry.COLUMNS.index('field.twist.twist.linear.y')]]
+        self.designs = [butterbandwith.butter_sos(4, 1.4, RATE), butterbandwith.butter_sos(6, 0.8, RATE),
+                        butterbandwith.butter_sos(3, (0.5, 5.0), RATE)]
+
+    def assertBlocks(self, sos, x, bounds):
+        '''filter x split at 'bounds' and compare with 'sosfilt' on all samples'''
+        channels = 1 if x.ndim == 1 else x.shape[1]
+        streaming = butterbandwith.StreamingFilter(sos, channels)
+        y = np.concatenate([streaming.filter(x[first:last]) for first, last in zip(bounds[:-1], bounds[1:])])
+        np.testing.assert_allclose(y, sosfilt(sos, x, axis=0), rtol=1e-9, atol=1e-12)
+
+    def test_samples(self):
+        '''sample by sample, like 'OnlineJerk' '''
+        for sos in self.designs:
+            streaming = butterbandwith.StreamingFilter(sos)
+            y = np.array([streaming.filter(value) for value in self.x[:, 0]])
+            np.testing.assert_allclose(y, sosfilt(sos, self.x[:, 0]), rtol=1e-9, atol=1e-12)
+            streaming = butterbandwith.StreamingFilter(sos, 2)
+            y = np.array([streaming.filter(sample) for sample in self.x])
+            self.assertEqual(y.shape, self.x.shape)
+            np.testing.assert_allclose(y, sosfilt(sos, self.x, axis=0), rtol=1e-9, atol=1e-12)
+
+    def test_blocks(self):
+        '''blocks of fixed and random length, also empty ones, with one and two channels'''
+        n = self.x.shape[0]
+        random = np.random.RandomState(3)
+        splits = [np.append(np.arange(0, n, block_size), n) for block_size in [7, 100, n]]
+        splits.append(np.sort(np.concatenate(([0, n, n // 2, n // 2], random.randint(0, n, 40)))))
+        for sos in self.designs:
+            for bounds in splits:
+                self.assertBlocks(sos, self.x[:, 0], bounds)
+                self.assertBlocks(sos, self.x, bounds)
+
+    def test_reset(self):
+        '''reset with a start value: no transient, like 'sosfilt' with the steady state of that value'''
+        sos = self.designs[0]
+        x0 = self.x[0]
+        streaming = butterbandwith.StreamingFilter(sos, 2)
+        streaming.filter(self.x[:100])
+        streaming.reset(x0)
+        zi = sosfilt_zi(sos)[:, :, np.newaxis] * x0
+        np.testing.assert_allclose(streaming.filter(self.x), sosfilt(sos, self.x, axis=0, zi=zi)[0],
+                                   rtol=1e-9, atol=1e-12)
+        # a constant input stays constant
+        streaming.reset(x0)
+        np.testing.assert_allclose(streaming.filter(np.tile(x0, (50, 1))), np.tile(x0, (50, 1)), atol=1e-12)
+        # zero state again
+        streaming.reset()
+        np.testing.assert_allclose(streaming.filter(self.x), sosfilt(sos, self.x, axis=0), rtol=1e-9, atol=1e-12)
+
+    def test_design(self):
+        '''every design is calculated once and can't be changed'''
+        self.assertIs(butterbandwith.butter_sos(4, 1.4, RATE), self.designs[0])
+        self.assertFalse(self.designs[0].flags.writeable)
+        self.assertRaises(ValueError, butterbandwith.butter_sos, 4, RATE / 2, RATE)
+
+
+if __name__ == '__main__':
+    unittest.main()
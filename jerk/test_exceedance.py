@@ -0,0 +1,113 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Test that the exceedance intervals found block by block and the threshold sweep agree with a plain loop
+            over all samples
+@version: 1.0.0
+"""
+
+import numpy as np
+import unittest
+
+import exceedance
+import synthetic_odometry
+from block_jerk import BlockJerk
+from smoothing import smooth
+
+
+def intervals_loop(jerk, stamps, max_jerk):
+    '''
+    reference: runs of samples with jerk >= max_jerk, sample by sample
+    :return: list of (start_index, end_index, start_time, end_time, peak_jerk, peak_time)
+    '''
+    intervals = []
+    start = None
+    for i in xrange(jerk.size + 1):
+        above = i < jerk.size and jerk[i] >= max_jerk
+        if above and start is None:
+            start = i
+        elif not above and start is not None:
+            peak = start + int(np.argmax(jerk[start:i]))
+            intervals.append((start, i - 1, stamps[start], stamps[min(i, jerk.size - 1)], jerk[peak], stamps[peak]))
+            start = None
+    return intervals
+
+
+def odometry_jerk(n=5000, seed=0):
+    '''
+    :return: smoothed jerk and stamps of synthetic odometry with jerk spikes, jitter and dropouts
+    '''
+    A, info = synthetic_odometry.odometry(n, spikes=20, spike_size=0.2, jitter=0.2, dropouts=0.01, seed=seed)
+    blocks = BlockJerk(smooth, 2, 3, 4, derivative='stamps')
+    index, rows, smo_acc, smo_jerk = blocks.push(A, final=True)
+    return smo_jerk, rows[:, 2]
+
+
+class TestExceedance(unittest.TestCase):
+    def setUp(self):
+        self.jerk, self.stamps = odometry_jerk()
+        self.thresholds = [0.2, 0.5, 1.0, 2.0, np.percentile(self.jerk, 99), self.jerk.max(), self.jerk.max() + 1]
+
+    def assertIntervals(self, intervals, expected):
+        self.assertEqual(intervals.size, len(expected))
+        for row, values in zip(intervals, expected):
+            self.assertEqual((row['start_index'], row['end_index']), values[:2])
+            np.testing.assert_array_equal([row['start_time'], row['end_time'], row['peak_jerk'], row['peak_time']],
+                                          values[2:])
+            self.assertEqual(row['duration'], row['end_time'] - row['start_time'])
+
+    def test_intervals(self):
+        '''all intervals of the whole signal at once'''
+        for max_jerk in self.thresholds:
+            self.assertIntervals(exceedance.exceedance_intervals(self.jerk, self.stamps, max_jerk),
+                                 intervals_loop(self.jerk, self.stamps, max_jerk))
+
+    def test_blocks(self):
+        '''intervals reaching over any number of blocks are continued, like in 'evaluate_csv_stream' '''
+        random = np.random.RandomState(1)
+        for max_jerk in self.thresholds:
+            expected = intervals_loop(self.jerk, self.stamps, max_jerk)
+            for block_size in [1, 7, 100, 1000, self.jerk.size]:
+                tracker = exceedance.ExceedanceTracker(max_jerk)
+                for first in xrange(0, self.jerk.size, block_size):
+                    tracker.update(first, self.stamps[first:first + block_size], self.jerk[first:first + block_size])
+                self.assertIntervals(tracker.finish(), expected)
+            # blocks of random length, also empty ones
+            tracker = exceedance.ExceedanceTracker(max_jerk)
+            bounds = np.unique(np.concatenate(([0, self.jerk.size], random.randint(0, self.jerk.size, 50))))
+            for first, last in zip(bounds[:-1], bounds[1:]):
+                tracker.update(first, self.stamps[first:last], self.jerk[first:last])
+                tracker.update(last, self.stamps[last:last], self.jerk[last:last])
+            self.assertIntervals(tracker.finish(), expected)
+
+    def test_first(self):
+        '''first interval is known as soon as it starts'''
+        max_jerk = self.thresholds[2]
+        expected = intervals_loop(self.jerk, self.stamps, max_jerk)
+        tracker = exceedance.ExceedanceTracker(max_jerk)
+        for first in xrange(0, self.jerk.size, 100):
+            tracker.update(first, self.stamps[first:first + 100], self.jerk[first:first + 100])
+            if first + 100 > expected[0][0]:
+                self.assertEqual(tracker.first()['start_index'], expected[0][0])
+            else:
+                self.assertIsNone(tracker.first())
+
+    def test_sweep(self):
+        '''one sweep gives the result of every single threshold'''
+        sweep = exceedance.threshold_sweep(self.jerk, self.stamps, self.thresholds)
+        for row, max_jerk in zip(sweep, self.thresholds):
+            intervals = exceedance.exceedance_intervals(self.jerk, self.stamps, max_jerk)
+            self.assertEqual(row['threshold'], max_jerk)
+            self.assertEqual(row['violations'], intervals.size)
+            self.assertEqual(row['passed'], intervals.size == 0)
+            self.assertAlmostEqual(row['time_above'], intervals['duration'].sum(), places=9)
+            if intervals.size > 0:
+                self.assertEqual(row['first_violation'], intervals['start_time'][0])
+            else:
+                self.assertTrue(np.isnan(row['first_violation']))
+
+
+if __name__ == '__main__':
+    unittest.main()
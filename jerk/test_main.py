@@ -0,0 +1,89 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Test that the block by block evaluation of csv-files ('-cs') gives the same result as reading the whole
+            file
+@version: 1.0.0
+"""
+
+import numpy as np
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from StringIO import StringIO
+
+import main
+import synthetic_odometry
+
+
+def quiet(function, *args):
+    '''call 'function' without its terminal output'''
+    stdout, sys.stdout = sys.stdout, StringIO()
+    try:
+        return function(*args)
+    finally:
+        sys.stdout = stdout
+
+
+class TestCsvStream(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'odometry.csv')
+        A, info = synthetic_odometry.odometry(3000, spikes=6, spike_size=0.2, jitter=0.3, dropouts=0.01)
+        synthetic_odometry.to_csv(A, self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def evaluate(self, filename, args, chunk_size=None):
+        '''
+        :return: smoothed jerk, exceedance intervals and verdict of the whole file or of blocks of 'chunk_size' rows
+        '''
+        je = main.JerkEvaluation(['-nc', '-rc', '-csv', filename] + args)
+        je.dirpath = os.path.join(self.directory, 'Data')
+        if chunk_size is None:
+            quiet(je.read_data_csv, filename)
+            quiet(je.differentiation)
+            passed = quiet(je.jerk_metrics, je.max_jerks())
+            return je.A_grad_smo_jerk, je.intervals, passed
+        passed = quiet(je.evaluate_csv_stream, filename, je.max_jerks()[0], chunk_size)
+        # imported here, like in 'main'
+        import pandas as pd
+        df = pd.read_csv(je.csv_stem + '.csv', index_col=0)
+        return df['smo_jerk'].values, je.intervals, passed
+
+    def assertSameResult(self, expected, result):
+        jerk, intervals, passed = result
+        np.testing.assert_allclose(jerk, expected[0], rtol=1e-9, atol=1e-12)
+        self.assertEqual(intervals['start_index'].tolist(), expected[1]['start_index'].tolist())
+        self.assertEqual(intervals['end_index'].tolist(), expected[1]['end_index'].tolist())
+        np.testing.assert_allclose(intervals['peak_jerk'], expected[1]['peak_jerk'], rtol=1e-9)
+        self.assertEqual(passed, expected[2])
+
+    def test_chunks(self):
+        '''every derivative, estimator and block size gives the result of the whole file'''
+        for args in [['-j', '1.0'], ['-j', '1.0', '-dm', 'scalar'], ['-j', '1.0', '-dm', 'scalar', '-e', 'savgol']]:
+            expected = self.evaluate(self.filename, args)
+            self.assertGreater(expected[1].size, 0)
+            for chunk_size in [100, 777, 5000]:
+                self.assertSameResult(expected, self.evaluate(self.filename, args, chunk_size))
+
+    def test_repeated_header(self):
+        '''header rows in the middle of the file are dropped, also when they are inside a later block'''
+        with open(self.filename) as f:
+            lines = f.readlines()
+        filename = os.path.join(self.directory, 'header.csv')
+        with open(filename, 'w') as f:
+            f.writelines(lines[:1201] + lines[:1] + lines[1201:2500] + lines[:1] + lines[2500:])
+        expected = self.evaluate(self.filename, ['-j', '1.0'])
+        self.assertSameResult(expected, self.evaluate(filename, ['-j', '1.0']))
+        for chunk_size in [100, 500, 1200, 5000]:
+            self.assertSameResult(expected, self.evaluate(filename, ['-j', '1.0'], chunk_size))
+
+
+if __name__ == '__main__':
+    unittest.main()
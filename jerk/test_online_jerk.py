@@ -0,0 +1,42 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Test the delay of the causal jerk estimation of 'OnlineJerk'
+@version: 1.0.0
+"""
+
+import numpy as np
+import unittest
+
+from online_jerk import OnlineJerk
+
+
+def ramp_delay(online, n=1500, start=300, dt=0.02):
+    '''
+    feed a velocity ramp starting at sample 'start', its jerk is one impulse at 'start'
+    :return: centroid of the signed estimated jerk in x-direction minus 'start' in [samples]
+    '''
+    smo_acc = []
+    for k in xrange(n):
+        online.update(k * dt, 0.5 * max(0, k - start) * dt, 0.0)
+        smo_acc.append(online.smo_acc[0] if online.smo_acc is not None else 0.0)
+    jerk = np.diff(smo_acc) / dt
+    samples = np.arange(1, n)
+    return (samples * jerk).sum() / jerk.sum() - start
+
+
+class TestDelay(unittest.TestCase):
+    def test_smooth(self):
+        online = OnlineJerk(estimator='smooth')
+        self.assertAlmostEqual(ramp_delay(online), online.delay, places=6)
+
+    def test_butter(self):
+        for cutoff, order in [(1.4, 4), (3.0, 2), (0.8, 6)]:
+            online = OnlineJerk(estimator='butter', cutoff=cutoff, order=order)
+            self.assertAlmostEqual(ramp_delay(online), online.delay, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
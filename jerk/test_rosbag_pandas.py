@@ -0,0 +1,101 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Test reading nav_msgs/Odometry topics of a bag-file with 'rosbag_pandas'
+@version: 1.0.0
+"""
+
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+import rosbag
+import rospy
+from nav_msgs.msg import Odometry
+
+import rosbag_pandas
+
+TOPIC = '/base/odometry_controller/odometry'
+# second topic with other velocities, so the rows of every topic have to be told apart
+OTHER_TOPIC = '/base/odometry_controller/odometry_copy'
+# stamp of the first message in [ns]
+START = 1499254133620209808
+
+
+def key(topic, field):
+    '''column of 'field' of 'topic' in the dataframe'''
+    return (rosbag_pandas.get_key_name(topic) + '__' + field).replace('.', '_')
+
+
+def odometry(seq, stamp, vel_x, pos_y):
+    '''
+    :param stamp: stamp in [ns]
+    :return: nav_msgs/Odometry
+    '''
+    msg = Odometry()
+    msg.header.seq = seq
+    msg.header.stamp = rospy.Time(int(stamp // 10 ** 9), int(stamp % 10 ** 9))
+    msg.header.frame_id = '/odom_combined'
+    msg.child_frame_id = '/base_footprint'
+    msg.twist.twist.linear.x = vel_x
+    msg.pose.pose.position.y = pos_y
+    return msg
+
+
+class TestReadOdometry(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'odometry.bag')
+        n = 200
+        # 50 Hz
+        self.stamps = START + np.arange(n, dtype=np.int64) * 20000000
+        self.vel_x = np.sin(np.arange(n) / 10.0)
+        self.pos_y = np.arange(n) / 100.0
+        bag = rosbag.Bag(self.filename, 'w')
+        try:
+            for i in xrange(n):
+                msg = odometry(i, self.stamps[i], self.vel_x[i], self.pos_y[i])
+                bag.write(TOPIC, msg, msg.header.stamp)
+                other = odometry(i, self.stamps[i], -self.vel_x[i], self.pos_y[i])
+                bag.write(OTHER_TOPIC, other, other.header.stamp)
+        finally:
+            bag.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_odometry(self):
+        '''the raw decoder fills the dataframe of both topics'''
+        fields = ['twist.twist.linear.x', 'pose.pose.position.y']
+        bag = rosbag.Bag(self.filename)
+        try:
+            yaml_info = rosbag_pandas.get_bag_info(bag)
+            topics = [TOPIC, OTHER_TOPIC]
+            msgs_to_read, msg_type = rosbag_pandas.get_msg_info(yaml_info, topics, False, fields)
+            dmap = rosbag_pandas.create_data_map(msgs_to_read)
+            length = rosbag_pandas.get_length(topics, yaml_info)
+            datastore = dict((k, np.empty(length)) for d in dmap.values() for k in d.values())
+            index = np.empty(length)
+            self.assertTrue(rosbag_pandas.read_odometry(bag, topics, yaml_info, dmap, datastore, index, True))
+        finally:
+            bag.close()
+        np.testing.assert_allclose(datastore[key(TOPIC, fields[0])][::2], self.vel_x)
+        np.testing.assert_allclose(datastore[key(OTHER_TOPIC, fields[0])][1::2], -self.vel_x)
+        np.testing.assert_allclose(datastore[key(TOPIC, fields[1])][::2], self.pos_y)
+        np.testing.assert_allclose(index[::2], self.stamps / 1e9)
+
+    def test_bag_to_dataframe(self):
+        '''odometry topics are read through 'read_odometry' by 'bag_to_dataframe' '''
+        df = rosbag_pandas.bag_to_dataframe(self.filename, include=[TOPIC], seconds=True,
+                                            fields=['twist.twist.linear.x', 'pose.pose.position.y'])
+        self.assertEqual(len(df), self.vel_x.size)
+        np.testing.assert_allclose(df[key(TOPIC, 'twist.twist.linear.x')].values, self.vel_x)
+        np.testing.assert_allclose(df[key(TOPIC, 'pose.pose.position.y')].values, self.pos_y)
+
+
+if __name__ == '__main__':
+    unittest.main()
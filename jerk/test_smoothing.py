@@ -0,0 +1,71 @@
+#!/usr/bin/python
+
+"""
+Created on Oct 17, 2026
+
+@attention: Test that 'smooth_many' gives the same rows as 'smooth' with every single window, for short windows which
+            are convolved directly and long windows which are convolved with the FFT
+@version: 1.0.0
+"""
+
+import numpy as np
+import unittest
+
+import derivatives
+import smoothing
+import synthetic_odometry
+
+# short and long windows, odd and even, around 'DIRECT_MAX'
+WINDOW_LENS = [2, 3, 10, 11, 30, 101, smoothing.DIRECT_MAX, smoothing.DIRECT_MAX + 1, 300, 501]
+
+
+def smooth_direct(x, window_len, window):
+    '''reference: the first implementation of 'smooth' with a new window and 'np.convolve' for every call'''
+    s = np.r_[x[window_len - 1:0:-1], x, x[-2:-window_len - 1:-1]]
+    w = getattr(np, window)(window_len) if window != 'flat' else np.ones(window_len)
+    y = np.convolve(w / w.sum(), s, mode='valid')
+    return y[(window_len / 2 - 1):-(window_len / 2)]
+
+
+class TestSmoothMany(unittest.TestCase):
+    def setUp(self):
+        A, info = synthetic_odometry.odometry(3000, spikes=10, spike_size=0.2, jitter=0.2, noise=0.005)
+        # acceleration, like the first smoothing in 'JerkEvaluation'
+        fhs = synthetic_odometry.COLUMNS.index('field.header.stamp')
+        vel_x = synthetic_odometry.COLUMNS.index('field.twist.twist.linear.x')
+        self.x = derivatives.gradient(A[:, vel_x], A[1, fhs] - A[0, fhs])
+
+    def assertSame(self, actual, expected):
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12 * np.abs(expected).max())
+
+    def test_smooth(self):
+        '''cached windows and the FFT give the result of the direct convolution'''
+        for window in smoothing.WINDOWS:
+            for window_len in WINDOW_LENS[1:]:
+                self.assertSame(smoothing.smooth(self.x, window_len, window), smooth_direct(self.x, window_len, window))
+
+    def test_smooth_many(self):
+        '''all windows together in one pass'''
+        n = self.x.size
+        windows = [(window, window_len) for window in smoothing.WINDOWS for window_len in WINDOW_LENS]
+        result = smoothing.smooth_many(self.x, windows)
+        self.assertEqual(result.shape, (len(windows), n))
+        for row, (window, window_len) in zip(result, windows):
+            self.assertSame(row, smoothing.smooth(self.x, window_len, window)[:n])
+
+    def test_single(self):
+        '''only short or only long windows, and the longest window as long as the signal'''
+        n = self.x.size
+        for windows in [[('hanning', 30)], [('flat', 300)], [('hanning', n), ('flat', 11)]]:
+            for row, (window, window_len) in zip(smoothing.smooth_many(self.x, windows), windows):
+                self.assertSame(row, smoothing.smooth(self.x, window_len, window)[:n])
+
+    def test_errors(self):
+        self.assertRaises(ValueError, smoothing.smooth_many, self.x, [('hanning', self.x.size + 1)])
+        self.assertRaises(ValueError, smoothing.smooth_many, self.x, [('gauss', 30)])
+        self.assertRaises(ValueError, smoothing.smooth_many, self.x.reshape(2, -1), [('hanning', 30)])
+        self.assertEqual(smoothing.smooth_many(self.x, []).shape, (0, self.x.size))
+
+
+if __name__ == '__main__':
+    unittest.main()